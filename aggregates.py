@@ -0,0 +1,111 @@
+"""Platform statistics maintained as stories, votes and views happen.
+
+The stats page used to scan every story to count authors, views and likes.
+``PlatformAggregates`` is built once per process from the store and then
+updated by the same code paths that change the store, so reading it is O(1).
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Union
+
+from dedup import author_key
+from sketches import HyperLogLog
+from story_store import StoryStore
+
+DISTINCT_AUTHOR_MODES = ("exact", "hll")
+
+
+class PlatformAggregates:
+    """Running totals behind the statistics page."""
+
+    def __init__(self, distinct_authors: str = "exact"):
+        if distinct_authors not in DISTINCT_AUTHOR_MODES:
+            raise ValueError(f"distinct_authors must be one of {DISTINCT_AUTHOR_MODES}")
+        self.distinct_authors = distinct_authors
+        self._lock = threading.Lock()
+        self._authors: Union[set, HyperLogLog] = set() if distinct_authors == "exact" else HyperLogLog()
+        self.total_stories = 0
+        self.total_views = 0
+        self.total_upvotes = 0
+        self.total_downvotes = 0
+        # Most recently used category first, matching the store's ordering
+        self.category_counts: "OrderedDict[str, int]" = OrderedDict()
+
+    @classmethod
+    def from_store(cls, store: StoryStore, distinct_authors: str = "exact") -> "PlatformAggregates":
+        """Recompute every aggregate from scratch using the store's own totals."""
+        aggregates = cls(distinct_authors)
+        stats = store.get_statistics()
+        aggregates.total_stories = stats['total_stories']
+        aggregates.total_views = stats['total_views']
+        aggregates.total_upvotes = stats['total_upvotes']
+        aggregates.total_downvotes = stats['total_downvotes']
+        aggregates.category_counts = OrderedDict(stats['category_counts'])
+        for key in store.iter_authors():
+            aggregates._authors.add(key)
+        return aggregates
+
+    def _count_story(self, story: Dict[str, Any]) -> None:
+        self._authors.add(author_key(story['author']))
+        self.total_stories += 1
+        self.total_views += story.get('views', 0)
+        self.total_upvotes += story.get('upvotes', 0)
+        self.total_downvotes += story.get('downvotes', 0)
+        self.category_counts[story['category']] = self.category_counts.get(story['category'], 0) + 1
+
+    def story_added(self, story: Dict[str, Any]) -> None:
+        """Account for a newly published story."""
+        with self._lock:
+            self._count_story(story)
+            self.category_counts.move_to_end(story['category'], last=False)
+
+    def votes_changed(self, upvote_delta: int, downvote_delta: int) -> None:
+        """Account for a vote being added, removed or switched."""
+        with self._lock:
+            self.total_upvotes += upvote_delta
+            self.total_downvotes += downvote_delta
+
+    def views_recorded(self, count: int = 1) -> None:
+        """Account for story views."""
+        with self._lock:
+            self.total_views += count
+
+    def count_stories(self, category: Optional[str] = None) -> int:
+        """Number of stories, optionally in one category, as ``StoryStore.count_stories``."""
+        with self._lock:
+            return self.total_stories if category is None else self.category_counts.get(category, 0)
+
+    @property
+    def total_authors(self) -> int:
+        return len(self._authors)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current statistics, shaped like ``StoryStore.get_statistics``."""
+        with self._lock:
+            return {
+                "total_stories": self.total_stories,
+                "total_authors": self.total_authors,
+                "total_views": self.total_views,
+                "total_upvotes": self.total_upvotes,
+                "total_downvotes": self.total_downvotes,
+                "category_counts": dict(self.category_counts),
+            }
+
+    def check_consistency(self, store: StoryStore) -> List[str]:
+        """Compare against statistics computed by the store; return mismatched fields."""
+        expected = store.get_statistics()
+        actual = self.snapshot()
+        mismatched = [field for field in ("total_stories", "total_views", "total_upvotes", "total_downvotes")
+                      if actual[field] != expected[field]]
+        if actual["category_counts"] != expected["category_counts"]:
+            mismatched.append("category_counts")
+        if self.distinct_authors == "exact":
+            authors_ok = actual["total_authors"] == expected["total_authors"]
+        else:
+            # A sketch is only expected to be within a few standard errors
+            tolerance = 3 * self._authors.standard_error * max(expected["total_authors"], 1)
+            authors_ok = abs(actual["total_authors"] - expected["total_authors"]) <= tolerance
+        if not authors_ok:
+            mismatched.append("total_authors")
+        return mismatched
@@ -1,24 +1,247 @@
 import streamlit as st
 from datetime import datetime
-from typing import List, Dict, Any, Optional, Tuple
+import html
+from typing import List, Dict, Any, Optional, Set, Tuple
 import uuid
 import json
+import logging
+import os
+
+from aggregates import PlatformAggregates
+from card_cache import CardCache, CardParts
+from change_feed import ChangeFeed
+from feed_snapshot import FeedSnapshot
+from latin_search import LatinSearchIndex
+from rankings import StoryRankings
+from ranked_search import RankedSearchIndex, index_path
+from render_metrics import MetricsFile, RenderMetrics, fragment_body, note_page, serve_metrics
+from search_index import StorySearchIndex
+import story_rules
+from story_store import DOWNVOTED, NOT_VOTED, UPVOTED, StoryStore, create_story_store
+from stylesheet import style_element
+from suggestions import AUTHOR, TAG, TITLE, SearchSuggestions
+from tags import TagIndex, tag_key
+from transliteration import is_latin_query
+from views import ViewCounter
+from votes import VoteLog
+
+
+# Storage backend shared by every session of this server process
+STORE_BACKEND = os.environ.get("TELUGU_STORIES_BACKEND", "sqlite")
+STORE_PATH = os.environ.get("TELUGU_STORIES_DB", "stories.db")
+# "static" serves a content-hashed stylesheet file (needs server.enableStaticServing),
+# "inline" embeds it in the page, "auto" picks static when static serving is on
+STYLE_MODE = os.environ.get("TELUGU_STORIES_STYLES", "auto")
+# "exact" keeps a set of author keys, "hll" a fixed-size HyperLogLog sketch
+AUTHOR_COUNTING = os.environ.get("TELUGU_STORIES_AUTHOR_COUNTING", "exact")
+# "1" times the _render_*/_filter_*/_load_* methods and counts Streamlit calls of every rerun;
+# the histograms are served on 127.0.0.1:<port>/metrics and/or rewritten to a file
+METRICS_ENABLED = os.environ.get("TELUGU_STORIES_METRICS") == "1"
+METRICS_PORT = os.environ.get("TELUGU_STORIES_METRICS_PORT")
+METRICS_FILE = os.environ.get("TELUGU_STORIES_METRICS_FILE")
+
+logger = logging.getLogger(__name__)
+
+
+@st.cache_resource
+def get_style_element() -> str:
+    """Return the process-wide ``<style>`` markup emitted on every rerun."""
+    mode = STYLE_MODE
+    if mode == "auto":
+        mode = "static" if st.get_option("server.enableStaticServing") else "inline"
+    return style_element(mode)
+
+
+@st.cache_resource
+def get_story_store() -> StoryStore:
+    """Return the process-wide story store (created and seeded once, shared by all sessions)."""
+    if STORE_BACKEND == "sqlite":
+        store = create_story_store(STORE_BACKEND, path=STORE_PATH)
+    else:
+        store = create_story_store(STORE_BACKEND)
+    store.seed_if_empty(TeluguStoriesApp._get_default_stories())
+    return store
+
+
+@st.cache_resource
+def get_change_feed() -> ChangeFeed:
+    """Return the process-wide change feed, polling for other processes' writes."""
+    return ChangeFeed(get_story_store()).start()
+
+
+def _expire_indexes() -> None:
+    """Drop every in-memory index so it is rebuilt from the store on next use.
+
+    Called by the change feed when this process fell too far behind other
+    processes' writes. Suggestions hold the tag index, so they are rebuilt together.
+    """
+    for getter in (get_search_index, get_ranked_index, get_latin_index, get_tag_index,
+                   get_search_suggestions, get_story_rankings, get_platform_aggregates, get_feed_snapshot):
+        getter.clear()
+
+
+@st.cache_resource
+def get_search_index() -> StorySearchIndex:
+    """Return the process-wide search index, built once from the story store."""
+    feed = get_change_feed()
+    since = feed.position()
+    index = StorySearchIndex.from_store(get_story_store())
+    feed.subscribe("search_index", since, story_added=index.add_story, expired=_expire_indexes)
+    return index
+
+
+@st.cache_resource
+def get_ranked_index() -> RankedSearchIndex:
+    """Return the process-wide ranked search index, loaded from its file and caught up with the store."""
+    path = index_path(STORE_PATH) if STORE_BACKEND == "sqlite" else None
+    feed = get_change_feed()
+    since = feed.position()
+    index = RankedSearchIndex.open(get_story_store(), path)
+    feed.subscribe("ranked_index", since, story_added=index.add_story, expired=_expire_indexes)
+    return index
+
+
+@st.cache_resource
+def get_latin_index() -> LatinSearchIndex:
+    """Return the process-wide Latin-script search index, built once from the stored Latin keys."""
+    feed = get_change_feed()
+    since = feed.position()
+    index = LatinSearchIndex.from_store(get_story_store())
+    feed.subscribe("latin_index", since, story_added=index.add_story, expired=_expire_indexes)
+    return index
+
+
+@st.cache_resource
+def get_tag_index() -> TagIndex:
+    """Return the process-wide tag index, built once from the story store."""
+    feed = get_change_feed()
+    since = feed.position()
+    index = TagIndex.from_store(get_story_store())
+    feed.subscribe("tag_index", since, story_added=index.add_story, expired=_expire_indexes)
+    return index
+
+
+@st.cache_resource
+def get_search_suggestions() -> SearchSuggestions:
+    """Return the process-wide search suggestions, built once from the story store."""
+    feed = get_change_feed()
+    since = feed.position()
+    suggestions = SearchSuggestions.from_store(get_story_store(), get_tag_index())
+    feed.subscribe("search_suggestions", since, story_added=suggestions.story_added,
+                   votes_changed=suggestions.votes_changed, views_recorded=suggestions.views_recorded,
+                   expired=_expire_indexes)
+    return suggestions
+
+
+@st.cache_resource
+def get_story_rankings() -> StoryRankings:
+    """Return the process-wide ranking indexes, built once from the story store."""
+    feed = get_change_feed()
+    since = feed.position()
+    rankings = StoryRankings.from_store(get_story_store())
+    feed.subscribe("story_rankings", since, story_added=rankings.story_added,
+                   votes_changed=rankings.votes_changed, views_recorded=rankings.views_recorded,
+                   expired=_expire_indexes)
+    return rankings
+
+
+@st.cache_resource
+def get_vote_log() -> VoteLog:
+    """Return the process-wide write-behind vote log, with its flusher running."""
+    return VoteLog(get_story_store()).start()
+
+
+@st.cache_resource
+def get_view_counter() -> ViewCounter:
+    """Return the process-wide buffered view counter, with its flusher running."""
+    return ViewCounter(get_story_store()).start()
+
+
+@st.cache_resource
+def get_platform_aggregates() -> PlatformAggregates:
+    """Return the process-wide statistics counters, built once from the story store."""
+    feed = get_change_feed()
+    since = feed.position()
+    aggregates = PlatformAggregates.from_store(get_story_store(), AUTHOR_COUNTING)
+    feed.subscribe("platform_aggregates", since,
+                   story_added=lambda seq, story: aggregates.story_added(story),
+                   votes_changed=lambda seq, upvote_delta, downvote_delta: aggregates.votes_changed(
+                       upvote_delta, downvote_delta),
+                   views_recorded=lambda seq, count: aggregates.views_recorded(count),
+                   expired=_expire_indexes)
+    return aggregates
+
+
+@st.cache_resource
+def get_feed_snapshot() -> FeedSnapshot:
+    """Return the process-wide snapshot of the newest stories, read by every session's feed."""
+    feed = get_change_feed()
+    since = feed.position()
+    snapshot = FeedSnapshot(get_story_store())
+    # Flushed counters are dropped from the buffers' overlays, so they must show in the snapshot
+    get_vote_log().on_flush("feed_snapshot", snapshot.invalidate)
+    get_view_counter().on_flush("feed_snapshot", snapshot.invalidate)
+    feed.subscribe("feed_snapshot", since, story_added=snapshot.story_added,
+                   votes_changed=lambda seq, upvote_delta, downvote_delta: snapshot.invalidate(),
+                   views_recorded=lambda seq, count: snapshot.invalidate(), expired=_expire_indexes)
+    return snapshot
+
+
+@st.cache_resource
+def get_card_cache() -> CardCache:
+    """Return the process-wide cache of pre-rendered story cards."""
+    return CardCache()
+
+
+@st.cache_resource
+def get_render_metrics() -> RenderMetrics:
+    """Return the process-wide render metrics, with the configured exporters running."""
+    metrics = RenderMetrics()
+    if METRICS_PORT:
+        try:
+            serve_metrics(metrics, int(METRICS_PORT))
+        except OSError:
+            # Another server process already holds the port
+            logger.warning("Metrics port %s is unavailable; not serving /metrics", METRICS_PORT)
+    if METRICS_FILE:
+        MetricsFile(metrics, METRICS_FILE).start()
+    return metrics
 
 
 class TeluguStoriesApp:
     """Main application class for Telugu Stories platform."""
     
     # Class constants
-    CATEGORIES = ["కథ", "చరిత్ర", "సంస్కృతి", "కవిత", "విజ్ఞానం", "ఇతర"]
-    EXCERPT_LENGTH = 150
-    MIN_TITLE_LENGTH = 3
-    MIN_CONTENT_LENGTH = 50
+    CATEGORIES = story_rules.CATEGORIES
+    EXCERPT_LENGTH = story_rules.EXCERPT_LENGTH
+    MIN_TITLE_LENGTH = story_rules.MIN_TITLE_LENGTH
+    MIN_CONTENT_LENGTH = story_rules.MIN_CONTENT_LENGTH
+    FEED_PAGE_SIZE = 10
+    COMMENTS_PAGE_SIZE = 10
+    REPLIES_PAGE_SIZE = 20
+    MAX_COMMENT_INDENT = 6
+    FEED_RANKINGS = {
+        "new": "🆕 కొత్తవి",
+        "hot": "🔥 హాట్",
+        "top": "⭐ టాప్",
+        "views": "👁️ ఎక్కువగా చదివినవి",
+    }
+    SUGGESTION_LABELS = {
+        TITLE: "📖 శీర్షికలు",
+        AUTHOR: "✍️ రచయితలు",
+        TAG: "🏷️ ట్యాగులు",
+    }
     
     def __init__(self):
         """Initialize the application."""
         self._configure_page()
         self._load_custom_styles()
+        self.store = get_story_store()
         self._initialize_session_state()
+        self.aggregates = get_platform_aggregates()
+        self.votes = get_vote_log()
+        self.views = get_view_counter()
+        self.vote_states: Dict[str, int] = {}
     
     def _configure_page(self) -> None:
         """Configure Streamlit page settings."""
@@ -36,452 +259,39 @@ class TeluguStoriesApp:
     
     def _load_custom_styles(self) -> None:
         """Load custom CSS styles."""
-        css = """
-        <style>
-            /* Import Google Fonts for Telugu and UI elements */
-            @import url('https://fonts.googleapis.com/css2?family=Noto+Sans+Telugu:wght@400;600;700;900&family=Poppins:wght@300;400;500;600;700;800&display=swap');
-            
-            /* CSS Variables for consistent theming */
-            :root {
-                --primary-color: #FF6B35;
-                --primary-light: #FF8A65;
-                --primary-dark: #E64A19;
-                --secondary-color: #2C3E50;
-                --accent-color: #9C27B0;
-                --success-color: #4CAF50;
-                --warning-color: #FF9800;
-                --error-color: #f44336;
-                --background-primary: #0F1419;
-                --background-secondary: #1A202C;
-                --card-bg: #2D3748;
-                --text-primary: #FFFFFF;
-                --text-secondary: #A0AEC0;
-                --text-muted: #718096;
-                --gradient-primary: linear-gradient(135deg, #FF6B35 0%, #F7931E 50%, #FFD23F 100%);
-                --gradient-secondary: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                --gradient-accent: linear-gradient(135deg, #f093fb 0%, #f5576c 100%);
-                --card-shadow: 0 10px 30px rgba(0,0,0,0.3);
-                --card-shadow-hover: 0 20px 40px rgba(0,0,0,0.4);
-                --border-radius: 16px;
-                --border-radius-large: 24px;
-                --transition: all 0.4s cubic-bezier(0.25, 0.8, 0.25, 1);
-                --glow-primary: 0 0 20px rgba(255, 107, 53, 0.5);
-                --glow-accent: 0 0 15px rgba(156, 39, 176, 0.4);
-            }
-
-            /* Dark Theme Base */
-            .stApp {
-                background: var(--background-primary);
-                background-image: 
-                    radial-gradient(circle at 20% 80%, rgba(120, 119, 198, 0.3) 0%, transparent 50%),
-                    radial-gradient(circle at 80% 20%, rgba(255, 107, 53, 0.2) 0%, transparent 50%),
-                    radial-gradient(circle at 40% 40%, rgba(156, 39, 176, 0.1) 0%, transparent 50%);
-                background-attachment: fixed;
-            }
-
-            /* Base Typography with High Contrast */
-            html, body, [class*="st-"], p, div, span {
-                font-family: 'Noto Sans Telugu', sans-serif;
-                color: var(--text-primary) !important;
-                font-weight: 500;
-                line-height: 1.7;
-                text-shadow: 0 1px 3px rgba(0,0,0,0.3);
-            }
-            
-            /* Enhanced Header Styles with Glow Effects */
-            h1 {
-                font-family: 'Noto Sans Telugu', sans-serif;
-                font-weight: 900 !important;
-                color: var(--text-primary) !important;
-                margin-bottom: 1rem;
-                background: var(--gradient-primary);
-                -webkit-background-clip: text;
-                -webkit-text-fill-color: transparent;
-                background-clip: text;
-                font-size: 3.5rem !important;
-                text-align: center;
-                filter: drop-shadow(var(--glow-primary));
-                animation: titleGlow 3s ease-in-out infinite alternate;
-            }
-
-            @keyframes titleGlow {
-                0% { filter: drop-shadow(0 0 10px rgba(255, 107, 53, 0.3)); }
-                100% { filter: drop-shadow(0 0 25px rgba(255, 107, 53, 0.8)); }
-            }
-
-            h2, h3 {
-                font-family: 'Poppins', sans-serif;
-                font-weight: 700 !important;
-                color: var(--text-primary) !important;
-                background: var(--gradient-secondary);
-                -webkit-background-clip: text;
-                -webkit-text-fill-color: transparent;
-                background-clip: text;
-                filter: drop-shadow(0 2px 4px rgba(0,0,0,0.3));
-            }
-
-            /* Enhanced Button Styles with Neon Effects */
-            .stButton > button {
-                background: var(--gradient-primary) !important;
-                border: none !important;
-                color: white !important;
-                border-radius: var(--border-radius) !important;
-                transition: var(--transition) !important;
-                font-weight: 700 !important;
-                padding: 1rem 2rem !important;
-                font-size: 1.1rem !important;
-                text-transform: uppercase;
-                letter-spacing: 1px;
-                box-shadow: var(--card-shadow);
-                position: relative;
-                overflow: hidden;
-            }
-            
-            .stButton > button::before {
-                content: '';
-                position: absolute;
-                top: 0;
-                left: -100%;
-                width: 100%;
-                height: 100%;
-                background: linear-gradient(90deg, transparent, rgba(255,255,255,0.3), transparent);
-                transition: left 0.6s;
-            }
-            
-            .stButton > button:hover {
-                transform: translateY(-3px) scale(1.02) !important;
-                box-shadow: var(--card-shadow-hover), var(--glow-primary) !important;
-                filter: brightness(1.1);
-            }
-            
-            .stButton > button:hover::before {
-                left: 100%;
-            }
-            
-            /* Story Card Styles with Glass Morphism */
-            .story-card {
-                background: rgba(45, 55, 72, 0.95);
-                backdrop-filter: blur(20px);
-                border: 1px solid rgba(255, 255, 255, 0.1);
-                border-radius: var(--border-radius-large);
-                padding: 2rem;
-                margin-bottom: 2rem;
-                box-shadow: var(--card-shadow);
-                position: relative;
-                overflow: hidden;
-                transition: var(--transition);
-                border-left: 4px solid transparent;
-                border-image: var(--gradient-primary) 1;
-            }
-            
-            .story-card::before {
-                content: '';
-                position: absolute;
-                top: 0;
-                left: 0;
-                right: 0;
-                height: 3px;
-                background: var(--gradient-primary);
-                border-radius: var(--border-radius-large) var(--border-radius-large) 0 0;
-            }
-            
-            .story-card::after {
-                content: '';
-                position: absolute;
-                top: -50%;
-                right: -50%;
-                width: 100%;
-                height: 100%;
-                background: radial-gradient(circle, rgba(255, 107, 53, 0.1) 0%, transparent 70%);
-                opacity: 0;
-                transition: var(--transition);
-            }
-            
-            .story-card:hover {
-                transform: translateY(-8px) scale(1.02);
-                box-shadow: var(--card-shadow-hover);
-                border-color: var(--primary-color);
-                background: rgba(45, 55, 72, 1);
-            }
-            
-            .story-card:hover::after {
-                opacity: 1;
-                animation: shimmer 2s ease-in-out infinite;
-            }
-            
-            @keyframes shimmer {
-                0% { transform: rotate(0deg); }
-                100% { transform: rotate(360deg); }
-            }
-
-            /* Enhanced Category Badge with Neon Glow */
-            .story-category {
-                background: var(--gradient-accent);
-                color: white;
-                padding: 0.5rem 1.2rem;
-                border-radius: 25px;
-                font-size: 0.8rem;
-                font-weight: 700;
-                display: inline-block;
-                margin-bottom: 1rem;
-                font-family: 'Poppins', sans-serif;
-                text-transform: uppercase;
-                letter-spacing: 1px;
-                box-shadow: var(--glow-accent);
-                position: relative;
-                overflow: hidden;
-                animation: categoryPulse 3s ease-in-out infinite;
-            }
-            
-            @keyframes categoryPulse {
-                0%, 100% { box-shadow: 0 0 10px rgba(156, 39, 176, 0.4); }
-                50% { box-shadow: 0 0 20px rgba(156, 39, 176, 0.8), 0 0 30px rgba(156, 39, 176, 0.4); }
-            }
-            
-            /* High Contrast Story Content */
-            .story-title {
-                font-size: 1.8rem !important;
-                font-weight: 800 !important;
-                color: var(--text-primary) !important;
-                margin-bottom: 1rem;
-                line-height: 1.3;
-                background: linear-gradient(135deg, #ffffff 0%, #f0f0f0 100%);
-                -webkit-background-clip: text;
-                -webkit-text-fill-color: transparent;
-                background-clip: text;
-                text-shadow: 0 2px 4px rgba(0,0,0,0.3);
-                letter-spacing: 0.5px;
-                cursor: pointer;
-            }
-            
-            .story-title:hover {
-                opacity: 0.8;
-                transition: var(--transition);
-            }
-            
-            .story-meta {
-                color: var(--text-secondary) !important;
-                font-size: 0.9rem;
-                margin-bottom: 1.2rem;
-                font-family: 'Poppins', sans-serif;
-                font-weight: 500;
-                padding: 0.5rem 1rem;
-                background: rgba(160, 174, 192, 0.1);
-                border-radius: 20px;
-                border-left: 3px solid var(--primary-color);
-                backdrop-filter: blur(10px);
-            }
-            
-            .story-excerpt {
-                line-height: 1.8 !important;
-                color: var(--text-primary) !important;
-                margin-bottom: 1.5rem;
-                font-size: 1.1rem !important;
-                font-weight: 500 !important;
-                padding: 1rem;
-                background: rgba(255, 255, 255, 0.05);
-                border-radius: var(--border-radius);
-                border-left: 4px solid var(--primary-light);
-                backdrop-filter: blur(10px);
-                text-shadow: 0 1px 2px rgba(0,0,0,0.2);
-            }
-            
-            /* Enhanced Action Buttons */
-            .story-actions {
-                display: flex;
-                gap: 0.8rem;
-                flex-wrap: wrap;
-                margin-top: 1.5rem;
-            }
-            
-            .story-actions button {
-                font-size: 0.85rem !important;
-                padding: 0.6rem 1.2rem !important;
-                border-radius: 25px !important;
-                font-weight: 600 !important;
-                transition: var(--transition) !important;
-                border: none !important;
-                position: relative;
-                overflow: hidden;
-            }
-            
-            /* Enhanced Form Inputs with Better Validation */
-            .stTextInput > div > div > input,
-            .stTextArea > div > div > textarea,
-            .stSelectbox > div > div > select {
-                background: rgba(45, 55, 72, 0.8) !important;
-                color: var(--text-primary) !important;
-                border: 2px solid rgba(255, 255, 255, 0.1) !important;
-                border-radius: var(--border-radius) !important;
-                font-family: 'Noto Sans Telugu', sans-serif !important;
-                font-size: 1rem !important;
-                padding: 1rem !important;
-                transition: var(--transition) !important;
-                backdrop-filter: blur(10px);
-            }
-            
-            .stTextInput > div > div > input:focus,
-            .stTextArea > div > div > textarea:focus,
-            .stSelectbox > div > div > select:focus {
-                border-color: var(--primary-color) !important;
-                box-shadow: 0 0 20px rgba(255, 107, 53, 0.3) !important;
-                outline: none !important;
-            }
-
-            /* Error State Styling */
-            .input-error {
-                border-color: var(--error-color) !important;
-                box-shadow: 0 0 15px rgba(244, 67, 54, 0.3) !important;
-            }
-
-            /* Character Counter */
-            .character-counter {
-                font-size: 0.8rem;
-                color: var(--text-muted);
-                text-align: right;
-                margin-top: 0.25rem;
-            }
-
-            .character-counter.warning {
-                color: var(--warning-color);
-            }
-
-            .character-counter.error {
-                color: var(--error-color);
-            }
-            
-            /* Enhanced Labels */
-            .stTextInput > label,
-            .stTextArea > label,
-            .stSelectbox > label {
-                color: var(--text-primary) !important;
-                font-weight: 600 !important;
-                font-size: 1.1rem !important;
-                margin-bottom: 0.5rem !important;
-            }
-            
-            /* Loading Animation */
-            .loading-spinner {
-                display: flex;
-                justify-content: center;
-                align-items: center;
-                padding: 2rem;
-            }
-
-            .spinner {
-                width: 40px;
-                height: 40px;
-                border: 4px solid rgba(255, 107, 53, 0.3);
-                border-top: 4px solid var(--primary-color);
-                border-radius: 50%;
-                animation: spin 1s linear infinite;
-            }
-
-            @keyframes spin {
-                0% { transform: rotate(0deg); }
-                100% { transform: rotate(360deg); }
-            }
-
-            /* Notification Styles */
-            .notification {
-                padding: 1rem;
-                border-radius: var(--border-radius);
-                margin: 1rem 0;
-                animation: slideIn 0.3s ease-out;
-            }
-
-            .notification.success {
-                background: rgba(76, 175, 80, 0.1);
-                border-left: 4px solid var(--success-color);
-                color: var(--success-color);
-            }
-
-            .notification.error {
-                background: rgba(244, 67, 54, 0.1);
-                border-left: 4px solid var(--error-color);
-                color: var(--error-color);
-            }
-
-            @keyframes slideIn {
-                from {
-                    opacity: 0;
-                    transform: translateX(-20px);
-                }
-                to {
-                    opacity: 1;
-                    transform: translateX(0);
-                }
-            }
-
-            /* Responsive improvements */
-            @media (max-width: 768px) {
-                h1 {
-                    font-size: 2.5rem !important;
-                }
-                
-                .story-title {
-                    font-size: 1.5rem !important;
-                }
-                
-                .story-excerpt {
-                    font-size: 1rem !important;
-                }
-                
-                .story-card {
-                    padding: 1.5rem;
-                    margin-bottom: 1.5rem;
-                }
-
-                .story-actions {
-                    flex-direction: column;
-                }
-
-                .story-actions button {
-                    width: 100%;
-                    margin-bottom: 0.5rem;
-                }
-            }
-
-            /* Accessibility improvements */
-            .sr-only {
-                position: absolute;
-                width: 1px;
-                height: 1px;
-                padding: 0;
-                margin: -1px;
-                overflow: hidden;
-                clip: rect(0, 0, 0, 0);
-                white-space: nowrap;
-                border: 0;
-            }
-
-            /* Focus indicators */
-            button:focus-visible,
-            input:focus-visible,
-            textarea:focus-visible,
-            select:focus-visible {
-                outline: 2px solid var(--primary-color);
-                outline-offset: 2px;
-            }
-        </style>
-        """
-        st.markdown(css, unsafe_allow_html=True)
+        st.markdown(get_style_element(), unsafe_allow_html=True)
     
     def _initialize_session_state(self) -> None:
-        """Initialize session state with default data."""
-        if 'stories' not in st.session_state:
-            st.session_state.stories = self._get_default_stories()
-        
+        """Initialize this session's own state: navigation, search, open threads and the voter key."""
+        # Stories live in the shared store and the feed snapshot, seeded once per process
         if 'show_form' not in st.session_state:
             st.session_state.show_form = False
 
         if 'search_query' not in st.session_state:
             st.session_state.search_query = ""
 
-        if 'user_interactions' not in st.session_state:
-            st.session_state.user_interactions = {}
+        if 'author_page' not in st.session_state:
+            # Name of the author whose page is open
+            st.session_state.author_page = None
+
+        if 'comment_threads' not in st.session_state:
+            # Story id -> cursors of the comment pages opened so far, for stories showing comments
+            st.session_state.comment_threads = {}
+            # Top-level comment id -> cursors of the reply pages opened so far
+            st.session_state.expanded_replies = {}
+            st.session_state.replying_to = None
+
+        if 'voter_key' not in st.session_state:
+            # Kept in the URL so the same browser keeps its votes across sessions and restarts;
+            # it also identifies the reader for unique-viewer counts
+            voter_key = st.query_params.get("voter")
+            if not voter_key:
+                voter_key = uuid.uuid4().hex
+                st.query_params["voter"] = voter_key
+            st.session_state.voter_key = voter_key
     
-    def _get_default_stories(self) -> List[Dict[str, Any]]:
+    @staticmethod
+    def _get_default_stories() -> List[Dict[str, Any]]:
         """Return default stories data with unique IDs."""
         return [
             {
@@ -518,72 +328,29 @@ class TeluguStoriesApp:
     
     def _validate_story_data(self, title: str, author: str, content: str, category: str) -> Tuple[bool, str]:
         """Validate story form data with enhanced checks."""
-        title = title.strip()
-        author = author.strip()
-        content = content.strip()
-        
-        if not title:
-            return False, "శీర్షిక తప్పనిసరి"
-        if not author:
-            return False, "రచయిత పేరు తప్పనిసరి"
-        if not content:
-            return False, "కథ/రచన తప్పనిసరి"
-        if not category:
-            return False, "విభాగం ఎంపిక తప్పనిసరి"
-        
-        if len(title) < self.MIN_TITLE_LENGTH:
-            return False, f"శీర్షిక కనీసం {self.MIN_TITLE_LENGTH} అక్షరాలు ఉండాలి"
-        if len(title) > 100:
-            return False, "శీర్షిక 100 అక్షరాలకు మించకూడదు"
-        if len(content) < self.MIN_CONTENT_LENGTH:
-            return False, f"కథ/రచన కనీసం {self.MIN_CONTENT_LENGTH} అక్షరాలు ఉండాలి"
-        if len(author) > 50:
-            return False, "రచయిత పేరు 50 అక్షరాలకు మించకూడదు"
-        
-        # Check for duplicate titles
-        existing_titles = [story['title'].lower() for story in st.session_state.stories]
-        if title.lower() in existing_titles:
-            return False, "ఈ శీర్షికతో కథ ఇప్పటికే ఉంది"
-        
-        return True, ""
+        is_valid, error_message = story_rules.validate_story_fields(title, author, content, category)
+        if not is_valid:
+            return is_valid, error_message
+        return story_rules.check_duplicates(self.store, title, content)
     
     def _create_story_excerpt(self, content: str) -> str:
         """Create excerpt from story content."""
-        content = content.strip()
-        if len(content) <= self.EXCERPT_LENGTH:
-            return content
-        
-        # Find a good breaking point (sentence or word boundary)
-        excerpt = content[:self.EXCERPT_LENGTH]
-        last_sentence = excerpt.rfind('.')
-        last_space = excerpt.rfind(' ')
-        
-        if last_sentence > self.EXCERPT_LENGTH * 0.7:
-            return excerpt[:last_sentence + 1]
-        elif last_space > 0:
-            return excerpt[:last_space] + "..."
-        else:
-            return excerpt + "..."
+        return story_rules.create_story_excerpt(content)
     
     def _add_new_story(self, title: str, author: str, category: str, content: str, tags: List[str] = None) -> None:
-        """Add a new story to the session state."""
-        story_id = str(uuid.uuid4())
-        new_story = {
-            "id": story_id,
-            "title": title.strip(),
-            "author": author.strip(),
-            "timestamp": "ఇప్పుడే",
-            "category": category,
-            "content": content.strip(),
-            "excerpt": self._create_story_excerpt(content.strip()),
-            "upvotes": 0,
-            "downvotes": 0,
-            "comments": 0,
-            "views": 0,
-            "created_at": datetime.now().isoformat(),
-            "tags": tags or []
-        }
-        st.session_state.stories.insert(0, new_story)
+        """Add a new story to the shared story store."""
+        new_story = story_rules.build_story(title, author, category, content, tags)
+        search_index = get_search_index()
+        rankings = get_story_rankings()
+        seq = self.store.add_story(new_story)
+        search_index.add_story(seq, new_story)
+        get_ranked_index().add_story(seq, new_story)
+        get_latin_index().add_story(seq, new_story)
+        get_tag_index().add_story(seq, new_story)
+        get_search_suggestions().story_added(seq, new_story)
+        rankings.story_added(seq, new_story)
+        self.aggregates.story_added(new_story)
+        get_feed_snapshot().story_added(seq, new_story)
     
     def _get_time_ago(self, timestamp_str: str) -> str:
         """Convert timestamp to human readable time ago format."""
@@ -608,153 +375,258 @@ class TeluguStoriesApp:
         except:
             return timestamp_str
     
-    def _handle_story_interaction(self, story_id: str, action: str) -> None:
+    @staticmethod
+    def _reading_time(story: Dict[str, Any], words: bool = False) -> str:
+        """Stored reading time (and word count) for a story's meta line; empty until previews are backfilled."""
+        if not story.get('reading_minutes'):
+            return ""
+        text = f" • ⏱️ {story['reading_minutes']} నిమిషాలు"
+        if words:
+            text += f" • <strong>పదాలు:</strong> {story['word_count']:,}"
+        return text
+
+    def _handle_story_interaction(self, story: Dict[str, Any], action: str) -> None:
         """Handle user interactions with stories."""
-        if story_id not in st.session_state.user_interactions:
-            st.session_state.user_interactions[story_id] = {
-                'upvoted': False,
-                'downvoted': False
-            }
-        
-        story_idx = next((i for i, s in enumerate(st.session_state.stories) if s['id'] == story_id), None)
-        if story_idx is None:
-            return
-        
-        user_interaction = st.session_state.user_interactions[story_id]
-        
-        if action == 'upvote':
-            if user_interaction['upvoted']:
-                # Remove upvote
-                st.session_state.stories[story_idx]['upvotes'] -= 1
-                user_interaction['upvoted'] = False
-            else:
-                # Add upvote
-                st.session_state.stories[story_idx]['upvotes'] += 1
-                user_interaction['upvoted'] = True
-                # Remove downvote if exists
-                if user_interaction['downvoted']:
-                    st.session_state.stories[story_idx]['downvotes'] -= 1
-                    user_interaction['downvoted'] = False
-        
-        elif action == 'downvote':
-            if user_interaction['downvoted']:
-                # Remove downvote
-                st.session_state.stories[story_idx]['downvotes'] -= 1
-                user_interaction['downvoted'] = False
-            else:
-                # Add downvote
-                st.session_state.stories[story_idx]['downvotes'] += 1
-                user_interaction['downvoted'] = True
-                # Remove upvote if exists
-                if user_interaction['upvoted']:
-                    st.session_state.stories[story_idx]['upvotes'] -= 1
-                    user_interaction['upvoted'] = False
+        # Queued in the vote log; counters are written to the store in batches
+        voter_key = st.session_state.voter_key
+        upvote_delta, downvote_delta = self.votes.cast(story['id'], voter_key, action)
+        self.aggregates.votes_changed(upvote_delta, downvote_delta)
+        get_story_rankings().votes_changed(story['seq'], upvote_delta, downvote_delta)
+        get_search_suggestions().votes_changed(story['seq'], upvote_delta, downvote_delta)
+        # Only the card's fragment reruns after a vote, so update the copy it renders
+        story['upvotes'] += upvote_delta
+        story['downvotes'] += downvote_delta
+        self.vote_states.update(self.votes.voter_states(voter_key, [story['id']]))
     
-    def _render_story_card(self, story: Dict[str, Any], index: int) -> None:
-        """Render a single story card with enhanced features."""
-        # Increment view count
-        if 'views_updated' not in st.session_state:
-            st.session_state.views_updated = set()
+    def _card_parts(self, story: Dict[str, Any]) -> CardParts:
+        """Static HTML of a story card, split where the relative time and the view count go.
         
-        story_id = story.get('id', f"story_{index}")
-        if story_id not in st.session_state.views_updated:
-            story['views'] = story.get('views', 0) + 1
-            st.session_state.views_updated.add(story_id)
-        
-        # Story card container
-        st.markdown('<div class="story-card">', unsafe_allow_html=True)
-        
-        # Category badge
-        st.markdown(
-            f'<div class="story-category">{story["category"]}</div>',
-            unsafe_allow_html=True
-        )
-        
-        # Story title (clickable for full view)
-        st.markdown(
-            f'<div class="story-title" title="Click to read full story">{story["title"]}</div>',
-            unsafe_allow_html=True
-        )
-        
-# Story metadata with views
-        meta_info = f"""
-        <div class="story-meta">
-            <strong>రచయిత:</strong> {story["author"]} • 
-            <strong>సమయం:</strong> {self._get_time_ago(story.get("created_at", story["timestamp"]))} • 
-            <strong>వీక్షణలు:</strong> {story.get('views', 0):,}
-        </div>
+        Every field a user wrote is escaped: the parts are cached and shown to every session.
         """
-        st.markdown(meta_info, unsafe_allow_html=True)
-        
-        # Story excerpt
-        st.markdown(
-            f'<div class="story-excerpt">{story["excerpt"]}</div>',
-            unsafe_allow_html=True
+        tags_html = ""
+        if story.get('tags'):
+            tags_html = '<div class="story-tags">' + ' '.join(
+                f'<span class="tag">#{html.escape(tag)}</span>' for tag in story['tags']) + '</div>'
+        # One line of HTML: a blank line would end the HTML block in Markdown
+        excerpt = html.escape(" ".join(story["excerpt"].split()))
+        head = (
+            '<div class="story-card">'
+            f'<div class="story-category">{html.escape(story["category"])}</div>'
+            f'<div class="story-title" title="Click to read full story">{html.escape(story["title"])}</div>'
+            f'<div class="story-meta"><strong>రచయిత:</strong> {html.escape(story["author"])} • <strong>సమయం:</strong> '
         )
+        middle = ' • <strong>వీక్షణలు:</strong> '
+        tail = f'{self._reading_time(story)}</div><div class="story-excerpt">{excerpt}</div>{tags_html}</div>'
+        return head, middle, tail
+
+    @st.fragment
+    @fragment_body
+    def _render_story_card(self, story: Dict[str, Any]) -> None:
+        """Render a single story card with enhanced features.
+
+        A fragment: its buttons rerun only this card, not the header, filters and the rest of the feed.
+        """
+        story_id = story['id']
         
-        # Tags if available
-        if story.get('tags'):
-            tags_html = ' '.join([f'<span class="tag">#{tag}</span>' for tag in story['tags']])
-            st.markdown(f'<div class="story-tags">{tags_html}</div>', unsafe_allow_html=True)
+        # Category, title, metadata, excerpt and tags as one element, built once per story version
+        head, middle, tail = get_card_cache().get(story, self._card_parts)
+        time_ago = self._get_time_ago(story.get("created_at", story["timestamp"]))
+        st.markdown(f"{head}{time_ago}{middle}{story.get('views', 0):,}{tail}", unsafe_allow_html=True)
         
         # Action buttons
-        col1, col2, col3, col4, col5 = st.columns([2, 2, 2, 2, 4])
+        col1, col2, col3, col4, col5, col6 = st.columns([2, 2, 2, 2, 3, 3])
         
-        user_interaction = st.session_state.user_interactions.get(story_id, {'upvoted': False, 'downvoted': False})
+        vote_state = self.vote_states.get(story_id, NOT_VOTED)
         
         with col1:
             upvote_label = f"👍 {story.get('upvotes', 0)}"
-            if user_interaction['upvoted']:
+            if vote_state == UPVOTED:
                 upvote_label = f"👍 {story.get('upvotes', 0)} ✓"
             
-            if st.button(upvote_label, key=f"upvote_{story_id}_{index}"):
-                self._handle_story_interaction(story_id, 'upvote')
-                st.rerun()
+            st.button(upvote_label, key=f"upvote_{story_id}",
+                      on_click=self._handle_story_interaction, args=(story, 'upvote'))
         
         with col2:
             downvote_label = f"👎 {story.get('downvotes', 0)}"
-            if user_interaction['downvoted']:
+            if vote_state == DOWNVOTED:
                 downvote_label = f"👎 {story.get('downvotes', 0)} ✓"
             
-            if st.button(downvote_label, key=f"downvote_{story_id}_{index}"):
-                self._handle_story_interaction(story_id, 'downvote')
-                st.rerun()
+            st.button(downvote_label, key=f"downvote_{story_id}",
+                      on_click=self._handle_story_interaction, args=(story, 'downvote'))
         
         with col3:
-            if st.button(f"💬 {story.get('comments', 0)}", key=f"comment_{story_id}_{index}"):
-                st.info("వ్యాఖ్యల ఫీచర్ త్వరలో వస్తుంది!")
+            st.button(f"💬 {story.get('comments', 0)}", key=f"comment_{story_id}",
+                      on_click=self._toggle_thread, args=(st.session_state.comment_threads, story_id))
         
         with col4:
-            if st.button("📖 చదవండి", key=f"read_{story_id}_{index}"):
-                self._show_full_story(story)
+            if st.button("📖 చదవండి", key=f"read_{story_id}"):
+                self._show_full_story(story_id)
         
         with col5:
-            if st.button("📤 షేర్ చేయండి", key=f"share_{story_id}_{index}"):
+            if st.button("📤 షేర్ చేయండి", key=f"share_{story_id}"):
                 self._show_share_options(story)
         
-        st.markdown('</div>', unsafe_allow_html=True)
+        with col6:
+            if st.button("✍️ రచయిత", key=f"author_{story_id}"):
+                # The author page replaces the whole feed, not just this card
+                st.session_state.author_page = story['author']
+                st.rerun()
+        
+        if story_id in st.session_state.comment_threads:
+            self._render_comments(story)
+    
+    @staticmethod
+    def _toggle_thread(threads: Dict[str, List[Optional[str]]], thread_id: str) -> None:
+        """Show a story's comments or a comment's replies from the first page, or hide them."""
+        if threads.pop(thread_id, None) is None:
+            threads[thread_id] = [None]
+    
+    def _render_comments(self, story: Dict[str, Any]) -> None:
+        """Render a story's comments: pages of top-level comments, newest first, replies on demand."""
+        story_id = story['id']
+        self._render_comment_form(story)
+        
+        cursors = st.session_state.comment_threads[story_id]
+        comments = []
+        has_more = False
+        for cursor in cursors:
+            # Fetch one extra comment to learn whether another page exists
+            page = self.store.list_comments(story_id, self.COMMENTS_PAGE_SIZE + 1, cursor)
+            has_more = len(page) > self.COMMENTS_PAGE_SIZE
+            comments.extend(page[:self.COMMENTS_PAGE_SIZE])
+        
+        if not comments:
+            st.caption("ఇంకా వ్యాఖ్యలు లేవు. మొదటి వ్యాఖ్య మీదే కావచ్చు!")
+        for comment in comments:
+            self._render_comment(story, comment)
+            if comment['id'] in st.session_state.expanded_replies:
+                self._render_replies(story, comment)
+        
+        if has_more:
+            st.button("⬇️ మరిన్ని వ్యాఖ్యలు", key=f"more_comments_{story_id}",
+                      on_click=cursors.append, args=(comments[-1]['path'],))
+    
+    def _render_replies(self, story: Dict[str, Any], comment: Dict[str, Any]) -> None:
+        """Render every reply below a top-level comment in thread order, a page at a time."""
+        cursors = st.session_state.expanded_replies[comment['id']]
+        replies = []
+        has_more = False
+        for cursor in cursors:
+            page = self.store.list_replies(comment['id'], self.REPLIES_PAGE_SIZE + 1, cursor)
+            has_more = len(page) > self.REPLIES_PAGE_SIZE
+            replies.extend(page[:self.REPLIES_PAGE_SIZE])
+        
+        for reply in replies:
+            self._render_comment(story, reply, indent=reply['depth'] - comment['depth'])
+        
+        if has_more:
+            st.button("⬇️ మరిన్ని జవాబులు", key=f"more_replies_{comment['id']}",
+                      on_click=cursors.append, args=(replies[-1]['path'],))
+    
+    def _render_comment(self, story: Dict[str, Any], comment: Dict[str, Any], indent: int = 0) -> None:
+        """Render one comment with its reply button, and the reply form when it is open."""
+        # Comments are free text from any reader, so they are escaped; newlines become <br>
+        # because a blank line would end the HTML block
+        body = html.escape(comment['body']).replace("\n", "<br>")
+        margin = min(indent, self.MAX_COMMENT_INDENT) * 1.5
+        st.markdown(
+            f'<div class="comment" style="margin-left: {margin}rem">'
+            f'<div class="comment-meta"><strong>{html.escape(comment["author"])}</strong> • '
+            f'{self._get_time_ago(comment["created_at"])}</div>{body}</div>',
+            unsafe_allow_html=True
+        )
+        
+        col1, col2, _ = st.columns([2, 3, 5])
+        with col1:
+            st.button("↩️ జవాబు", key=f"reply_{comment['id']}",
+                      on_click=self._toggle_reply_form, args=(comment['id'],))
+        if indent == 0 and comment['replies']:
+            with col2:
+                st.button(f"💬 {comment['replies']} జవాబులు", key=f"replies_{comment['id']}",
+                          on_click=self._toggle_thread, args=(st.session_state.expanded_replies, comment['id']))
+        
+        if st.session_state.replying_to == comment['id']:
+            self._render_comment_form(story, comment)
+    
+    @staticmethod
+    def _toggle_reply_form(comment_id: str) -> None:
+        """Open the reply form under a comment, closing any other."""
+        replying_to = st.session_state.replying_to
+        st.session_state.replying_to = None if replying_to == comment_id else comment_id
+    
+    def _render_comment_form(self, story: Dict[str, Any], parent: Optional[Dict[str, Any]] = None) -> None:
+        """Render the form for a new comment on a story, or for a reply to ``parent``."""
+        form_key = f"comment_form_{parent['id'] if parent else story['id']}"
+        with st.form(form_key, clear_on_submit=True):
+            st.text_input("పేరు *", max_chars=story_rules.MAX_AUTHOR_LENGTH, key=f"{form_key}_author")
+            st.text_area("జవాబు *" if parent else "వ్యాఖ్య *", height=80,
+                         max_chars=story_rules.MAX_COMMENT_LENGTH, key=f"{form_key}_body")
+            # Submitted in a callback, before the card reruns, so the new comment is listed
+            st.form_submit_button("📝 పంపండి", on_click=self._submit_comment, args=(story, parent, form_key))
+        
+        error = st.session_state.get('comment_error')
+        if error and error[0] == form_key:
+            st.error(f"❌ {error[1]}")
     
-    def _show_full_story(self, story: Dict[str, Any]) -> None:
+    def _submit_comment(self, story: Dict[str, Any], parent: Optional[Dict[str, Any]], form_key: str) -> None:
+        """Validate and store a comment from its form."""
+        author = st.session_state[f"{form_key}_author"]
+        body = st.session_state[f"{form_key}_body"]
+        st.session_state.comment_error = None
+        is_valid, error_message = story_rules.validate_comment_fields(author, body)
+        if not is_valid:
+            st.session_state.comment_error = (form_key, error_message)
+            return
+        comment = story_rules.build_comment(story['id'], author, body, parent['id'] if parent else None)
+        if self.store.add_comment(comment) is None:
+            st.session_state.comment_error = (form_key, "ఈ కథ అందుబాటులో లేదు")
+            return
+        
+        # The card's fragment reruns with the story it was given, so count the comment there
+        story['comments'] = story.get('comments', 0) + 1
+        get_feed_snapshot().invalidate()
+        if parent:
+            st.session_state.replying_to = None
+            if parent['depth'] == 0:
+                st.session_state.expanded_replies.setdefault(parent['id'], [None])
+        st.toast("✅ వ్యాఖ్య జోడించబడింది!")
+    
+    def _show_full_story(self, story_id: str) -> None:
         """Display full story in a modal-like interface."""
+        # Always read the latest copy by id; the card's dict may be stale
+        story = self.store.get_story(story_id)
+        if story is None:
+            st.warning("ఈ కథ అందుబాటులో లేదు")
+            return
+        
+        # Opening the full story is what counts as a view; it is buffered, not written here
+        self.views.record_read(story_id, st.session_state.voter_key)
+        self.aggregates.views_recorded()
+        get_story_rankings().views_recorded(story['seq'])
+        get_search_suggestions().views_recorded(story['seq'])
+        self.views.overlay([story])
+        
         st.markdown("---")
         st.markdown('<div class="story-card full-story">', unsafe_allow_html=True)
         
         # Story header
-        st.markdown(f'<div class="story-category">{story["category"]}</div>', unsafe_allow_html=True)
-        st.markdown(f'<h2 class="story-title">{story["title"]}</h2>', unsafe_allow_html=True)
+        st.markdown(f'<div class="story-category">{html.escape(story["category"])}</div>', unsafe_allow_html=True)
+        st.markdown(f'<h2 class="story-title">{html.escape(story["title"])}</h2>', unsafe_allow_html=True)
         
         # Author and timestamp
         meta_info = f"""
         <div class="story-meta">
-            <strong>రచయిత:</strong> {story["author"]} • 
+            <strong>రచయిత:</strong> {html.escape(story["author"])} • 
             <strong>ప్రచురణ:</strong> {self._get_time_ago(story.get("created_at", story["timestamp"]))} • 
-            <strong>వీక్షణలు:</strong> {story.get('views', 0):,}
+            <strong>వీక్షణలు:</strong> {story.get('views', 0):,} • 
+            <strong>పాఠకులు:</strong> {self.views.unique_viewers(story_id):,}{self._reading_time(story, words=True)}
         </div>
         """
         st.markdown(meta_info, unsafe_allow_html=True)
         
-        # Full content
-        st.markdown(f'<div class="story-content">{story["content"]}</div>', unsafe_allow_html=True)
+        # Full content, escaped like comments; line breaks kept within one HTML block
+        content = html.escape(story["content"]).replace("\n", "<br>")
+        st.markdown(f'<div class="story-content">{content}</div>', unsafe_allow_html=True)
         
         # Tags
         if story.get('tags'):
@@ -789,42 +661,277 @@ class TeluguStoriesApp:
             
             # WhatsApp
             whatsapp_url = f"https://wa.me/?text={share_text.replace(' ', '%20')}"
-            st.markdown(f'<a href="{whatsapp_url}" target="_blank">📱 WhatsApp లో షేర్ చేయండి</a>', unsafe_allow_html=True)
+            st.markdown(f'<a href="{html.escape(whatsapp_url)}" target="_blank">📱 WhatsApp లో షేర్ చేయండి</a>', unsafe_allow_html=True)
             
             # Twitter
             twitter_url = f"https://twitter.com/intent/tweet?text={share_text.replace(' ', '%20')}"
-            st.markdown(f'<a href="{twitter_url}" target="_blank">🐦 Twitter లో షేర్ చేయండి</a>', unsafe_allow_html=True)
+            st.markdown(f'<a href="{html.escape(twitter_url)}" target="_blank">🐦 Twitter లో షేర్ చేయండి</a>', unsafe_allow_html=True)
             
             # Facebook
             facebook_url = f"https://www.facebook.com/sharer/sharer.php?u=&quote={share_text.replace(' ', '%20')}"
-            st.markdown(f'<a href="{facebook_url}" target="_blank">📘 Facebook లో షేర్ చేయండి</a>', unsafe_allow_html=True)
+            st.markdown(f'<a href="{html.escape(facebook_url)}" target="_blank">📘 Facebook లో షేర్ చేయండి</a>', unsafe_allow_html=True)
+    
+    def _filter_stories(self, search_query: str, selected_category: str,
+                        limit: Optional[int] = None, before: Optional[int] = None,
+                        ranking: str = "new", author: Optional[str] = None,
+                        search_kind: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Filter stories based on search and category, or list one author's, one page at a time.
+        
+        Every story carries a ``cursor``; passing the last one as ``before``
+        fetches the next page. Text searches are ordered by relevance; tag
+        searches, Latin-script searches and author pages are always newest first.
+        ``search_kind`` is ``_search_kind(search_query)``, if the caller has it.
+        """
+        category = None if selected_category == "అన్నీ" else selected_category
+        tag = self._query_tag(search_query)
+        if search_kind is None:
+            search_kind = self._search_kind(search_query)
+        
+        if author is not None:
+            stories = self.store.list_author_stories(author, limit, before)
+        elif tag is not None:
+            # The tag's postings are its stories; the empty query only applies the category and the limit
+            stories = self.store.search_stories("", category, get_tag_index().stories(tag, before), limit)
+        elif search_kind == "latin":
+            stories = self._latin_page(search_query, category, limit, before)
+        elif search_kind == "ranked":
+            return self._ranked_page(search_query, category, limit, before or 0)
+        # No word of the query is a word of any story: match it as a substring, scanning only the index candidates
+        elif search_kind == "text":
+            # The index is built on first use, so plain browsing never waits for it
+            candidates = get_search_index().candidates(search_query)
+            stories = self.store.search_stories(search_query, category, candidates, limit, before)
+        elif ranking != "new":
+            page = get_story_rankings().page(ranking, category, limit or self.FEED_PAGE_SIZE, before)
+            cursors = {seq: cursor for cursor, seq in page}
+            stories = self.store.get_stories_by_seq([seq for _, seq in page])
+            for story in stories:
+                story['cursor'] = cursors[story['seq']]
+            return stories
+        else:
+            # The first pages come from the snapshot every session shares, older ones from the store
+            stories = get_feed_snapshot().page(category, limit, before)
+            if stories is None:
+                stories = self.store.list_stories(category, limit, before)
+        
+        for story in stories:
+            story['cursor'] = story['seq']
+        return stories
+    
+    def _search_kind(self, search_query: str) -> Optional[str]:
+        """How a search is answered; worked out once per rerun, as it may look the query up in the indexes.
+        
+        "tag" for a "#tag" search, "latin" when typed in Latin script and matching a romanized
+        story, "ranked" when some story contains one of its words, "text" for a substring
+        search and ``None`` without a query.
+        """
+        if not search_query.strip():
+            return None
+        if self._query_tag(search_query) is not None:
+            return "tag"
+        if is_latin_query(search_query) and get_latin_index().has_matches(search_query):
+            return "latin"
+        if get_ranked_index().has_terms(search_query):
+            return "ranked"
+        return "text"
     
-    def _filter_stories(self, stories: List[Dict[str, Any]], search_query: str, selected_category: str) -> List[Dict[str, Any]]:
-        """Filter stories based on search and category."""
-        filtered_stories = stories
-        
-        # Filter by category
-        if selected_category != "అన్నీ":
-            filtered_stories = [s for s in filtered_stories if s["category"] == selected_category]
-        
-        # Filter by search query
-        if search_query:
-            search_query = search_query.lower().strip()
-            filtered_stories = [
-                s for s in filtered_stories 
-                if (search_query in s["title"].lower() or 
-                    search_query in s["author"].lower() or 
-                    search_query in s["content"].lower() or
-                    search_query in s.get("excerpt", "").lower() or
-                    any(search_query in tag.lower() for tag in s.get("tags", [])))
-            ]
-        
-        return filtered_stories
+    def _latin_page(self, search_query: str, category: Optional[str], limit: Optional[int],
+                    before: Optional[int]) -> List[Dict[str, Any]]:
+        """A page of a Latin-script search, newest first.
+        
+        Matched on the romanized title, author and tags; the matches are the candidates, as for tags.
+        The index knows no categories, so with one it is read in growing batches until the page is full.
+        """
+        latin = get_latin_index()
+        if category is None or limit is None:
+            return self.store.search_stories("", category, latin.matches(search_query, before, limit), limit)
+        stories: List[Dict[str, Any]] = []
+        batch = limit
+        while len(stories) < limit:
+            found = latin.matches(search_query, before, batch)
+            stories.extend(self.store.search_stories("", category, found, limit - len(stories)))
+            if len(found) < batch:
+                break
+            before, batch = found[-1], batch * 2
+        return stories
+    
+    def _ranked_page(self, search_query: str, category: Optional[str], limit: Optional[int],
+                     offset: int) -> List[Dict[str, Any]]:
+        """A page of a relevance-ranked search; the cursor is the number of results shown so far.
+        
+        The results are the stories a substring search finds. Those containing a word of the query
+        come first, best match first, and the others follow, newest first.
+        """
+        ranked = get_ranked_index()
+        wanted = offset + (ranked.document_count if limit is None else limit)
+        # A story can match a word of the query without containing the query, so ask for more until enough are left
+        size = wanted
+        while True:
+            found = ranked.search(search_query, size, category)
+            matching = {story['seq']: story for story in
+                        self.store.search_stories(search_query, category, [seq for _, seq in found])}
+            stories = [matching[seq] for _, seq in found if seq in matching]
+            if len(stories) >= wanted or len(found) < size:
+                break
+            size *= 2
+        if len(stories) < wanted:
+            # Every ranked match is known; at most len(matching) of the first ``wanted`` substring matches are
+            # among them, which leaves enough of the others to fill the page
+            rest = self.store.search_stories(search_query, category, get_search_index().candidates(search_query),
+                                             None if limit is None else wanted)
+            stories.extend(story for story in rest if story['seq'] not in matching)
+        stories = stories[offset:wanted]
+        for position, story in enumerate(stories, start=offset + 1):
+            story['cursor'] = position
+        return stories
+    
+    @staticmethod
+    def _query_tag(search_query: str) -> Optional[str]:
+        """The tag a "#tag" search asks for, or ``None`` for a text search."""
+        query = search_query.strip()
+        return query[1:] if query.startswith("#") else None
+    
+    def _render_tag_buttons(self, label: str, tags: List[Tuple[str, int]], key: str, on_click) -> None:
+        """A row of buttons, one per ``(tag, count)``, that pass the tag to ``on_click``."""
+        if not tags:
+            return
+        st.caption(label)
+        cols = st.columns(len(tags))
+        for i, (tag, count) in enumerate(tags):
+            with cols[i]:
+                st.button(f"#{tag} ({count:,})", key=f"{key}_{i}", on_click=on_click, args=(tag,))
+    
+    @staticmethod
+    def _search_tag(tag: str) -> None:
+        """Search for a suggested tag."""
+        st.session_state.search_query = f"#{tag}"
+        # Recreated from search_query on this rerun
+        st.session_state.pop('main_search', None)
+    
+    def _render_search_tags(self, search_query: str) -> None:
+        """Complete a "#tag" search and suggest tags used together with it."""
+        tag = self._query_tag(search_query)
+        if not tag:
+            return
+        tag_index = get_tag_index()
+        completions = [(name, count) for name, count in tag_index.complete(tag, 5) if name != tag_index.name(tag)]
+        self._render_tag_buttons("🏷️ ట్యాగులు", completions, "tag_completion", self._search_tag)
+        if tag_index.count(tag):
+            self._render_tag_buttons("🔗 సంబంధిత ట్యాగులు", tag_index.related([tag]), "related_tag",
+                                     self._search_tag)
+    
+    @st.fragment
+    @fragment_body
+    def _render_search_box(self) -> None:
+        """Search box that suggests titles, authors and tags for the text typed so far.
+        
+        Entering text reruns only this fragment; the feed is filtered again only
+        when the search is run or a suggestion is picked.
+        """
+        draft = st.text_input(
+            "🔍 కథలను వెతకండి...",
+            value=st.session_state.search_query,
+            placeholder="శీర్షిక, రచయిత, కంటెంట్ లేదా #ట్యాగ్‌లో వెతకండి...",
+            key="main_search"
+        )
+        if draft == st.session_state.search_query:
+            return
+        if not draft.strip():
+            # Clearing the box shows the whole feed again
+            self._run_search("")
+        
+        suggestions = get_search_suggestions().suggest(draft)
+        for kind, label in self.SUGGESTION_LABELS.items():
+            found = [suggestion for suggestion in suggestions if suggestion.kind == kind]
+            if not found:
+                continue
+            st.caption(label)
+            cols = st.columns(len(found))
+            for i, suggestion in enumerate(found):
+                text = f"#{suggestion.text} ({suggestion.weight:,})" if kind == TAG else suggestion.text
+                with cols[i]:
+                    if st.button(text, key=f"suggestion_{kind}_{i}"):
+                        if kind == AUTHOR:
+                            st.session_state.author_page = suggestion.text
+                            st.session_state.pop('main_search', None)
+                            st.rerun()
+                        self._run_search(f"#{suggestion.text}" if kind == TAG else suggestion.text)
+        
+        if st.button("🔍 వెతకండి", key="run_search"):
+            self._run_search(draft)
+    
+    @staticmethod
+    def _run_search(search_query: str) -> None:
+        """Run a search: rerun the whole page with the feed filtered by ``search_query``."""
+        st.session_state.search_query = search_query
+        # Recreated from search_query on the next rerun
+        st.session_state.pop('main_search', None)
+        st.rerun()
+    
+    def _load_feed(self, search_query: str, selected_category: str, ranking: str = "new",
+                   author: Optional[str] = None) -> Tuple[List[Dict[str, Any]], bool]:
+        """Load the feed pages opened so far and report whether more stories exist."""
+        # Cursors are reset whenever the search, category, ranking or author changes,
+        # or when a substring search becomes a ranked one (its cursors count results instead)
+        search_kind = self._search_kind(search_query)
+        ranked_search = search_kind == "ranked"
+        feed_key = (search_query, selected_category, ranking, author, ranked_search)
+        if st.session_state.get('feed_key') != feed_key:
+            st.session_state.feed_key = feed_key
+            st.session_state.feed_cursors = [None]
+            st.session_state.feed_pages = []
+        
+        # Votes and reads keep moving stories of the hot, top and views feeds, so each of their pages
+        # is pinned once loaded and later pages skip the stories already shown
+        ranked_feed = search_kind is None and author is None and ranking != "new"
+        pin_first_page = not ranked_search and not ranked_feed
+        cursors = st.session_state.feed_cursors
+        pinned = st.session_state.feed_pages
+        stories = []
+        shown: Set[int] = set()
+        has_more = False
+        for page_number, cursor in enumerate(cursors):
+            if ranked_feed and page_number < len(pinned):
+                page_cursors, has_more = pinned[page_number]
+                page = self.store.get_stories_by_seq(list(page_cursors))
+                for story in page:
+                    story['cursor'] = page_cursors[story['seq']]
+            else:
+                # Fetch one extra story to learn whether another page exists
+                skipped = len(shown) if ranked_feed else 0
+                page = self._filter_stories(search_query, selected_category, self.FEED_PAGE_SIZE + 1 + skipped,
+                                            cursor, ranking, author, search_kind)
+                if ranked_feed:
+                    page = [story for story in page if story['seq'] not in shown]
+                has_more = len(page) > self.FEED_PAGE_SIZE
+                page = page[:self.FEED_PAGE_SIZE]
+                if ranked_feed:
+                    pinned.append(({story['seq']: story['cursor'] for story in page}, has_more))
+            if page_number == 0 and cursor is None and page and pin_first_page:
+                # Pin the first page so stories added later don't shift the pages already loaded
+                cursors[0] = page[0]['seq'] + 1
+            shown.update(story['seq'] for story in page)
+            stories.extend(page)
+        
+        # Show votes and views not yet written on top of the stored counters
+        self.votes.overlay(stories)
+        self.views.overlay(stories)
+        self.vote_states = self.votes.voter_states(st.session_state.voter_key, [s['id'] for s in stories])
+        return stories, has_more
     
     def _render_story_form(self) -> None:
         """Render the story submission form with enhanced validation."""
         st.markdown("## కొత్త కథ/రచన జోడించండి")
         
+        # Outside the form so that each entered tag reruns the page and gets completions
+        tags_input = st.text_input(
+            "ట్యాగులు (ఐచ్చికం)",
+            placeholder="కొన్ని కీవర్డ్లను కామాతో వేరు చేయండి... (ఉదా: ప్రేమ, కుటుంబం, స్నేహం)",
+            help="ట్యాగులు మీ కథను కనుగొనడంలో సహాయపడతాయి",
+            key="story_tags"
+        )
+        self._render_form_tags(tags_input)
+        
         with st.form("story_form", clear_on_submit=True):
             col1, col2 = st.columns([3, 1])
             
@@ -878,13 +985,6 @@ class TeluguStoriesApp:
                     unsafe_allow_html=True
                 )
             
-            # Tags input
-            tags_input = st.text_input(
-                "ట్యాగులు (ఐచ్చికం)",
-                placeholder="కొన్ని కీవర్డ్లను కామాతో వేరు చేయండి... (ఉదా: ప్రేమ, కుటుంబం, స్నేహం)",
-                help="ట్యాగులు మీ కథను కనుగొనడంలో సహాయపడతాయి"
-            )
-            
             # Form submission
             col1, col2, col3 = st.columns([1, 2, 1])
             
@@ -895,11 +995,7 @@ class TeluguStoriesApp:
                 )
             
             if submit_button:
-                # Process tags
-                tags = []
-                if tags_input:
-                    tags = [tag.strip() for tag in tags_input.split(',') if tag.strip()]
-                    tags = tags[:5]  # Limit to 5 tags
+                tags = story_rules.parse_tags(tags_input)
                 
                 # Validate form data
                 is_valid, error_message = self._validate_story_data(title, author, content, category)
@@ -909,20 +1005,45 @@ class TeluguStoriesApp:
                         self._add_new_story(title, author, category, content, tags)
                         st.success("✅ మీ కథ విజయవంతంగా జోడించబడింది!")
                         st.session_state.show_form = False
+                        st.session_state.pop('feed_key', None)
+                        st.session_state.pop('story_tags', None)
                         st.rerun()
                     except Exception as e:
                         st.error(f"❌ కథ జోడించడంలో లోపం: {str(e)}")
                 else:
                     st.error(f"❌ {error_message}")
     
+    def _render_form_tags(self, tags_input: str) -> None:
+        """Complete the tag being typed, or suggest tags used together with the ones entered."""
+        *entered, partial = tags_input.split(",")
+        entered = story_rules.clean_tags(entered)
+        if len(entered) >= story_rules.MAX_TAGS:
+            return
+        tag_index = get_tag_index()
+        if partial.strip():
+            label, suggestions = "🏷️ ట్యాగులు", tag_index.complete(partial, 5)
+        else:
+            label, suggestions = "🔗 సంబంధిత ట్యాగులు", tag_index.related(entered)
+        entered_keys = {tag_key(tag) for tag in entered}
+        suggestions = [(tag, count) for tag, count in suggestions if tag_key(tag) not in entered_keys]
+        self._render_tag_buttons(label, suggestions, "form_tag", self._complete_form_tag)
+    
+    @staticmethod
+    def _complete_form_tag(tag: str) -> None:
+        """Replace the tag being typed with a suggestion, ready for the next one."""
+        *entered, _ = st.session_state.story_tags.split(",")
+        st.session_state.story_tags = ", ".join(story_rules.clean_tags(entered + [tag])) + ", "
+    
     def _render_statistics(self) -> None:
         """Render platform statistics."""
         st.markdown("## 📊 వేదిక గణాంకాలు")
         
-        total_stories = len(st.session_state.stories)
-        total_authors = len(set(story['author'] for story in st.session_state.stories))
-        total_views = sum(story.get('views', 0) for story in st.session_state.stories)
-        total_upvotes = sum(story.get('upvotes', 0) for story in st.session_state.stories)
+        # Counters are maintained as stories, votes and views happen
+        stats = self.aggregates.snapshot()
+        total_stories = stats['total_stories']
+        total_authors = stats['total_authors']
+        total_views = stats['total_views']
+        total_upvotes = stats['total_upvotes']
         
         col1, col2, col3, col4 = st.columns(4)
         
@@ -939,10 +1060,7 @@ class TeluguStoriesApp:
             st.metric("మొత్తం లైక్స్", total_upvotes, delta="👍")
         
         # Category wise distribution
-        category_counts = {}
-        for story in st.session_state.stories:
-            category = story['category']
-            category_counts[category] = category_counts.get(category, 0) + 1
+        category_counts = stats['category_counts']
         
         if category_counts:
             st.markdown("### విభాగవారీ పంపిణీ")
@@ -952,6 +1070,74 @@ class TeluguStoriesApp:
                 with cols[i]:
                     percentage = (count / total_stories) * 100
                     st.metric(category, count, delta=f"{percentage:.1f}%")
+        
+        with st.expander("🔄 గణాంకాల సరిచూపు"):
+            st.caption("గణాంకాలను మొత్తం కథల నుండి మళ్లీ లెక్కించి సరిపోల్చండి")
+            if st.button("మళ్లీ లెక్కించండి", key="rebuild_statistics"):
+                # Buffered votes and views are already counted in the aggregates; write them first
+                self.votes.flush()
+                self.views.flush()
+                mismatched = self.aggregates.check_consistency(self.store)
+                if mismatched:
+                    get_platform_aggregates.clear()
+                    st.warning(f"సరిపోలని గణాంకాలు మళ్లీ లెక్కించబడ్డాయి: {', '.join(mismatched)}")
+                else:
+                    st.success("✅ గణాంకాలు సరిగ్గా ఉన్నాయి")
+    
+    def _render_author_page(self, name: str) -> None:
+        """Render an author's totals, category mix and stories, from the store's per-author rollup and index."""
+        author = self.store.get_author(name)
+        if author is None:
+            st.warning("ఈ రచయిత కథలు అందుబాటులో లేవు")
+            return
+        
+        st.markdown(f"## ✍️ {author['name']}")
+        if st.button("← అన్ని కథలు", key="close_author_page"):
+            st.session_state.author_page = None
+            st.rerun()
+        
+        # Votes and views still buffered in this process are added on the next flush
+        col1, col2, col3, col4 = st.columns(4)
+        
+        with col1:
+            st.metric("కథలు", author['stories'], delta="📚")
+        
+        with col2:
+            st.metric("వీక్షణలు", f"{author['views']:,}", delta="👀")
+        
+        with col3:
+            st.metric("లైక్స్", author['upvotes'], delta="👍")
+        
+        with col4:
+            st.metric("డిస్‌లైక్స్", author['downvotes'], delta="👎", delta_color="inverse")
+        
+        category_counts = author['category_counts']
+        if category_counts:
+            st.markdown("### విభాగవారీ పంపిణీ")
+            
+            cols = st.columns(len(category_counts))
+            for i, (category, count) in enumerate(category_counts.items()):
+                with cols[i]:
+                    percentage = (count / author['stories']) * 100
+                    st.metric(category, count, delta=f"{percentage:.1f}%")
+        
+        st.markdown(f"### {author['name']} కథలు")
+        stories, has_more = self._load_feed("", "అన్నీ", author=author['name'])
+        for story in stories:
+            self._render_story_card(story)
+            st.markdown("<br>", unsafe_allow_html=True)
+        
+        if has_more and st.button("⬇️ మరిన్ని కథలు", key="load_more_author", use_container_width=True):
+            st.session_state.feed_cursors.append(stories[-1]['cursor'])
+            st.rerun()
+    
+    def _render_debug_panel(self, metrics: RenderMetrics) -> None:
+        """Render per-page render timings in the sidebar (only with metrics enabled)."""
+        with st.sidebar.expander("🛠️ రెండర్ సమయాలు"):
+            for page, last in sorted(metrics.last_rerun.items()):
+                calls = ", ".join(f"{kind} {count}" for kind, count in sorted(last["calls"].items()))
+                st.caption(f"{page}: చివరి రన్ {last['seconds'] * 1000:.1f} ms • {calls}")
+            st.dataframe(metrics.summary(), hide_index=True)
     
     def _render_header(self) -> None:
         """Render the application header."""
@@ -970,25 +1156,40 @@ class TeluguStoriesApp:
         with col1:
             if st.button("🏠 హోమ్", use_container_width=True):
                 st.session_state.show_form = False
+                st.session_state.show_stats = False
+                st.session_state.author_page = None
+                # Start the feed again from the newest stories
+                st.session_state.pop('feed_key', None)
                 return "home"
         
         with col2:
             if st.button("➕ కథ వ్రాయండి", use_container_width=True):
                 st.session_state.show_form = True
+                st.session_state.show_stats = False
+                st.session_state.author_page = None
                 return "write"
         
         with col3:
             if st.button("📊 గణాంకాలు", use_container_width=True):
                 st.session_state.show_form = False
+                st.session_state.author_page = None
+                # Stay on the stats page across reruns (e.g. the consistency check button)
+                st.session_state.show_stats = True
                 return "stats"
         
         with col4:
             if st.button("ℹ️ గురించి", use_container_width=True):
+                st.session_state.show_stats = False
+                st.session_state.author_page = None
                 return "about"
         
         st.markdown("---")
         
-        return "home" if not st.session_state.show_form else "write"
+        if st.session_state.get('show_stats'):
+            return "stats"
+        if st.session_state.show_form:
+            return "write"
+        return "author" if st.session_state.author_page else "home"
     
     def _render_about_page(self) -> None:
         """Render the about page."""
@@ -1026,6 +1227,7 @@ class TeluguStoriesApp:
         
         # Navigation
         current_page = self._render_navigation()
+        note_page(current_page)
         
         if current_page == "about":
             self._render_about_page()
@@ -1039,22 +1241,20 @@ class TeluguStoriesApp:
             self._render_story_form()
             return
         
+        if current_page == "author":
+            self._render_author_page(st.session_state.author_page)
+            return
+        
         # Main content area - Home page
         st.markdown("## 🏠 తాజా కథలు")
         
         # Search and filter controls
-        col1, col2 = st.columns([3, 1])
+        col1, col2, col3 = st.columns([3, 1, 1])
         
         with col1:
-            search_query = st.text_input(
-                "🔍 కథలను వెతకండి...",
-                value=st.session_state.search_query,
-                placeholder="శీర్షిక, రచయిత లేదా కంటెంట్‌లో వెతకండి...",
-                key="main_search"
-            )
-            if search_query != st.session_state.search_query:
-                st.session_state.search_query = search_query
-                st.rerun()
+            self._render_search_box()
+        
+        self._render_search_tags(st.session_state.search_query)
         
         with col2:
             category_filter = st.selectbox(
@@ -1063,27 +1263,53 @@ class TeluguStoriesApp:
                 key="category_filter"
             )
         
-        # Filter and display stories
-        filtered_stories = self._filter_stories(
-            st.session_state.stories, 
+        with col3:
+            ranking = st.selectbox(
+                "క్రమం",
+                list(self.FEED_RANKINGS),
+                format_func=self.FEED_RANKINGS.get,
+                key="feed_ranking"
+            )
+        
+        # Filter and display stories, only the pages loaded so far
+        filtered_stories, has_more = self._load_feed(
             st.session_state.search_query, 
-            category_filter
+            category_filter,
+            ranking
         )
         
         if not filtered_stories:
             st.warning("🔍 మీ వెతుకులాట ప్రకారం కథలు లేవు. వేరే కీవర్డ్స్ ప్రయత్నించండి.")
         else:
-            st.markdown(f"**{len(filtered_stories)} కథలు దొరికాయి**")
+            if st.session_state.search_query.strip():
+                found = f"{len(filtered_stories)}{'+' if has_more else ''}"
+            else:
+                category = None if category_filter == "అన్నీ" else category_filter
+                found = self.aggregates.count_stories(category)
+            st.markdown(f"**{found} కథలు దొరికాయి**")
             
             # Display stories
-            for index, story in enumerate(filtered_stories):
-                self._render_story_card(story, index)
+            for story in filtered_stories:
+                self._render_story_card(story)
                 
                 # Add some spacing between cards
                 st.markdown("<br>", unsafe_allow_html=True)
+            
+            if has_more and st.button("⬇️ మరిన్ని కథలు", key="load_more", use_container_width=True):
+                st.session_state.feed_cursors.append(filtered_stories[-1]['cursor'])
+                st.rerun()
 
 
 # Application entry point
 if __name__ == "__main__":
-    app = TeluguStoriesApp()
-    app.run()
+    if METRICS_ENABLED:
+        metrics = get_render_metrics()
+        st = metrics.counting(st)
+        metrics.instrument(TeluguStoriesApp)
+        with metrics.rerun():
+            app = TeluguStoriesApp()
+            app.run()
+        app._render_debug_panel(metrics)
+    else:
+        app = TeluguStoriesApp()
+        app.run()
@@ -0,0 +1,126 @@
+"""Author pages: per-author rollups and index versus scanning every story.
+
+Usage::
+
+    python -m benchmarks.bench_authors --sizes 10000 100000
+
+For each size a SQLite store is filled with generated stories, one in ten
+with its author's name spelled differently (extra whitespace, decomposed
+Unicode, a zero-width non-joiner). The benchmark times the rollup and first
+page of stories an author page reads. It compares them with the scan that
+computing the same totals from the stories would need, both in SQL (a
+``GROUP BY`` over the whole table) and in Python (``iter_stories``). It also
+times a batch of 500 vote events, which now moves the rollups too. The
+rollups are then checked against the scan, and the number of distinct raw
+names is compared with the number of author keys.
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+import unicodedata
+import uuid
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.corpus import generate_stories  # noqa: E402
+from dedup import author_key  # noqa: E402
+from story_store import DOWNVOTED, UPVOTED, SQLiteStoryStore  # noqa: E402
+
+PAGE_SIZE = 10
+
+_SCAN_AUTHORS = ("SELECT author_key, COUNT(*), SUM(views), SUM(upvotes), SUM(downvotes) "
+                 "FROM stories GROUP BY author_key")
+_ROLLUPS = "SELECT author_key, stories, views, upvotes, downvotes FROM authors"
+
+
+def _variant(name: str, rng: random.Random) -> str:
+    """Another spelling of ``name`` that ``dedup.author_key`` maps to the same key."""
+    return rng.choice([
+        lambda: f"  {name}  ",
+        lambda: name.replace(" ", "   "),
+        lambda: unicodedata.normalize("NFD", name),
+        lambda: name.replace(" ", "‌ "),
+    ])()
+
+
+def _timed(func: Callable[[], Any], repeat: int = 5) -> float:
+    """Best-of-``repeat`` wall time in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def _python_scan(store: SQLiteStoryStore, name: str) -> Dict[str, int]:
+    key = author_key(name)
+    totals = {"stories": 0, "views": 0}
+    for story in store.iter_stories():
+        if author_key(story["author"]) == key:
+            totals["stories"] += 1
+            totals["views"] += story["views"]
+    return totals
+
+
+def run(size: int) -> None:
+    rng = random.Random(size)
+    stories: List[Dict[str, Any]] = []
+    for story in generate_stories(size):
+        if rng.random() < 0.1:
+            story["author"] = _variant(story["author"], rng)
+        stories.append(story)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "stories.db")
+        store = SQLiteStoryStore(path)
+        start = time.perf_counter()
+        for offset in range(0, size, 1000):
+            store.add_stories(stories[offset:offset + 1000])
+        insert_s = time.perf_counter() - start
+        raw_names = len({story["author"] for story in stories})
+        keys = len(list(store.iter_authors()))
+        print(f"{size:>9} stories by {keys} authors ({raw_names} raw spellings), "
+              f"written in {insert_s:.1f} s ({size / insert_s:,.0f} stories/s)")
+
+        name = stories[-1]["author"]
+        profile_ms = _timed(lambda: (store.get_author(name), store.list_author_stories(name, PAGE_SIZE + 1)))
+        author = store.get_author(name)
+        with sqlite3.connect(path) as conn:
+            sql_scan_ms = _timed(lambda: conn.execute(_SCAN_AUTHORS).fetchall(), repeat=3)
+            python_scan_ms = _timed(lambda: _python_scan(store, name), repeat=1)
+            print(f"  author page ({author['stories']} stories): rollup and first page {profile_ms:8.3f} ms, "
+                  f"SQL scan {sql_scan_ms:8.1f} ms, Python scan {python_scan_ms:8.1f} ms")
+
+            events = [(rng.choice(stories)["id"], uuid.uuid4().hex, rng.choice((UPVOTED, DOWNVOTED)), 0.0)
+                      for _ in range(500)]
+            start = time.perf_counter()
+            store.apply_vote_events(events)
+            print(f"  500 vote events with rollups: {(time.perf_counter() - start) * 1000:.1f} ms")
+            store.apply_view_batch({story["id"]: 3 for story in rng.sample(stories, 500)}, {})
+
+            scanned = {row[0]: row[1:] for row in conn.execute(_SCAN_AUTHORS)}
+            rolled_up = {row[0]: row[1:] for row in conn.execute(_ROLLUPS)}
+        store.close()
+        if scanned != rolled_up:
+            wrong = sum(1 for key in scanned if scanned[key] != rolled_up.get(key))
+            raise AssertionError(f"{wrong} author rollups differ from a scan of the stories")
+        print(f"  all {len(rolled_up)} rollups match a scan of the stories")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    args = parser.parse_args()
+    for size in args.sizes:
+        run(size)
+
+
+if __name__ == "__main__":
+    main()
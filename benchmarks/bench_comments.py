@@ -0,0 +1,153 @@
+"""Threaded comments on one story: write rate, page reads at any depth, counter accuracy.
+
+Usage::
+
+    python -m benchmarks.bench_comments --comments 50000 --wide 5000 --deep 1000
+
+Fills a SQLite store with one story holding ``comments`` comments: top-level
+comments with a few random replies each, one comment with ``wide`` direct
+replies and one chain ``deep`` replies long. Reports the insert rate, the time
+to read a page of top-level comments at the start and deep into the story by
+cursor, and a page of replies below the wide comment and the head of the
+chain. The story's maintained comment counter is compared with ``COUNT(*)``,
+and the thread order of both stores is checked against a tree walk.
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.corpus import generate_stories  # noqa: E402
+from story_rules import build_comment  # noqa: E402
+from story_store import MemoryStoryStore, SQLiteStoryStore, StoryStore  # noqa: E402
+
+PAGE_SIZE = 20
+
+
+def _reply(store: StoryStore, story_id: str, parent_id, number: int) -> Dict:
+    return store.add_comment(build_comment(story_id, f"పాఠకుడు {number % 97}", f"వ్యాఖ్య {number}", parent_id))
+
+
+def _time_page(read: Callable[[], List[Dict]], runs: int = 50) -> float:
+    """Median milliseconds of ``read``."""
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        read()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def _check_order(store: StoryStore, story_id: str, size: int, rng: random.Random) -> None:
+    """Compare top-level pages and reply pages with a walk of the tree as it was written."""
+    children: Dict = {None: []}
+    for number in range(size):
+        parent = rng.choice([None, None] + list(children)[1:])
+        comment = _reply(store, story_id, parent, number)
+        children[parent].append(comment["id"])
+        children[comment["id"]] = []
+
+    def walk(comment_id: str) -> List[str]:
+        return [x for child in children[comment_id] for x in [child] + walk(child)]
+
+    # Pages of three, so the cursors are used
+    top, before = [], None
+    while True:
+        page = store.list_comments(story_id, 3, before)
+        if not page:
+            break
+        top += [c["id"] for c in page]
+        before = page[-1]["path"]
+    if top != children[None][::-1]:
+        raise AssertionError(f"{type(store).__name__}: top-level comments out of order")
+    for comment_id in children[None]:
+        replies, after = [], None
+        while True:
+            page = store.list_replies(comment_id, 3, after)
+            if not page:
+                break
+            replies += [c["id"] for c in page]
+            after = page[-1]["path"]
+        if replies != walk(comment_id):
+            raise AssertionError(f"{type(store).__name__}: replies of {comment_id} out of order")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--comments", type=int, default=50000, help="comments on the story")
+    parser.add_argument("--wide", type=int, default=5000, help="direct replies to one comment")
+    parser.add_argument("--deep", type=int, default=1000, help="length of one reply chain")
+    args = parser.parse_args()
+
+    rng = random.Random(17)
+    story = next(generate_stories(1))
+    with tempfile.TemporaryDirectory() as directory:
+        for store in (MemoryStoryStore(), SQLiteStoryStore(os.path.join(directory, "order.db"))):
+            store.add_stories([dict(story)])
+            _check_order(store, story["id"], 300, rng)
+            store.close()
+        print("thread order of the memory and SQLite stores matches a walk of the tree")
+
+        path = os.path.join(directory, "stories.db")
+        store = SQLiteStoryStore(path)
+        store.add_stories([dict(story)])
+        story_id = story["id"]
+
+        start = time.perf_counter()
+        wide_parent = _reply(store, story_id, None, 0)
+        chain = [_reply(store, story_id, None, 1)]
+        for number in range(args.wide):
+            _reply(store, story_id, wide_parent["id"], number)
+        for number in range(args.deep):
+            chain.append(_reply(store, story_id, chain[-1]["id"], number))
+        written = 2 + args.wide + args.deep
+        top_level = []
+        while written < args.comments:
+            parent = rng.choice(top_level) if top_level and rng.random() < 0.3 else None
+            comment = _reply(store, story_id, parent, written)
+            if parent is None:
+                top_level.append(comment["id"])
+            written += 1
+        elapsed = time.perf_counter() - start
+        print(f"wrote {written} comments in {elapsed:.1f} s ({written / elapsed:,.0f} comments/s), "
+              f"chain depth {chain[-1]['depth']}")
+
+        first = store.list_comments(story_id, PAGE_SIZE)
+        # The cursor of a page near the oldest comments, as reached by "load more"
+        with sqlite3.connect(path) as conn:
+            deep_cursor = conn.execute(
+                "SELECT path FROM comments WHERE story_id = ? AND depth = 0 ORDER BY path LIMIT 1 OFFSET ?",
+                (story_id, PAGE_SIZE)).fetchone()[0]
+            counted = conn.execute("SELECT COUNT(*) FROM comments WHERE story_id = ?", (story_id,)).fetchone()[0]
+        print(f"top-level page, newest:          {_time_page(lambda: store.list_comments(story_id, PAGE_SIZE)):6.3f} ms")
+        print(f"top-level page, oldest:          "
+              f"{_time_page(lambda: store.list_comments(story_id, PAGE_SIZE, deep_cursor)):6.3f} ms")
+        print(f"replies page, {args.wide} siblings:     "
+              f"{_time_page(lambda: store.list_replies(wide_parent['id'], PAGE_SIZE)):6.3f} ms")
+        middle = store.list_replies(chain[0]["id"], 1, chain[args.deep // 2]["path"])
+        print(f"replies page, chain of {args.deep}:     "
+              f"{_time_page(lambda: store.list_replies(chain[0]['id'], PAGE_SIZE)):6.3f} ms")
+        print(f"replies page, middle of chain:   "
+              f"{_time_page(lambda: store.list_replies(chain[0]['id'], PAGE_SIZE, middle[0]['path'])):6.3f} ms")
+        if len(first) != PAGE_SIZE:
+            raise AssertionError(f"first page has {len(first)} comments")
+
+        counter = store.get_story(story_id)["comments"]
+        expected = story.get("comments", 0) + counted
+        print(f"comment counter {counter}, COUNT(*) {counted} plus {story.get('comments', 0)} seeded: "
+              f"{'consistent' if counter == expected else 'MISMATCH'}")
+        store.close()
+        if counter != expected:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Duplicate checks: the old title scan versus the title-key and LSH indexes.
+
+Usage::
+
+    python -m benchmarks.bench_dedup --sizes 10000 100000 1000000
+
+For each corpus size this reports the per-submission cost of the exact
+title check (old list scan versus the indexed ``title_key`` lookup), of the
+near-duplicate lookup, and of computing the MinHash signature on insert. It
+also checks that lightly edited copies of stored stories are caught and
+counts how often unrelated stories are flagged.
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from itertools import islice
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.corpus import generate_stories  # noqa: E402
+from dedup import content_signature, most_similar  # noqa: E402
+from story_store import SQLiteStoryStore  # noqa: E402
+
+PROBES = 200
+
+
+def _timed(func: Callable[[], Any], repeat: int = 3) -> float:
+    """Best-of-``repeat`` wall time in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def _legacy_title_exists(titles: List[str], title: str) -> bool:
+    """The original check: lower-case every title in session state and compare."""
+    existing_titles = [t.lower() for t in titles]
+    return title.lower() in existing_titles
+
+
+def _edited(story: Dict[str, Any], rng: random.Random) -> str:
+    """A resubmission with a few words dropped and a sentence appended."""
+    words = story["content"].split()
+    for _ in range(max(len(words) // 50, 1)):
+        words.pop(rng.randrange(len(words)))
+    return " ".join(words) + " ఇది కొంచెం మార్చిన కథ."
+
+
+def run(size: int) -> None:
+    rng = random.Random(size)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SQLiteStoryStore(os.path.join(tmp, "bench.db"))
+        titles: List[str] = []
+        samples: List[Dict[str, Any]] = []
+        stories = generate_stories(size)
+        start = time.perf_counter()
+        while True:
+            batch = list(islice(stories, 50000))
+            if not batch:
+                break
+            store.add_stories(batch)
+            titles.extend(s["title"] for s in batch)
+            samples.extend(rng.sample(batch, min(PROBES, len(batch))))
+        load_s = time.perf_counter() - start
+        probes = rng.sample(samples, min(PROBES, len(samples)))
+        unrelated = list(generate_stories(PROBES, seed=size + 1))
+
+        legacy_ms = _timed(lambda: _legacy_title_exists(titles, probes[0]["title"] + "?"), repeat=1)
+        indexed_ms = _timed(lambda: [store.title_exists(p["title"] + "?") for p in probes]) / len(probes)
+        signature_ms = _timed(lambda: [content_signature(p["content"]) for p in probes]) / len(probes)
+
+        edited = [content_signature(_edited(p, rng)) for p in probes]
+        near_ms = _timed(lambda: [most_similar(s, store.find_similar_content(s)) for s in edited]) / len(edited)
+        caught = sum(1 for probe, signature in zip(probes, edited)
+                     if (most_similar(signature, store.find_similar_content(signature)) or {}).get("id") == probe["id"])
+        flagged = 0
+        for story in unrelated:
+            signature = content_signature(story["content"])
+            flagged += most_similar(signature, store.find_similar_content(signature)) is not None
+        store.close()
+
+    print(f"{size:>9} stories, loaded in {load_s:.1f} s")
+    print(f"  title check: list scan {legacy_ms:.2f} ms, title_key index {indexed_ms:.3f} ms")
+    print(f"  signature {signature_ms:.3f} ms/story, near-duplicate lookup {near_ms:.3f} ms")
+    print(f"  edited copies caught {caught}/{len(probes)}, unrelated stories flagged {flagged}/{len(unrelated)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    args = parser.parse_args()
+    for size in args.sizes:
+        run(size)
+
+
+if __name__ == "__main__":
+    main()
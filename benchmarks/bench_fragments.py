@@ -0,0 +1,151 @@
+"""A vote on a long feed: whole-script rerun versus a rerun of the voted card's fragment.
+
+Usage::
+
+    python -m benchmarks.bench_fragments --cards 200 --votes 30
+    python -m benchmarks.bench_fragments --script old_app.py   # e.g. a checkout before fragments
+
+Opens ``cards`` stories of the home feed under ``AppTest`` ("load more" until
+they are shown), then presses upvote buttons in turn. Each vote is timed as
+Streamlit would run it:
+
+* ``full``: the whole script reruns, as for a widget outside any fragment.
+* ``card``: only the card's fragment reruns, as the browser requests when the
+  button belongs to one. Skipped when the script does not put cards in fragments.
+
+For each, the median time from script start to stop, the same including
+``AppTest``'s own work (building the element tree of the whole page), and the
+number and size of the delta messages the rerun sends are reported. ``AppTest`` always reruns the whole script, so
+fragment reruns are requested through a ``LocalScriptRunner`` subclass that
+adds the card's fragment id to the rerun request, like the browser does.
+"""
+
+import argparse
+import dataclasses
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.corpus import generate_stories  # noqa: E402
+
+from streamlit.runtime.scriptrunner import ScriptRunnerEvent  # noqa: E402
+from streamlit.runtime.scriptrunner_utils.script_requests import ScriptRequests  # noqa: E402
+from streamlit.testing.v1 import AppTest, app_test  # noqa: E402
+from streamlit.testing.v1.local_script_runner import LocalScriptRunner  # noqa: E402
+
+_STOPPED = {ScriptRunnerEvent.SCRIPT_STOPPED_WITH_SUCCESS, ScriptRunnerEvent.FRAGMENT_STOPPED_WITH_SUCCESS,
+            ScriptRunnerEvent.SCRIPT_STOPPED_FOR_RERUN}
+
+
+class _FragmentScriptRunner(LocalScriptRunner):
+    """Runs the fragment in ``fragment_id`` instead of the whole script, when set."""
+
+    fragment_id: Optional[str] = None
+    # Forward messages of the last run and the seconds from script start to stop
+    messages: list = []
+    script_seconds = 0.0
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._started = 0.0
+
+        def time_script(sender, event, **data):
+            if event == ScriptRunnerEvent.SCRIPT_STARTED and not self._started:
+                self._started = time.perf_counter()
+            elif event in _STOPPED:
+                _FragmentScriptRunner.script_seconds = time.perf_counter() - self._started
+        self.on_event.connect(time_script, weak=False)
+
+    def request_rerun(self, rerun_data):
+        if _FragmentScriptRunner.fragment_id:
+            # A new runner starts with a pending whole-script request that would absorb this one
+            self._requests = ScriptRequests()
+            rerun_data = dataclasses.replace(rerun_data, fragment_id_queue=[_FragmentScriptRunner.fragment_id])
+        return super().request_rerun(rerun_data)
+
+    def run(self, *args, **kwargs):
+        tree = super().run(*args, **kwargs)
+        _FragmentScriptRunner.messages = list(self.forward_msgs())
+        return tree
+
+
+def _deltas(fragment_id: Optional[str] = None) -> List:
+    """Delta messages of the last run; only the fragment's own for a fragment run."""
+    return [m for m in _FragmentScriptRunner.messages
+            if m.HasField("delta") and (fragment_id is None or m.delta.fragment_id == fragment_id)]
+
+
+def _button_fragments() -> Dict[str, str]:
+    """Fragment id of each button rendered in the last run, by widget id ("" outside fragments)."""
+    return {m.delta.new_element.button.id: m.delta.fragment_id for m in _deltas()
+            if m.delta.HasField("new_element") and m.delta.new_element.HasField("button")}
+
+
+def _vote(at: AppTest, scope: str, number: int) -> Dict[str, float]:
+    upvotes = [b for b in at.button if (b.key or "").startswith("upvote_")]
+    button = upvotes[number % len(upvotes)]
+    fragment_id = None
+    if scope == "card":
+        fragment_id = _button_fragments().get(button.id)
+        if not fragment_id:
+            raise LookupError("the story cards are not fragments in this script")
+    _FragmentScriptRunner.fragment_id = fragment_id
+    try:
+        start = time.perf_counter()
+        button.click().run()
+        seconds = time.perf_counter() - start
+    finally:
+        _FragmentScriptRunner.fragment_id = None
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    deltas = _deltas(fragment_id)
+    return {"ms": seconds * 1000, "script_ms": _FragmentScriptRunner.script_seconds * 1000,
+            "messages": len(deltas), "bytes": sum(m.ByteSize() for m in deltas)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cards", type=int, default=200, help="story cards on the page")
+    parser.add_argument("--votes", type=int, default=30, help="timed votes per scope")
+    parser.add_argument("--script", default=os.path.join(ROOT, "app.py"))
+    args = parser.parse_args()
+
+    # Every Streamlit call outside a script run would log a warning
+    logging.disable(logging.WARNING)
+    app_test.LocalScriptRunner = _FragmentScriptRunner
+    with tempfile.TemporaryDirectory() as directory:
+        # Read by app.py on every script run
+        os.environ["TELUGU_STORIES_BACKEND"] = "sqlite"
+        os.environ["TELUGU_STORIES_DB"] = os.path.join(directory, "stories.db")
+        from story_store import SQLiteStoryStore
+        store = SQLiteStoryStore(os.environ["TELUGU_STORIES_DB"])
+        store.add_stories(list(generate_stories(args.cards + 10)))
+        store.close()
+
+        at = AppTest.from_file(os.path.abspath(args.script), default_timeout=120).run()
+        while len([b for b in at.button if (b.key or "").startswith("upvote_")]) < args.cards:
+            at.button(key="load_more").click().run()
+        cards = len([b for b in at.button if (b.key or "").startswith("upvote_")])
+        print(f"{cards} cards on the page, {len(_deltas())} delta messages in a full rerun")
+
+        for scope in ("full", "card"):
+            try:
+                samples = [_vote(at, scope, number) for number in range(args.votes)]
+            except LookupError as exc:
+                print(f"{scope:<5} skipped: {exc}")
+                continue
+            print(f"{scope:<5} vote: script {statistics.median(s['script_ms'] for s in samples):7.1f} ms, "
+                  f"with AppTest {statistics.median(s['ms'] for s in samples):7.1f} ms, "
+                  f"{statistics.median(s['messages'] for s in samples):5.0f} delta messages, "
+                  f"{statistics.median(s['bytes'] for s in samples) / 1024:7.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Bulk NDJSON import and export through ``story_io``.
+
+Usage::
+
+    python -m benchmarks.bench_import --size 100000 --workers 4
+
+Writes ``size`` generated stories to an NDJSON file, with one line in a
+hundred replaced by a malformed line, an exact duplicate title or an edited
+copy of an earlier story, and imports it into a fresh SQLite database. Reports
+the import rate and the reject reasons (the generator repeats some titles), then
+exports in id and in time order and checks that a re-import of the export
+rejects every line as a duplicate of what is already stored.
+"""
+
+import argparse
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.corpus import generate_stories  # noqa: E402
+from story_io import StoryImporter, export_stories, parse_lines  # noqa: E402
+from story_store import SQLiteStoryStore  # noqa: E402
+
+PLANTED_EVERY = 100
+
+
+def _write_source(path: str, size: int) -> int:
+    """Write the import file; returns how many lines should be rejected."""
+    rng = random.Random(size)
+    planted = 0
+    earlier = []
+    with open(path, "w", encoding="utf-8") as out:
+        for number, story in enumerate(generate_stories(size)):
+            if number % PLANTED_EVERY == PLANTED_EVERY - 1 and earlier:
+                copy = dict(rng.choice(earlier))
+                kind = planted % 3
+                if kind == 0:
+                    out.write('{"title": "broken\n')
+                    planted += 1
+                    continue
+                copy["id"] = f"copy-{number}"
+                if kind == 1:
+                    copy["content"] = story["content"]
+                else:
+                    copy["title"] = story["title"]
+                    words = copy["content"].split(" ")
+                    words[len(words) // 2] = "మార్పు"
+                    copy["content"] = " ".join(words)
+                story = copy
+                planted += 1
+            elif len(earlier) < 1000:
+                earlier.append(story)
+            out.write(json.dumps(story, ensure_ascii=False) + "\n")
+    return planted
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=100000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        source = os.path.join(directory, "stories.ndjson")
+        planted = _write_source(source, args.size)
+        store = SQLiteStoryStore(os.path.join(directory, "stories.db"))
+
+        importer = StoryImporter(store, args.batch_size, workers=args.workers)
+        rejects = io.StringIO()
+        start = time.perf_counter()
+        with open(source, encoding="utf-8") as lines:
+            importer.run(parse_lines(lines), rejects)
+        elapsed = time.perf_counter() - start
+        print(f"import  {args.size:>9} lines in {elapsed:6.1f} s ({args.size / elapsed:,.0f} lines/s, "
+              f"{args.workers} workers), "
+              f"{importer.imported} stored, {importer.rejected} rejected")
+        if importer.rejected < planted or importer.imported != store.count_stories():
+            raise AssertionError(f"expected at least {planted} rejects, got {importer.rejected}")
+        reasons = Counter(json.loads(line)["error"].split(":")[0] for line in rejects.getvalue().splitlines())
+        print(f"  {planted} planted lines; rejects by reason: "
+              + ", ".join(f"{reason} {count}" for reason, count in reasons.most_common()))
+
+        for order in ("id", "time"):
+            export = os.path.join(directory, f"export-{order}.ndjson")
+            start = time.perf_counter()
+            with open(export, "w", encoding="utf-8") as out:
+                count = export_stories(store, out, order)
+            elapsed = time.perf_counter() - start
+            print(f"export  {count:>9} stories by {order:<4} in {elapsed:6.1f} s ({count / elapsed:,.0f} stories/s)")
+            if count != importer.imported:
+                raise AssertionError("export does not match the stored stories")
+
+        again = StoryImporter(store, args.batch_size, near_duplicates=False)
+        with open(export, encoding="utf-8") as lines:
+            again.run(parse_lines(lines))
+        if again.imported:
+            raise AssertionError(f"re-import stored {again.imported} duplicates")
+        print(f"re-import of the export rejected all {again.rejected} stories as duplicates")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Latin-script search: a feed page for a romanized query against the same query in Telugu.
+
+Usage::
+
+    python -m benchmarks.bench_latin_search --size 100000 --queries 300
+
+Stores ``size`` generated stories in a SQLite store and builds the Latin
+search index from their stored keys. Queries are one or two words of a
+random story's title, author or tag, typed the way readers write Telugu in
+Roman letters ("aa" or "a" for ā, "ee" for ī, "sh" for ś, "n" for an
+anusvara). Times a page of ``--limit`` stories for each query through the
+Latin index against the Telugu words through the substring index and through
+ranked search, as the search bar would run them. Matches are checked against
+a scan of every stored key, and a few queries are also timed romanizing every
+story's title, author and tags at query time.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import unicodedata
+from typing import Callable, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.corpus import generate_stories  # noqa: E402
+from latin_search import LatinSearchIndex  # noqa: E402
+from ranked_search import RankedSearchIndex  # noqa: E402
+from search_index import StorySearchIndex  # noqa: E402
+from story_store import SQLiteStoryStore, latin_text  # noqa: E402
+from transliteration import latin_key, romanize  # noqa: E402
+
+# ISO 15919 letters and how readers might type them instead
+_TYPED = {"ā": ("aa", "a"), "ī": ("ee", "i"), "ū": ("oo", "u"), "ē": ("e",), "ō": ("o",),
+          "ś": ("sh", "s"), "ṣ": ("sh",), "ṁ": ("m", "n"), "r̥": ("ru", "ri")}
+
+
+def _typed(text: str, rng: random.Random) -> str:
+    """``text`` romanized and typed without diacritics, as in RTS-style chat."""
+    typed = unicodedata.normalize("NFC", romanize(text))
+    for letter, spellings in _TYPED.items():
+        typed = typed.replace(letter, rng.choice(spellings))
+    return "".join(c for c in unicodedata.normalize("NFD", typed) if not unicodedata.combining(c))
+
+
+def _query(stories: List[dict], rng: random.Random) -> Tuple[str, str]:
+    """One or two words of a random story's title, author or tag, in Telugu and typed in Latin script."""
+    story = rng.choice(stories)
+    words = rng.choice([story["title"], story["author"], *story["tags"]]).split(" ")
+    start = rng.randrange(len(words))
+    native = " ".join(words[start:start + rng.randint(1, 2)])
+    return native, _typed(native, rng)
+
+
+def _timed(func: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    func()
+    return (time.perf_counter() - start) * 1000
+
+
+def _report(name: str, samples: List[float]) -> None:
+    samples = sorted(samples)
+    print(f"  {name:<28} median {statistics.median(samples):8.2f} ms, p99 {samples[int(len(samples) * 0.99)]:8.2f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--limit", type=int, default=11, help="stories per page (a feed page plus one)")
+    args = parser.parse_args()
+
+    stories = list(generate_stories(args.size))
+    with tempfile.TemporaryDirectory() as directory:
+        store = SQLiteStoryStore(os.path.join(directory, "stories.db"))
+        start = time.perf_counter()
+        for offset in range(0, args.size, 1000):
+            store.add_stories(stories[offset:offset + 1000])
+        print(f"{args.size} stories stored with their Latin keys in {time.perf_counter() - start:.1f} s")
+        start = time.perf_counter()
+        index = LatinSearchIndex.from_store(store)
+        print(f"  Latin index built in {time.perf_counter() - start:.1f} s ({len(index._postings)} trigrams)")
+        search_index = StorySearchIndex.from_store(store)
+        ranked = RankedSearchIndex()
+        ranked.catch_up(store)
+
+        rng = random.Random(22)
+        queries = [_query(stories, rng) for _ in range(args.queries)]
+        for native, typed in queries[:50]:
+            key = latin_key(typed)
+            # Keys too short for a trigram are not searched in Latin script
+            expected = sorted((seq for seq, text in index._texts.items() if key in text), reverse=True) \
+                if len(key) >= index.NGRAM_SIZE else []
+            if index.matches(typed) != expected:
+                raise AssertionError(f"matches of {typed!r} differ from a scan of every stored key")
+
+        latin_ms, substring_ms, ranked_ms, found = [], [], [], []
+        for native, typed in queries:
+            latin_ms.append(_timed(lambda: store.search_stories(
+                "", None, index.matches(typed, None, args.limit), args.limit)))
+            substring_ms.append(_timed(lambda: store.search_stories(
+                native, None, search_index.candidates(native), args.limit)))
+            ranked_ms.append(_timed(lambda: store.get_stories_by_seq(
+                [seq for _, seq in ranked.search(native, args.limit)])))
+            found.append(len(index.matches(typed)))
+        print(f"{len(queries)} queries such as {queries[0][1]!r} for {queries[0][0]!r}, "
+              f"median {statistics.median(found):,.0f} matching stories (max {max(found):,}):")
+        _report("Latin index", latin_ms)
+        _report("Telugu, substring index", substring_ms)
+        _report("Telugu, ranked search", ranked_ms)
+
+        def romanize_every_story(typed: str) -> List[dict]:
+            key = latin_key(typed)
+            seqs = [seq for seq, story in enumerate(stories, start=1) if key in latin_text(story)]
+            return store.search_stories("", None, seqs[::-1], args.limit)
+
+        _report("romanizing every story", [_timed(lambda: romanize_every_story(typed)) for _, typed in queries[:5]])
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""Feed working set: compact story records with bodies kept apart, against whole stories.
+
+Usage::
+
+    python -m benchmarks.bench_memory --size 1000000 --sqlite-size 100000 --body-scale 10
+
+Memory backend: measures, on a sample of generated stories scaled up to
+``size``, what ``MemoryStoryStore`` used to keep per story (a dict holding
+the body next to every feed field and counter) against what it keeps now: a
+``StoryRecord`` with the counters in one array per field, and the bodies in
+a list of their own that only the full-story view and the indexes read.
+Generated bodies are a few sentences; ``--body-scale`` repeats each one that
+many times to model longer stories.
+
+SQLite backend: stores ``sqlite-size`` stories and reports the pages of the
+``stories`` table, which feed pages, rankings and statistics read, against
+``story_bodies``. It then times a scan of the ranking columns on ``stories``
+and on a copy of the table with the bodies inline, as it was before.
+"""
+
+import argparse
+import gc
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+from array import array
+from itertools import islice
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.corpus import generate_stories  # noqa: E402
+from story_store import COUNTER_FIELDS, SQLiteStoryStore, StoryRecord, with_previews  # noqa: E402
+
+SAMPLE_SIZE = 10000
+_SCAN = "SELECT seq, category, created_at, upvotes, downvotes, views FROM {}"
+
+
+def _whole(stories: List[Dict[str, Any]]) -> Any:
+    return [{"version": 1, "tags": [], **with_previews(story), "seq": seq}
+            for seq, story in enumerate(stories, start=1)]
+
+
+def _records(stories: List[Dict[str, Any]]) -> Any:
+    records = [StoryRecord({"version": 1, "tags": [], **with_previews(story), "seq": seq})
+               for seq, story in enumerate(stories, start=1)]
+    counters = {field: array("q", (story.get(field, 0) for story in stories)) for field in COUNTER_FIELDS}
+    return records, counters
+
+
+def _bodies(stories: List[Dict[str, Any]]) -> Any:
+    return [story["content"] for story in stories]
+
+
+def _sampled_bytes(size: int, body_scale: int, build: Callable[[List[Dict[str, Any]]], Any]) -> int:
+    """Memory ``build`` keeps for a sample of generated stories, scaled to ``size``."""
+    sample = min(size, SAMPLE_SIZE)
+    gc.collect()
+    tracemalloc.start()
+    stories = [dict(story, content=" ".join([story["content"]] * body_scale))
+               for story in generate_stories(sample)]
+    kept = build(stories)
+    del stories
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return int(current * size / sample)
+
+
+def _timed(func: Callable[[], Any], repeat: int = 3) -> float:
+    """Best-of-``repeat`` wall time in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def run_memory(size: int, body_scale: int) -> None:
+    whole = _sampled_bytes(size, body_scale, _whole)
+    records = _sampled_bytes(size, body_scale, _records)
+    bodies = _sampled_bytes(size, body_scale, _bodies)
+    print(f"memory backend, {size} stories (sampled from {min(size, SAMPLE_SIZE)}), bodies x{body_scale}:")
+    print(f"  {'whole story dicts':<30} {whole / 2 ** 20:>9.1f} MB {whole / size:>7.0f} B/story")
+    print(f"  {'records + counter arrays':<30} {records / 2 ** 20:>9.1f} MB {records / size:>7.0f} B/story")
+    print(f"  {'bodies, read on demand':<30} {bodies / 2 ** 20:>9.1f} MB {bodies / size:>7.0f} B/story")
+    print(f"  feed working set {whole / records:.1f}x smaller")
+
+
+def run_sqlite(size: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        store = SQLiteStoryStore(path)
+        stories = generate_stories(size)
+        while True:
+            batch = list(islice(stories, 50000))
+            if not batch:
+                break
+            store.add_stories(batch)
+        store.close()
+
+        conn = sqlite3.connect(path)
+        conn.execute("CREATE TABLE inline_stories AS SELECT * FROM stories JOIN story_bodies USING (seq)")
+        conn.commit()
+        print(f"SQLite backend, {size} stories:")
+        for table in ("stories", "story_bodies", "inline_stories"):
+            (pages,) = conn.execute("SELECT SUM(pgsize) FROM dbstat WHERE name = ?", (table,)).fetchone()
+            print(f"  {table:<30} {pages / 2 ** 20:>9.1f} MB")
+        for table in ("stories", "inline_stories"):
+            scan_ms = _timed(lambda: conn.execute(_SCAN.format(table)).fetchall())
+            print(f"  ranking columns from {table:<16} {scan_ms:>9.1f} ms")
+        conn.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=1000000)
+    parser.add_argument("--sqlite-size", type=int, default=100000,
+                        help="stories to store for the SQLite table sizes; 0 skips it")
+    parser.add_argument("--body-scale", type=int, default=1, help="times to repeat each generated body")
+    args = parser.parse_args()
+    run_memory(args.size, args.body_scale)
+    if args.sqlite_size:
+        run_sqlite(args.sqlite_size)
+
+
+if __name__ == "__main__":
+    main()
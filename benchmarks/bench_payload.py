@@ -0,0 +1,99 @@
+"""Per-rerun payload: bytes of delta messages the server sends for each rerun.
+
+Usage::
+
+    python -m benchmarks.bench_payload --reruns 5
+
+Runs ``app.py`` under Streamlit's ``AppTest`` against a throwaway in-memory
+store, clicks an upvote button on every rerun and records the serialized size
+of every delta message. Two figures are reported per rerun:
+
+* ``raw``: every delta as serialized by the script run
+* ``sent``: what the websocket carries once Streamlit's message cache is
+  taken into account; large element deltas already sent to the browser
+  (``global.minCachedMessageSize``, 10 KB) are replaced by a hash reference
+
+The style element is reported separately so the effect of serving the
+stylesheet as a static asset is visible.
+"""
+
+import argparse
+import os
+import sys
+from typing import Dict, List, Set
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("TELUGU_STORIES_BACKEND", "memory")
+
+from streamlit import config  # noqa: E402
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg  # noqa: E402
+from streamlit.runtime.forward_msg_cache import create_reference_msg, populate_hash_if_needed  # noqa: E402
+from streamlit.testing.v1 import AppTest, app_test  # noqa: E402
+from streamlit.testing.v1.local_script_runner import LocalScriptRunner  # noqa: E402
+
+_runs: List[List[ForwardMsg]] = []
+
+
+class _RecordingScriptRunner(LocalScriptRunner):
+    """Keeps the messages of every script run for measurement."""
+
+    def forward_msgs(self) -> List[ForwardMsg]:
+        messages = super().forward_msgs()
+        if not _runs or _runs[-1] is not messages:
+            _runs.append(messages)
+        return messages
+
+
+def _is_style(msg: ForwardMsg) -> bool:
+    return (msg.delta.WhichOneof("type") == "new_element" and
+            msg.delta.new_element.WhichOneof("type") == "markdown" and
+            "<style>" in msg.delta.new_element.markdown.body)
+
+
+def measure(messages: List[ForwardMsg], browser_cache: Set[str]) -> Dict[str, int]:
+    """Raw and sent delta bytes of one run; updates ``browser_cache`` like the frontend."""
+    result = {"raw": 0, "sent": 0, "style": 0, "elements": 0}
+    for msg in messages:
+        if msg.WhichOneof("type") != "delta":
+            continue
+        populate_hash_if_needed(msg)
+        size = msg.ByteSize()
+        sent = size
+        if msg.metadata.cacheable:
+            if msg.hash in browser_cache:
+                sent = create_reference_msg(msg).ByteSize()
+            browser_cache.add(msg.hash)
+        result["raw"] += size
+        result["sent"] += sent
+        result["elements"] += 1
+        if _is_style(msg):
+            result["style"] += sent
+    return result
+
+
+def run(reruns: int) -> None:
+    app_test.LocalScriptRunner = _RecordingScriptRunner
+    at = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=30).run()
+    for i in range(reruns):
+        upvotes = [b for b in at.button if b.key and b.key.startswith("upvote_")]
+        upvotes[i % len(upvotes)].click().run()
+
+    browser_cache: Set[str] = set()
+    print(f"minCachedMessageSize = {int(config.get_option('global.minCachedMessageSize'))} bytes")
+    print(f"{'run':>5} {'deltas':>7} {'raw bytes':>10} {'sent bytes':>11} {'style bytes sent':>17}")
+    for number, messages in enumerate(_runs):
+        result = measure(messages, browser_cache)
+        label = "first" if number == 0 else str(number)
+        print(f"{label:>5} {result['elements']:>7} {result['raw']:>10} {result['sent']:>11} {result['style']:>17}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--reruns", type=int, default=5)
+    args = parser.parse_args()
+    run(args.reruns)
+
+
+if __name__ == "__main__":
+    main()
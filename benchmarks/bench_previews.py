@@ -0,0 +1,81 @@
+"""Preview backfill with a process pool, and the akshara safety of excerpts.
+
+Usage::
+
+    python -m benchmarks.bench_previews --size 100000 --workers 1 2 4
+
+Fills a SQLite store with ``size`` generated stories, then for each worker
+count marks every preview stale and times ``previews.backfill_previews``.
+Every stored excerpt is checked to end on an akshara boundary of its story,
+and the cost of previewing one story, which the feed no longer pays per
+rerun, is reported.
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.corpus import generate_stories  # noqa: E402
+from previews import backfill_previews, story_preview  # noqa: E402
+from story_store import SQLiteStoryStore  # noqa: E402
+from telugu_text import split_aksharas  # noqa: E402
+
+
+def _check_excerpts(path: str) -> int:
+    """Assert every excerpt is whole aksharas of its content; returns how many were checked."""
+    checked = 0
+    with sqlite3.connect(path) as conn:
+        for content, excerpt in conn.execute("SELECT content, excerpt FROM stories"):
+            cut = excerpt[:-3] if excerpt.endswith("...") else excerpt
+            end = 0
+            for cluster in split_aksharas(content.strip()):
+                if end >= len(cut):
+                    break
+                end += len(cluster)
+            if end != len(cut) or not content.strip().startswith(cut):
+                raise AssertionError(f"excerpt splits an akshara: {excerpt!r}")
+            checked += 1
+    return checked
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=100000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    stories = list(generate_stories(args.size))
+    start = time.perf_counter()
+    for story in stories[:10000]:
+        story_preview(story["content"])
+    per_story = (time.perf_counter() - start) / min(args.size, 10000)
+    print(f"preview of one story: {per_story * 1e6:.0f} µs")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "stories.db")
+        store = SQLiteStoryStore(path)
+        for offset in range(0, len(stories), 1000):
+            store.add_stories(stories[offset:offset + 1000])
+        del stories
+
+        for workers in args.workers:
+            with sqlite3.connect(path) as conn:
+                conn.execute("UPDATE stories SET preview_version = 0")
+            start = time.perf_counter()
+            updated = backfill_previews(store, workers)
+            elapsed = time.perf_counter() - start
+            if updated != args.size:
+                raise AssertionError(f"backfilled {updated} of {args.size} stories")
+            print(f"backfill {updated:>9} stories with {workers} worker(s) in {elapsed:6.2f} s "
+                  f"({updated / elapsed:,.0f} stories/s)")
+        store.close()
+        print(f"all {_check_excerpts(path)} excerpts end on an akshara boundary")
+
+
+if __name__ == "__main__":
+    main()
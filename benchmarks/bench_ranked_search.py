@@ -0,0 +1,94 @@
+"""Ranked search: MaxScore top-k against scoring every match, and loading the saved index.
+
+Usage::
+
+    python -m benchmarks.bench_ranked_search --size 100000 --queries 300
+
+Indexes ``size`` generated stories in a SQLite store and times building the
+index, saving it, loading it back and catching up with 1,000 stories added
+after it was saved. Then runs ``queries`` queries of one to three words drawn
+like the corpus (common words are common in queries too) and times a page of
+``--limit`` results with MaxScore against scoring every story that matches a
+query word and sorting. Every MaxScore page is checked against that sort.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.corpus import _WordSampler, build_vocabulary, generate_stories  # noqa: E402
+from ranked_search import RankedSearchIndex  # noqa: E402
+from story_store import SQLiteStoryStore  # noqa: E402
+
+
+def _timed(func: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def _report(name: str, samples: List[float]) -> None:
+    samples = sorted(samples)
+    print(f"  {name:<24} median {statistics.median(samples):8.2f} ms, p99 {samples[int(len(samples) * 0.99)]:8.2f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--limit", type=int, default=11, help="results per page (a feed page plus one)")
+    args = parser.parse_args()
+
+    stories = list(generate_stories(args.size + 1000))
+    with tempfile.TemporaryDirectory() as directory:
+        store = SQLiteStoryStore(os.path.join(directory, "stories.db"))
+        for offset in range(0, args.size, 1000):
+            store.add_stories(stories[offset:offset + 1000])
+        path = os.path.join(directory, "stories.db.ranked")
+
+        index = RankedSearchIndex(path)
+        build_s = _timed(lambda: index.catch_up(store))
+        save_s = _timed(index.save)
+        print(f"{index.document_count} stories: built in {build_s:.1f} s, saved in {save_s:.2f} s "
+              f"({os.path.getsize(path) / 2 ** 20:.1f} MiB, {len(index._df)} terms)")
+        load_s = _timed(lambda: RankedSearchIndex.load(path))
+        store.add_stories(stories[args.size:])
+        reopened: List[RankedSearchIndex] = []
+        reopen_s = _timed(lambda: reopened.append(RankedSearchIndex.open(store, path)))
+        for saving in reopened:
+            saving.wait_saved()
+        print(f"  loaded in {load_s:.2f} s; opened with 1000 new stories to catch up in {reopen_s:.2f} s")
+        store.close()
+        index = reopened[0]
+
+    rng = random.Random(21)
+    sampler = _WordSampler(rng, build_vocabulary())
+    queries = [" ".join(sampler.words(rng.randint(1, 3))) for _ in range(args.queries)]
+    top_ms, full_ms, matches = [], [], []
+    for query in queries:
+        start = time.perf_counter()
+        page = index.search(query, args.limit)
+        top_ms.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        scores = index.scores(query)
+        expected = sorted(((score, seq) for seq, score in scores.items()), reverse=True)[:args.limit]
+        full_ms.append((time.perf_counter() - start) * 1000)
+        matches.append(len(scores))
+        if len(page) != len(expected) or any(abs(a[0] - b[0]) > 1e-9 for a, b in zip(page, expected)):
+            raise AssertionError(f"top {args.limit} of {query!r} differ from scoring every match")
+    print(f"{len(queries)} queries, median {statistics.median(matches):,.0f} matching stories "
+          f"(max {max(matches):,}); pages of {args.limit} match scoring every story:")
+    _report("MaxScore top-k", top_ms)
+    _report("score every match", full_ms)
+
+
+if __name__ == "__main__":
+    main()
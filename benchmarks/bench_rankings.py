@@ -0,0 +1,106 @@
+"""Ranked feed pages: sorting every story per rerun versus the maintained rankings.
+
+Usage::
+
+    python -m benchmarks.bench_rankings --sizes 100000 1000000
+
+For each size this times building ``StoryRankings``, fetching the first and a
+deep page of each ranking, moving a story after a vote or a view, and the
+``sorted()`` over all stories a ranked feed would otherwise need on every
+rerun. Pages are checked against that full sort.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Iterator, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rankings import StoryRankings  # noqa: E402
+from story_rules import CATEGORIES  # noqa: E402
+
+PAGE_SIZE = 10
+
+
+class _CounterRows:
+    """Just the columns ``StoryRankings.from_store`` reads, without story bodies."""
+
+    def __init__(self, size: int):
+        rng = random.Random(size)
+        start = datetime(2024, 1, 1)
+        self.rows = [(seq, rng.choice(CATEGORIES), (start + timedelta(minutes=seq)).isoformat(),
+                      int(rng.paretovariate(1.2)), int(rng.paretovariate(2.0)), int(rng.paretovariate(1.1) * 10))
+                     for seq in range(1, size + 1)]
+
+    def iter_ranking_rows(self) -> Iterator[Tuple[int, str, str, int, int, int]]:
+        return iter(self.rows)
+
+
+def _timed(func: Callable[[], Any], repeat: int = 5) -> float:
+    """Best-of-``repeat`` wall time in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def _sorted_seqs(rankings: StoryRankings, ranking: str, size: int) -> List[int]:
+    """The per-rerun alternative: score and sort every story."""
+    return sorted(range(1, size + 1), key=lambda seq: (rankings._score(ranking, seq), seq), reverse=True)
+
+
+def run(size: int) -> None:
+    source = _CounterRows(size)
+    start = time.perf_counter()
+    rankings = StoryRankings.from_store(source)
+    print(f"{size:>9} stories, rankings built in {time.perf_counter() - start:.1f} s")
+
+    rng = random.Random(0)
+    for ranking in ("top", "hot", "views"):
+        expected = _sorted_seqs(rankings, ranking, size)
+        first = rankings.page(ranking, limit=PAGE_SIZE)
+        if [seq for _, seq in first] != expected[:PAGE_SIZE]:
+            raise AssertionError(f"first page of {ranking} differs from a full sort")
+        # Walk to page 100 through cursors
+        cursor = None
+        for _ in range(100):
+            cursor = rankings.page(ranking, limit=PAGE_SIZE, after=cursor)[-1][0]
+        deep = rankings.page(ranking, limit=PAGE_SIZE, after=cursor)
+        if [seq for _, seq in deep] != expected[100 * PAGE_SIZE:101 * PAGE_SIZE]:
+            raise AssertionError(f"page 101 of {ranking} differs from a full sort")
+
+        sort_ms = _timed(lambda: _sorted_seqs(rankings, ranking, size)[:PAGE_SIZE], repeat=1)
+        page_ms = _timed(lambda: rankings.page(ranking, limit=PAGE_SIZE))
+        deep_ms = _timed(lambda: rankings.page(ranking, limit=PAGE_SIZE, after=cursor))
+        category_ms = _timed(lambda: rankings.page(ranking, CATEGORIES[0], limit=PAGE_SIZE))
+        print(f"  {ranking:>5}: full sort {sort_ms:8.1f} ms | page 1 {page_ms:.3f} ms, page 101 {deep_ms:.3f} ms, "
+              f"one category {category_ms:.3f} ms")
+
+    seqs = [rng.randrange(1, size + 1) for _ in range(10000)]
+    start = time.perf_counter()
+    for seq in seqs:
+        rankings.votes_changed(seq, 1, 0)
+    vote_us = (time.perf_counter() - start) / len(seqs) * 1e6
+    start = time.perf_counter()
+    for seq in seqs:
+        rankings.views_recorded(seq)
+    view_us = (time.perf_counter() - start) / len(seqs) * 1e6
+    print(f"  update after a vote {vote_us:.1f} us, after a view {view_us:.1f} us")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100000, 1000000])
+    args = parser.parse_args()
+    for size in args.sizes:
+        run(size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""Several app processes on one database: the change feed against rebuilding every index.
+
+Usage::
+
+    python -m benchmarks.bench_replicas --size 20000 --processes 4 --writes 500
+
+Stores ``size`` generated stories, then starts ``processes`` processes that
+each open the database, build the app's in-memory indexes (search, ranked,
+Latin, tags, suggestions, rankings, statistics) and subscribe them to a
+``ChangeFeed`` as ``app.py`` does. Every process then makes ``writes``
+rounds of one new story, a few votes and a few reads, updating its own
+indexes directly like the app. After each round it polls the feed for the
+other processes' writes, as its poller thread would.
+
+Once every process has written everything, each catches up and compares
+every index with one rebuilt from the store. The run fails on any
+difference. Reports how long a poll takes when it finds changes, and how
+long rebuilding the indexes takes, which is the alternative to a feed.
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aggregates import PlatformAggregates  # noqa: E402
+from benchmarks.corpus import generate_stories  # noqa: E402
+from change_feed import ChangeFeed  # noqa: E402
+from latin_search import LatinSearchIndex  # noqa: E402
+from ranked_search import RankedSearchIndex  # noqa: E402
+from rankings import RANKINGS, StoryRankings  # noqa: E402
+from search_index import StorySearchIndex  # noqa: E402
+from story_store import SQLiteStoryStore  # noqa: E402
+from suggestions import SearchSuggestions  # noqa: E402
+from tags import TagIndex  # noqa: E402
+from views import ViewCounter  # noqa: E402
+from votes import VoteLog  # noqa: E402
+
+VOTES_PER_ROUND = 4
+READS_PER_ROUND = 4
+
+
+class _Replica:
+    """The in-memory indexes of one app process, built from the store."""
+
+    def __init__(self, store: SQLiteStoryStore):
+        self.search = StorySearchIndex.from_store(store)
+        self.ranked = RankedSearchIndex.open(store, None)
+        self.latin = LatinSearchIndex.from_store(store)
+        self.tags = TagIndex.from_store(store)
+        self.suggestions = SearchSuggestions.from_store(store, self.tags)
+        self.rankings = StoryRankings.from_store(store)
+        self.aggregates = PlatformAggregates.from_store(store)
+
+    def subscribe(self, feed: ChangeFeed, since: int) -> None:
+        """Subscribe every index as ``app.py``'s getters do."""
+        for name, index in (("search_index", self.search), ("ranked_index", self.ranked),
+                            ("latin_index", self.latin), ("tag_index", self.tags)):
+            feed.subscribe(name, since, story_added=index.add_story)
+        for name, counters in (("search_suggestions", self.suggestions), ("story_rankings", self.rankings)):
+            feed.subscribe(name, since, story_added=counters.story_added, votes_changed=counters.votes_changed,
+                           views_recorded=counters.views_recorded)
+        aggregates = self.aggregates
+        feed.subscribe("platform_aggregates", since, story_added=lambda seq, story: aggregates.story_added(story),
+                       votes_changed=lambda seq, up, down: aggregates.votes_changed(up, down),
+                       views_recorded=lambda seq, count: aggregates.views_recorded(count))
+
+    def story_added(self, seq: int, story: Dict[str, Any]) -> None:
+        """What ``TeluguStoriesApp._add_new_story`` does after storing a story."""
+        for index in (self.search, self.ranked, self.latin, self.tags):
+            index.add_story(seq, story)
+        self.suggestions.story_added(seq, story)
+        self.rankings.story_added(seq, story)
+        self.aggregates.story_added(story)
+
+    def differences(self, store: SQLiteStoryStore, fresh: "_Replica") -> List[str]:
+        """Names of the indexes that differ from ``fresh``, rebuilt from ``store``."""
+        differ = []
+        if (self.search._akshara_postings != fresh.search._akshara_postings
+                or self.search._ngram_postings != fresh.search._ngram_postings):
+            differ.append("search")
+        if self.ranked._df != fresh.ranked._df or self.ranked.document_count != fresh.ranked.document_count:
+            differ.append("ranked")
+        if self.latin._texts != fresh.latin._texts or self.latin._postings != fresh.latin._postings:
+            differ.append("latin")
+        if self.tags._postings != fresh.tags._postings:
+            differ.append("tags")
+        prefixes = {title[:2] for title, _ in list(fresh.suggestions._stories.values())[-200:]}
+        if any(self.suggestions.suggest(p) != fresh.suggestions.suggest(p) for p in prefixes):
+            differ.append("suggestions")
+        limit = store.count_stories()
+        if any(self.rankings.page(r, None, limit) != fresh.rankings.page(r, None, limit) for r in RANKINGS[1:]):
+            differ.append("rankings")
+        if self.aggregates.check_consistency(store):
+            differ.append("aggregates")
+        return differ
+
+
+def _worker(number: int, path: str, writes: int, barrier, results) -> None:
+    rng = random.Random(number)
+    store = SQLiteStoryStore(path)
+    feed = ChangeFeed(store)
+    replica = _Replica(store)
+    replica.subscribe(feed, feed.position())
+    votes, views = VoteLog(store), ViewCounter(store)
+    targets = [(story["seq"], story["id"]) for story in store.list_stories(limit=2000)]
+    barrier.wait()
+
+    poll_ms, applied = [], 0
+    for round_number, story in enumerate(generate_stories(writes, seed=100 + number)):
+        seq = store.add_story(story)
+        replica.story_added(seq, story)
+        for i in range(VOTES_PER_ROUND):
+            target_seq, story_id = rng.choice(targets)
+            voter = f"{number}-{round_number}-{i}"
+            up, down = votes.cast(story_id, voter, rng.choice(("upvote", "downvote")))
+            replica.aggregates.votes_changed(up, down)
+            replica.rankings.votes_changed(target_seq, up, down)
+            replica.suggestions.votes_changed(target_seq, up, down)
+        for i in range(READS_PER_ROUND):
+            target_seq, story_id = rng.choice(targets)
+            views.record_read(story_id, f"{number}-{round_number}-{i}")
+            replica.aggregates.views_recorded()
+            replica.rankings.views_recorded(target_seq)
+            replica.suggestions.views_recorded(target_seq)
+        if round_number % 10 == 9:
+            votes.flush()
+            views.flush()
+        start = time.perf_counter()
+        found = feed.poll()
+        if found:
+            poll_ms.append((time.perf_counter() - start) * 1000)
+            applied += found
+    votes.flush()
+    views.flush()
+    barrier.wait()
+
+    applied += feed.poll()
+    start = time.perf_counter()
+    fresh = _Replica(store)
+    rebuild_s = time.perf_counter() - start
+    results.put((number, poll_ms, applied, rebuild_s, replica.differences(store, fresh)))
+    store.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=20000)
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--writes", type=int, default=500, help="rounds of writes per process")
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "stories.db")
+        store = SQLiteStoryStore(path)
+        stories = list(generate_stories(args.size))
+        for offset in range(0, args.size, 1000):
+            store.add_stories(stories[offset:offset + 1000])
+        store.close()
+
+        barrier = context.Barrier(args.processes)
+        results = context.Queue()
+        workers = [context.Process(target=_worker, args=(number, path, args.writes, barrier, results))
+                   for number in range(args.processes)]
+        for worker in workers:
+            worker.start()
+        reports = sorted(results.get() for _ in workers)
+        for worker in workers:
+            worker.join()
+
+    print(f"{args.processes} processes on {args.size} stories, {args.writes} rounds each of one story, "
+          f"{VOTES_PER_ROUND} votes and {READS_PER_ROUND} reads:")
+    failed = False
+    for number, poll_ms, applied, rebuild_s, differ in reports:
+        poll_ms.sort()
+        print(f"  process {number}: {applied} changes from the others in {len(poll_ms)} polls, "
+              f"median {statistics.median(poll_ms):.2f} ms, p99 {poll_ms[int(len(poll_ms) * 0.99)]:.2f} ms; "
+              f"rebuilding every index takes {rebuild_s:.1f} s; "
+              f"{'differs: ' + ', '.join(differ) if differ else 'every index matches a rebuild'}")
+        failed = failed or bool(differ)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
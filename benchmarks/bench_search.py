@@ -0,0 +1,82 @@
+"""Search latency: the old substring scan versus the akshara/n-gram index.
+
+Usage::
+
+    python -m benchmarks.bench_search --size 100000
+
+Every query is checked to return exactly the same stories, in the same
+order, as the scan ``_filter_stories`` used to do over session state.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from itertools import islice
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.corpus import generate_stories  # noqa: E402
+from search_index import StorySearchIndex  # noqa: E402
+from story_store import SQLiteStoryStore, _matches_query, normalize_query  # noqa: E402
+
+QUERIES = ["కాకతీయ సామ్రాజ్యం", "వరంగల్", "రవి కుమార్ 7", "స్నేహం", "కథ", "zz", "పల్లెటూరిలో రాము",
+           "ఫ్పైగసెతీ", "మోకూ"]
+
+
+def _timed(func: Callable[[], Any], repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def _legacy_search(stories: List[Dict[str, Any]], query: str) -> List[Dict[str, Any]]:
+    """The original in-memory filter over the newest-first story list."""
+    query = normalize_query(query)
+    return [s for s in stories if _matches_query(s, query)]
+
+
+def run(size: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SQLiteStoryStore(os.path.join(tmp, "bench.db"))
+        stories = generate_stories(size)
+        while True:
+            batch = list(islice(stories, 50000))
+            if not batch:
+                break
+            store.add_stories(batch)
+
+        start = time.perf_counter()
+        index = StorySearchIndex.from_store(store)
+        print(f"index build: {time.perf_counter() - start:.1f} s for {size} stories")
+
+        legacy_stories = list(reversed(list(generate_stories(size))))
+        print(f"{'query':>20} {'matches':>8} {'scan ms':>9} {'lookup ms':>10} {'index+fetch ms':>15} {'candidates':>11}")
+        for query in QUERIES:
+            expected = [s["id"] for s in _legacy_search(legacy_stories, query)]
+            candidates = index.candidates(query)
+            actual = [s["id"] for s in store.search_stories(query, None, candidates)]
+            if actual != expected:
+                raise AssertionError(f"index results differ from scan for {query!r}")
+            scan_ms = _timed(lambda: _legacy_search(legacy_stories, query))
+            lookup_ms = _timed(lambda: index.candidates(query))
+            index_ms = _timed(lambda: store.search_stories(query, None, index.candidates(query)))
+            shown = "scan" if candidates is None else len(candidates)
+            print(f"{query:>20} {len(expected):>8} {scan_ms:>9.1f} {lookup_ms:>10.1f} {index_ms:>15.1f} {shown:>11}")
+        store.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=100000)
+    args = parser.parse_args()
+    run(args.size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""Home feed pages for many concurrent sessions: the shared feed snapshot against a store query per rerun.
+
+Usage::
+
+    python -m benchmarks.bench_snapshot --size 100000 --sessions 1 8 32 --seconds 3
+
+Stores ``size`` generated stories in a SQLite store. For each session count,
+that many threads load the first page of the newest-first feed (all
+categories or one) over and over, as reruns of that many sessions would,
+for ``--seconds`` each way: through ``list_stories`` on the store, and
+through a ``FeedSnapshot``. Meanwhile a writer adds a story and casts votes
+every ``--write-interval-ms``, with the vote log flushing as in the app, so
+the snapshot keeps being republished and rebuilt. Reports pages per second
+and page latency, checks the snapshot's pages against the store once writes
+stop, and reports the snapshot's memory, which is the same for any number of
+sessions.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.corpus import generate_stories  # noqa: E402
+from feed_snapshot import FeedSnapshot  # noqa: E402
+from story_store import SQLiteStoryStore  # noqa: E402
+from story_rules import CATEGORIES  # noqa: E402
+from votes import VoteLog  # noqa: E402
+
+PAGE = 11
+
+
+def _load(sessions: int, seconds: float, page: Callable[[Optional[str]], list]) -> Tuple[int, List[float]]:
+    """Pages loaded by ``sessions`` threads in ``seconds``, and a sample of their latencies in ms."""
+    stop = threading.Event()
+    counts, samples = [0] * sessions, [[] for _ in range(sessions)]
+
+    def session(number: int) -> None:
+        rng = random.Random(number)
+        while not stop.is_set():
+            category = rng.choice((None, None, None, rng.choice(CATEGORIES)))
+            start = time.perf_counter()
+            page(category)
+            if counts[number] % 10 == 0:
+                samples[number].append((time.perf_counter() - start) * 1000)
+            counts[number] += 1
+
+    threads = [threading.Thread(target=session, args=(number,)) for number in range(sessions)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return sum(counts), sorted(sample for per_session in samples for sample in per_session)
+
+
+def _writer(store: SQLiteStoryStore, snapshot: FeedSnapshot, votes: VoteLog, submissions: Iterator[Dict],
+            interval_ms: int, stop: threading.Event) -> None:
+    """Add a story and cast votes on the newest stories, as sessions writing would."""
+    rng = random.Random(1)
+    targets = [story["id"] for story in store.list_stories(limit=50)]
+    for story in submissions:
+        if stop.wait(interval_ms / 1000):
+            return
+        seq = store.add_story(story)
+        snapshot.story_added(seq, story)
+        for voter in range(5):
+            votes.cast(rng.choice(targets), f"{seq}-{voter}", "upvote")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=100000)
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--write-interval-ms", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = SQLiteStoryStore(os.path.join(directory, "stories.db"))
+        stories = list(generate_stories(args.size))
+        for offset in range(0, args.size, 1000):
+            store.add_stories(stories[offset:offset + 1000])
+
+        tracemalloc.start()
+        snapshot = FeedSnapshot(store)
+        snapshot_bytes, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        votes = VoteLog(store)
+        votes.on_flush("feed_snapshot", snapshot.invalidate)
+        votes.start()
+
+        def from_snapshot(category: Optional[str]) -> list:
+            page = snapshot.page(category, PAGE)
+            return store.list_stories(category, PAGE) if page is None else page
+
+        submissions = generate_stories(10 ** 6, seed=24)
+        print(f"{args.size} stories; a writer adds a story and casts 5 votes every {args.write_interval_ms} ms")
+        print(f"{'sessions':>8} {'way':<10} {'pages/s':>9} {'median ms':>10} {'p99 ms':>8}")
+        for sessions in args.sessions:
+            for way, page in (("store", lambda category: store.list_stories(category, PAGE)),
+                              ("snapshot", from_snapshot)):
+                stop = threading.Event()
+                writer = threading.Thread(target=_writer,
+                                          args=(store, snapshot, votes, submissions, args.write_interval_ms, stop))
+                writer.start()
+                pages, samples = _load(sessions, args.seconds, page)
+                stop.set()
+                writer.join()
+                print(f"{sessions:>8} {way:<10} {pages / args.seconds:>9.0f} {statistics.median(samples):>10.3f} "
+                      f"{samples[int(len(samples) * 0.99)]:>8.3f}")
+
+        votes.close()
+        snapshot.invalidate()
+        for category in (None, *CATEGORIES):
+            if from_snapshot(category) != store.list_stories(category, PAGE):
+                raise AssertionError(f"snapshot page for {category!r} differs from the store")
+        print(f"pages match the store; the snapshot of {len(snapshot)} stories takes "
+              f"{snapshot_bytes / 1024:.0f} KB for any number of sessions")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Per-session memory and rerun latency: session-state stories vs the shared store.
+
+Usage::
+
+    python -m benchmarks.bench_store --sizes 10000 100000 1000000
+
+The legacy model copies the whole corpus into every session's
+``st.session_state.stories``; its per-session cost is the size of that list.
+The store model keeps the corpus in SQLite and a session only holds its own
+interaction state.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from itertools import islice
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.corpus import generate_stories  # noqa: E402
+from story_store import SQLiteStoryStore, _matches_query  # noqa: E402
+
+SEARCH_QUERY = "కాకతీయ"
+SAMPLE_SIZE = 10000
+
+
+def _timed(func: Callable[[], Any], repeat: int = 3) -> float:
+    """Best-of-``repeat`` wall time in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def _legacy_session_bytes(size: int) -> int:
+    """Memory one session spends on its private story list (sampled and scaled)."""
+    sample = min(size, SAMPLE_SIZE)
+    tracemalloc.start()
+    stories = list(generate_stories(sample))
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del stories
+    return int(current * size / sample)
+
+
+def _store_session_bytes() -> int:
+    """Memory of the state a session keeps when stories live in the store."""
+    tracemalloc.start()
+    session = {
+        "show_form": False,
+        "search_query": "",
+        "user_interactions": {},
+        "views_updated": set(),
+    }
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del session
+    return current
+
+
+def _legacy_rerun(stories: List[Dict[str, Any]]) -> None:
+    """Home page filter plus statistics as computed from session state."""
+    query = SEARCH_QUERY.lower()
+    [s for s in stories if _matches_query(s, query)]
+    len(set(s["author"] for s in stories))
+    sum(s.get("views", 0) for s in stories)
+    sum(s.get("upvotes", 0) for s in stories)
+
+
+def _store_rerun(store: SQLiteStoryStore) -> None:
+    """Home page filter plus statistics read through the store."""
+    store.search_stories(SEARCH_QUERY)
+    store.get_statistics()
+
+
+def run(sizes: List[int], legacy_limit: int) -> None:
+    print(f"{'stories':>10} {'legacy MB/session':>18} {'store KB/session':>17} "
+          f"{'legacy rerun ms':>16} {'store rerun ms':>15}")
+    store_session_kb = _store_session_bytes() / 1024
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            store = SQLiteStoryStore(os.path.join(tmp, "bench.db"))
+            stories = generate_stories(size)
+            while True:
+                batch = list(islice(stories, 50000))
+                if not batch:
+                    break
+                store.add_stories(batch)
+            legacy_ms = "n/a"
+            if size <= legacy_limit:
+                legacy = list(generate_stories(size))
+                legacy_ms = f"{_timed(lambda: _legacy_rerun(legacy)):.1f}"
+                del legacy
+            store_ms = _timed(lambda: _store_rerun(store))
+            store.close()
+        legacy_mb = _legacy_session_bytes(size) / (1024 * 1024)
+        print(f"{size:>10} {legacy_mb:>18.1f} {store_session_kb:>17.1f} {legacy_ms:>16} {store_ms:>15.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--legacy-limit", type=int, default=100000,
+                        help="largest corpus to materialise in memory for the legacy rerun timing")
+    args = parser.parse_args()
+    run(args.sizes, args.legacy_limit)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""Search suggestions: prefix completion latency, cache hits and fragment reruns while typing.
+
+Usage::
+
+    python -m benchmarks.bench_suggestions --size 100000 --cards 50
+
+Builds ``SearchSuggestions`` over ``size`` generated stories in a memory
+store and times suggestions for prefixes of one to three characters taken
+from titles, authors and tags, first uncached and then from the prefix cache.
+Title and author suggestions are checked against a sort of every matching
+story and author by popularity.
+
+Then opens ``cards`` stories of the home feed under ``AppTest`` and compares
+typing a query, which reruns only the search box fragment and shows
+suggestions, with the same input rerunning the whole page and with running
+the search. Fragment reruns are requested as in ``bench_fragments``.
+"""
+
+import argparse
+import logging
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from typing import Callable, Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.bench_fragments import _FragmentScriptRunner, _deltas  # noqa: E402
+from benchmarks.corpus import generate_stories  # noqa: E402
+from dedup import author_key, normalize_title  # noqa: E402
+from story_store import MemoryStoryStore, SQLiteStoryStore  # noqa: E402
+from suggestions import AUTHOR, TITLE, SearchSuggestions  # noqa: E402
+from tags import TagIndex  # noqa: E402
+
+from streamlit.testing.v1 import AppTest, app_test  # noqa: E402
+
+
+def _latencies(func: Callable[[str], object], inputs: List[str]) -> List[float]:
+    samples = []
+    for value in inputs:
+        start = time.perf_counter()
+        func(value)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def _report(name: str, samples: List[float]) -> None:
+    samples = sorted(samples)
+    print(f"  {name:<24} median {statistics.median(samples) * 1000:8.1f} µs, "
+          f"p99 {samples[int(len(samples) * 0.99)] * 1000:8.1f} µs")
+
+
+def _expected(rows: List[Tuple[int, str, str, int]], prefix: str) -> Dict[str, List[str]]:
+    """Title and author suggestions computed by sorting every match."""
+    key = normalize_title(prefix)
+    titles = []
+    authors: Dict[str, int] = defaultdict(int)
+    names: Dict[str, str] = {}
+    for seq, title, author, popularity in rows:
+        words = normalize_title(title).split(" ")
+        for start in range(min(len(words), SearchSuggestions.TITLE_WORDS)):
+            suffix = f"{' '.join(words[start:])}\x00{seq}"
+            if suffix.startswith(key):
+                titles.append((-popularity, suffix, seq, title))
+        authors[author_key(author)] += popularity
+        names.setdefault(author_key(author), author)
+    best_titles, seen = [], set()
+    for _, _, seq, title in sorted(titles)[:10]:
+        if seq not in seen and len(best_titles) < SearchSuggestions.PER_KIND:
+            seen.add(seq)
+            best_titles.append(title)
+    best_authors = sorted((-weight, k) for k, weight in authors.items() if k.startswith(key))
+    return {TITLE: best_titles, AUTHOR: [names[k] for _, k in best_authors[:SearchSuggestions.PER_KIND]]}
+
+
+def run_service(size: int, rng: random.Random) -> None:
+    store = MemoryStoryStore()
+    store.add_stories(list(generate_stories(size)))
+    start = time.perf_counter()
+    suggestions = SearchSuggestions.from_store(store, TagIndex.from_store(store))
+    print(f"suggestions over {size} stories built in {time.perf_counter() - start:.1f} s")
+
+    rows = [(seq, title, author, views + upvotes) for seq, title, author, views, upvotes
+            in store.iter_suggestion_rows()]
+    texts = [title for _, title, _, _ in rows] + [author for _, _, author, _ in rows]
+    for seq, tags in store.iter_story_tags():
+        texts.extend(f"#{tag}" for tag in tags)
+    for length in (1, 2, 3):
+        # "#" does not count towards the length of a tag prefix
+        picked = (rng.choice(texts) for _ in range(2000))
+        prefixes = list(dict.fromkeys(text[:length + text.startswith("#")] for text in picked))
+        print(f"{len(prefixes)} prefixes of {length} character(s):")
+        _report("uncached", _latencies(suggestions.suggest, prefixes))
+        _report("cached", _latencies(suggestions.suggest, prefixes))
+        for prefix in [p for p in prefixes if not p.startswith("#")][:20]:
+            found = suggestions.suggest(prefix)
+            got = {kind: [s.text for s in found if s.kind == kind] for kind in (TITLE, AUTHOR)}
+            if got != _expected(rows, prefix):
+                raise AssertionError(f"suggestions for {prefix!r} differ from a sort of every match")
+
+
+def _text_input_fragment(key: str) -> str:
+    """Fragment id of the text input rendered last run with ``key``."""
+    for message in _deltas():
+        element = message.delta.new_element
+        if message.delta.HasField("new_element") and element.HasField("text_input") \
+                and element.text_input.id.endswith(key):
+            return message.delta.fragment_id
+    raise LookupError(f"no text input {key!r}")
+
+
+def _timed_run(action: Callable[[], AppTest], fragment_id: str) -> Dict[str, float]:
+    _FragmentScriptRunner.fragment_id = fragment_id
+    try:
+        start = time.perf_counter()
+        at = action()
+        seconds = time.perf_counter() - start
+    finally:
+        _FragmentScriptRunner.fragment_id = None
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    messages = [m for m in _FragmentScriptRunner.messages if m.HasField("delta")]
+    return {"ms": seconds * 1000, "script_ms": _FragmentScriptRunner.script_seconds * 1000,
+            "messages": len(messages)}
+
+
+def run_app(cards: int, rng: random.Random) -> None:
+    # Every Streamlit call outside a script run would log a warning
+    logging.disable(logging.WARNING)
+    app_test.LocalScriptRunner = _FragmentScriptRunner
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ["TELUGU_STORIES_BACKEND"] = "sqlite"
+        os.environ["TELUGU_STORIES_DB"] = os.path.join(directory, "stories.db")
+        stories = list(generate_stories(cards + 10, seed=20))
+        store = SQLiteStoryStore(os.environ["TELUGU_STORIES_DB"])
+        store.add_stories(stories)
+        store.close()
+
+        at = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=120).run()
+        while len([b for b in at.button if (b.key or "").startswith("upvote_")]) < cards:
+            at.button(key="load_more").click().run()
+        fragment_id = _text_input_fragment("main_search")
+
+        typed, typed_whole, searched = [], [], []
+        for story in rng.sample(stories, 10):
+            word = story["title"].split(" ")[0]
+            for length in range(1, min(len(word), 4) + 1):
+                typed.append(_timed_run(lambda: at.text_input(key="main_search").input(word[:length]).run(),
+                                        fragment_id))
+                typed_whole.append(_timed_run(lambda: at.text_input(key="main_search").input(word[:length] + " ")
+                                              .run(), None))
+            searched.append(_timed_run(lambda: at.button(key="run_search").click().run(), fragment_id))
+            at.text_input(key="main_search").input("").run()
+            while len([b for b in at.button if (b.key or "").startswith("upvote_")]) < cards:
+                at.button(key="load_more").click().run()
+        for name, samples in (("typing (fragment)", typed), ("typing (whole page)", typed_whole),
+                              ("running the search", searched)):
+            print(f"  {name:<20} script {statistics.median(s['script_ms'] for s in samples):7.1f} ms, "
+                  f"with AppTest {statistics.median(s['ms'] for s in samples):7.1f} ms, "
+                  f"{statistics.median(s['messages'] for s in samples):5.0f} delta messages")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=100000, help="stories for the suggestion service")
+    parser.add_argument("--cards", type=int, default=50, help="story cards on the page while typing")
+    args = parser.parse_args()
+    rng = random.Random(20)
+    run_service(args.size, rng)
+    print(f"home feed with {args.cards} cards:")
+    run_app(args.cards, rng)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Tag completion, tag filtering and related tags at 100k distinct tags.
+
+Usage::
+
+    python -m benchmarks.bench_tags --tags 100000 --stories 300000
+
+Builds a ``TagIndex`` from generated stories: every word of a vocabulary of
+``tags`` words is the tag of at least one story, and stories get up to four
+more tags drawn from a Zipf-like distribution. Times completing prefixes of
+one to four characters against sorting every matching tag by count, looking
+up a tag's stories against scanning every story's tags, and related tags.
+Completions are checked against that sort, and the run fails if the 99th
+percentile completion takes a millisecond or more.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.corpus import _WordSampler, build_vocabulary  # noqa: E402
+from tags import TagIndex, tag_key  # noqa: E402
+
+LIMIT = 10
+LATENCY_BUDGET_MS = 1.0
+
+
+def _latencies(func: Callable[[str], object], inputs: List[str]) -> List[float]:
+    """Milliseconds of each call."""
+    samples = []
+    for value in inputs:
+        start = time.perf_counter()
+        func(value)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def _report(name: str, samples: List[float]) -> float:
+    samples = sorted(samples)
+    p99 = samples[int(len(samples) * 0.99)]
+    print(f"  {name:<28} median {statistics.median(samples) * 1000:8.1f} µs, p99 {p99 * 1000:8.1f} µs, "
+          f"max {samples[-1] * 1000:8.1f} µs")
+    return p99
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tags", type=int, default=100000, help="distinct tags")
+    parser.add_argument("--stories", type=int, default=300000)
+    parser.add_argument("--prefixes", type=int, default=2000, help="timed prefixes per length")
+    args = parser.parse_args()
+
+    rng = random.Random(19)
+    words = build_vocabulary(args.tags)
+    sampler = _WordSampler(rng, words)
+    story_tags: List[List[str]] = [
+        [words[seq % len(words)]] + sampler.words(rng.randint(0, 4)) for seq in range(args.stories)]
+
+    start = time.perf_counter()
+    index = TagIndex()
+    for seq, tags in enumerate(story_tags, start=1):
+        index.add(seq, tags)
+    print(f"{len(index)} tags on {args.stories} stories, indexed in {time.perf_counter() - start:.1f} s")
+
+    counts: Dict[str, int] = {tag_key(word): index.count(word) for word in words}
+
+    def sorted_scan(prefix: str) -> List[Tuple[str, int]]:
+        key = tag_key(prefix)
+        matches = sorted((k for k in counts if k.startswith(key)), key=lambda k: (-counts[k], k))
+        return [(index.name(k), counts[k]) for k in matches[:LIMIT]]
+
+    worst = 0.0
+    for length in (1, 2, 3, 4):
+        candidates = [word[:length] for word in words if len(word) >= length]
+        prefixes = [rng.choice(candidates) for _ in range(args.prefixes)]
+        for prefix in prefixes[:50]:
+            if index.complete(prefix, LIMIT) != sorted_scan(prefix):
+                raise AssertionError(f"completions of {prefix!r} differ from a sort of every tag")
+        print(f"prefixes of {length} character(s):")
+        worst = max(worst, _report("trie completion", _latencies(lambda p: index.complete(p, LIMIT), prefixes)))
+        _report("sort of matching tags", _latencies(sorted_scan, prefixes[:20]))
+
+    print("tags:")
+    popular = words[:50] + [rng.choice(words) for _ in range(450)]
+    _report("stories of a tag (postings)", _latencies(lambda t: index.stories(t)[:LIMIT], popular))
+    _report("scan of every story's tags",
+            _latencies(lambda t: [seq for seq, tags in enumerate(story_tags, 1) if t in tags][-LIMIT:],
+                       popular[:5]))
+    _report("related tags", _latencies(lambda t: index.related([t]), popular))
+
+    if worst >= LATENCY_BUDGET_MS:
+        print(f"99th percentile completion {worst:.3f} ms is over the {LATENCY_BUDGET_MS} ms budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
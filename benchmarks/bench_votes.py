@@ -0,0 +1,160 @@
+"""Vote throughput: one transaction per click versus the write-behind vote log.
+
+Usage::
+
+    python -m benchmarks.bench_votes --rate 1000 --seconds 10 --sessions 8
+
+``--sessions`` threads stand in for Streamlit script threads pressing vote
+buttons at a combined ``--rate`` votes per second on a pool of stories. The
+synchronous run writes every press as its own transaction (what a
+per-click write would cost); the write-behind run goes through ``VoteLog``.
+Both report the sustained rate, per-press latency and, for the vote log,
+batch sizes and how long a vote waits before it is in the database. At the
+end the stored counters are checked against a replay of every press.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from itertools import islice
+from typing import Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.corpus import generate_stories  # noqa: E402
+from story_store import NOT_VOTED, SQLiteStoryStore, vote_deltas  # noqa: E402
+from votes import VoteLog, next_vote_state  # noqa: E402
+
+STORIES = 1000
+VOTERS = 5000
+
+
+class _TimedStore(SQLiteStoryStore):
+    """Records the size and duration of every vote batch written."""
+
+    def __init__(self, path: str):
+        super().__init__(path)
+        # (events, write seconds, seconds the oldest event waited until written)
+        self.batches: List[Tuple[int, float, float]] = []
+
+    def apply_vote_events(self, events):
+        start = time.perf_counter()
+        super().apply_vote_events(events)
+        self.batches.append((len(events), time.perf_counter() - start, time.time() - min(e[3] for e in events)))
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def _drive(press: Callable[[str, str, str], None], story_ids: List[str], rate: int, seconds: float,
+           sessions: int) -> Tuple[List[Tuple[str, str, str]], List[float], float]:
+    """Press vote buttons from ``sessions`` threads at a combined ``rate`` per second."""
+    presses: List[List[Tuple[str, str, str]]] = [[] for _ in range(sessions)]
+    latencies: List[List[float]] = [[] for _ in range(sessions)]
+    interval = sessions / rate
+    deadline = time.perf_counter() + seconds
+
+    def session(number: int) -> None:
+        rng = random.Random(number)
+        # Voters are split between sessions so one voter's presses stay in order
+        voters = [f"voter-{v}" for v in range(number, VOTERS, sessions)]
+        next_at = time.perf_counter()
+        while next_at < deadline:
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            vote = (rng.choice(story_ids), rng.choice(voters), rng.choice(("upvote", "downvote")))
+            start = time.perf_counter()
+            press(*vote)
+            latencies[number].append(time.perf_counter() - start)
+            presses[number].append(vote)
+            next_at += interval
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=session, args=(n,)) for n in range(sessions)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    return [p for per_session in presses for p in per_session], [l for ls in latencies for l in ls], elapsed
+
+
+def _expected_counts(presses: List[Tuple[str, str, str]], initial: Dict[str, List[int]]) -> Dict[str, List[int]]:
+    """Replay presses with the button semantics (order only matters per voter)."""
+    states: Dict[Tuple[str, str], int] = {}
+    counts = {story_id: list(counts) for story_id, counts in initial.items()}
+    for story_id, voter, action in presses:
+        old_state = states.get((story_id, voter), NOT_VOTED)
+        states[(story_id, voter)] = next_vote_state(old_state, action)
+        upvote_delta, downvote_delta = vote_deltas(old_state, states[(story_id, voter)])
+        counts[story_id][0] += upvote_delta
+        counts[story_id][1] += downvote_delta
+    return counts
+
+
+def _check(store: SQLiteStoryStore, expected: Dict[str, List[int]]) -> None:
+    for story_id, (upvotes, downvotes) in expected.items():
+        story = store.get_story(story_id)
+        if (story["upvotes"], story["downvotes"]) != (upvotes, downvotes):
+            raise AssertionError(f"counters of {story_id} differ from the replay")
+
+
+def _report(name: str, presses: int, latencies: List[float], elapsed: float) -> None:
+    print(f"{name}: {presses} votes in {elapsed:.1f} s = {presses / elapsed:,.0f}/s, "
+          f"press latency p50 {_percentile(latencies, 0.5) * 1000:.3f} ms "
+          f"p99 {_percentile(latencies, 0.99) * 1000:.3f} ms")
+
+
+def run(rate: int, seconds: float, sessions: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        store = _TimedStore(os.path.join(tmp, "bench.db"))
+        store.add_stories(list(islice(generate_stories(STORIES), STORIES)))
+        story_ids = [s["id"] for s in store.list_stories()]
+        initial = {s["id"]: [s["upvotes"], s["downvotes"]] for s in store.list_stories()}
+
+        # One transaction per press, same per-voter semantics as the vote log
+        def press_sync(story_id: str, voter: str, action: str) -> None:
+            state = store.get_vote_states(voter, [story_id]).get(story_id, NOT_VOTED)
+            store.apply_vote_events([(story_id, voter, next_vote_state(state, action), time.time())])
+
+        sync_presses, latencies, elapsed = _drive(press_sync, story_ids, rate, seconds, sessions)
+        _report("per-click transactions", len(sync_presses), latencies, elapsed)
+        store.batches.clear()
+
+        vote_log = VoteLog(store).start()
+        log_presses, latencies, elapsed = _drive(vote_log.cast, story_ids, rate, seconds, sessions)
+        vote_log.close()
+        _report("write-behind vote log ", len(log_presses), latencies, elapsed)
+        sizes = [size for size, _, _ in store.batches]
+        durations = [duration * 1000 for _, duration, _ in store.batches]
+        waits = [wait * 1000 for _, _, wait in store.batches]
+        print(f"  {len(sizes)} batches, mean {statistics.mean(sizes):.0f} events, "
+              f"write p50 {_percentile(durations, 0.5):.1f} ms p99 {_percentile(durations, 0.99):.1f} ms "
+              f"(flush every {vote_log.flush_interval_ms} ms or {vote_log.flush_events} events)")
+        print(f"  oldest vote in a batch reached the database after p50 {_percentile(waits, 0.5):.0f} ms "
+              f"p99 {_percentile(waits, 0.99):.0f} ms")
+
+        _check(store, _expected_counts(sync_presses + log_presses, initial))
+        print("  stored counters match a replay of every press")
+        store.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rate", type=int, default=1000, help="votes per second, all sessions together")
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--sessions", type=int, default=8)
+    args = parser.parse_args()
+    run(args.rate, args.seconds, args.sessions)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Synthetic story corpus used by the benchmarks.
+
+Words are built from Telugu aksharas (consonant + vowel sign, with the odd
+conjunct and anusvara) and drawn from a Zipf-like distribution, so search
+and indexing see a realistic mix of very common and rare terms. Categories
+and excerpts follow ``story_rules``, like stories submitted through the form.
+"""
+
+import random
+import uuid
+from datetime import datetime, timedelta
+from itertools import accumulate
+from typing import Any, Dict, Iterator, List
+
+from story_rules import CATEGORIES, create_story_excerpt
+
+# Real words first so they are the most frequent ones in the corpus
+COMMON_WORDS = [
+    "ఒకానొక", "పల్లెటూరిలో", "రాము", "యువకుడు", "ఉండేవాడు", "పట్టణం", "కలలు", "కష్టాలు",
+    "విజయాల", "గురించిన", "కథ", "మనందరినీ", "ప్రేరేపిస్తుంది", "గ్రామీణ", "జీవనం", "కాకతీయ",
+    "సామ్రాజ్యం", "తెలుగు", "నేల", "స్వర్ణయుగాలలో", "పరిపాలన", "కళలు", "శిల్పకళ", "రుద్రమ",
+    "దేవి", "వరంగల్", "చరిత్రను", "ప్రేమ", "కుటుంబం", "స్నేహం", "అమ్మ", "నాన్న", "వర్షం",
+]
+AUTHORS = ["రవి కుమార్", "సుమలత", "లక్ష్మి", "శ్రీనివాస్", "అనురాధ", "వెంకట్", "పద్మ", "కిరణ్"]
+
+CONSONANTS = [chr(cp) for cp in range(ord("క"), ord("హ") + 1) if cp not in (0x0C29, 0x0C34)]
+VOWEL_SIGNS = ["", "", "", "ా", "ి", "ీ", "ు", "ూ", "ె", "ే", "ై", "ొ", "ో", "ౌ"]
+INDEPENDENT_VOWELS = ["అ", "ఆ", "ఇ", "ఈ", "ఉ", "ఊ", "ఎ", "ఏ", "ఐ", "ఒ", "ఓ"]
+VIRAMA = "్"
+ANUSVARA = "ం"
+
+VOCABULARY_SIZE = 20000
+ZIPF_EXPONENT = 1.07
+
+
+def _akshara(rng: random.Random) -> str:
+    base = rng.choice(CONSONANTS)
+    if rng.random() < 0.12:
+        base += VIRAMA + rng.choice(CONSONANTS)
+    akshara = base + rng.choice(VOWEL_SIGNS)
+    if rng.random() < 0.08:
+        akshara += ANUSVARA
+    return akshara
+
+
+def _word(rng: random.Random) -> str:
+    prefix = rng.choice(INDEPENDENT_VOWELS) if rng.random() < 0.15 else ""
+    return prefix + "".join(_akshara(rng) for _ in range(rng.randint(2, 5)))
+
+
+def build_vocabulary(size: int = VOCABULARY_SIZE, seed: int = 7) -> List[str]:
+    """Deterministic list of words, most frequent first."""
+    rng = random.Random(seed)
+    words = list(COMMON_WORDS)
+    seen = set(words)
+    while len(words) < size:
+        word = _word(rng)
+        if word not in seen:
+            seen.add(word)
+            words.append(word)
+    return words
+
+
+class _WordSampler:
+    """Draws words with probability proportional to 1 / rank ** ZIPF_EXPONENT."""
+
+    def __init__(self, rng: random.Random, words: List[str]):
+        self._rng = rng
+        self._words = words
+        self._cum_weights = list(accumulate(1 / (rank ** ZIPF_EXPONENT) for rank in range(1, len(words) + 1)))
+
+    def words(self, count: int) -> List[str]:
+        return self._rng.choices(self._words, cum_weights=self._cum_weights, k=count)
+
+
+def generate_stories(count: int, seed: int = 42) -> Iterator[Dict[str, Any]]:
+    """Yield ``count`` story dicts shaped like the ones ``app.py`` stores."""
+    rng = random.Random(seed)
+    sampler = _WordSampler(rng, build_vocabulary())
+    start = datetime(2025, 1, 1)
+    author_pool = max(count // 20, 1)
+    for i in range(count):
+        sentences = [" ".join(sampler.words(rng.randint(6, 14))) + "." for _ in range(rng.randint(3, 6))]
+        content = " ".join(sentences)
+        yield {
+            "id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "title": " ".join(sampler.words(rng.randint(2, 4))),
+            "author": f"{rng.choice(AUTHORS)} {rng.randint(1, author_pool)}",
+            "timestamp": "ఇప్పుడే",
+            "category": rng.choice(CATEGORIES),
+            "content": content,
+            "excerpt": create_story_excerpt(content),
+            "upvotes": rng.randint(0, 500),
+            "downvotes": rng.randint(0, 50),
+            "comments": rng.randint(0, 100),
+            "views": rng.randint(0, 5000),
+            "created_at": (start + timedelta(minutes=i)).isoformat(),
+            "tags": sampler.words(rng.randint(0, 3)),
+        }
@@ -0,0 +1,261 @@
+"""Benchmark suite for the app's hot paths, with a regression check against a baseline.
+
+Usage::
+
+    python -m benchmarks.suite                          # run, compare with benchmarks/baseline.json
+    python -m benchmarks.suite --output results.json    # also keep this run's results
+    python -m benchmarks.suite --save-baseline          # make this run the new baseline
+
+A SQLite store in a temporary directory is filled with ``--size`` generated
+stories (``benchmarks.corpus``) before ``app`` is imported.
+
+* Micro-benchmarks call ``TeluguStoriesApp`` methods directly, outside a
+  script run: Streamlit calls are no-ops there, so they measure the app's
+  own work (store queries, indexes, validation) per call.
+* Macro-benchmarks time whole reruns of ``app.py`` under ``AppTest``: the
+  home feed (also with ``TELUGU_STORIES_METRICS=1``), a search, a vote click
+  and the statistics page. ``AppTest`` compiles the script afresh on every
+  run, which a server does once; the runs share one compiled script, so the
+  cases do not grow with the length of ``app.py``.
+
+Every case reports the minimum, median, 95th percentile and mean in milliseconds.
+Cases whose median is more than ``--tolerance`` (and ``MIN_DELTA_MS``) slower
+than the baseline are listed and the exit status is 1. Baselines are only comparable on the same
+machine, corpus size and Python and Streamlit versions; those are recorded in
+the ``meta`` section and a mismatch is reported.
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.corpus import generate_stories  # noqa: E402
+
+BASELINE = os.path.join(ROOT, "benchmarks", "baseline.json")
+SEARCH_QUERY = "కాకతీయ"
+TOLERANCE = 0.25
+# Changes smaller than this are timer noise on sub-millisecond cases
+MIN_DELTA_MS = 0.05
+
+
+def _summary(samples: List[float]) -> Dict[str, Any]:
+    samples = sorted(samples)
+    return {
+        "min_ms": round(samples[0], 4),
+        "median_ms": round(statistics.median(samples), 4),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 4),
+        "mean_ms": round(statistics.fmean(samples), 4),
+        "runs": len(samples),
+    }
+
+
+def _sample(func: Callable[[int], Any], runs: int, warmup: int = 3) -> Dict[str, Any]:
+    """Time ``func(i)`` for ``runs`` values of ``i`` after ``warmup`` untimed calls."""
+    for i in range(warmup):
+        func(i)
+    samples = []
+    for i in range(runs):
+        start = time.perf_counter()
+        func(warmup + i)
+        samples.append((time.perf_counter() - start) * 1000)
+    return _summary(samples)
+
+
+def _fill_store(path: str, size: int) -> None:
+    from story_store import SQLiteStoryStore
+
+    store = SQLiteStoryStore(path)
+    batch = []
+    for story in generate_stories(size):
+        batch.append(story)
+        if len(batch) == 1000:
+            store.add_stories(batch)
+            batch = []
+    store.add_stories(batch)
+    store.close()
+
+
+def micro_benchmarks(runs: int) -> Dict[str, Dict[str, Any]]:
+    """Time single ``TeluguStoriesApp`` methods outside a script run."""
+    from app import TeluguStoriesApp
+
+    app = TeluguStoriesApp()
+    rng = random.Random(0)
+    stories = app.store.list_stories(limit=1000)
+    # Fresh submissions: unique titles and bodies the store has not seen
+    submissions = list(generate_stories(runs + 3, seed=7))
+    for number, story in enumerate(submissions):
+        story["title"] = f"{story['title']} {number}"
+    category = app.CATEGORIES[0]
+
+    results = {
+        "filter_stories/new": _sample(lambda i: app._filter_stories("", "అన్నీ", app.FEED_PAGE_SIZE + 1), runs),
+        "filter_stories/category": _sample(
+            lambda i: app._filter_stories("", category, app.FEED_PAGE_SIZE + 1), runs),
+        "filter_stories/hot": _sample(
+            lambda i: app._filter_stories("", "అన్నీ", app.FEED_PAGE_SIZE + 1, ranking="hot"), runs),
+        "filter_stories/search": _sample(
+            lambda i: app._filter_stories(SEARCH_QUERY, "అన్నీ", app.FEED_PAGE_SIZE + 1), runs),
+        "validate_story_data": _sample(lambda i: app._validate_story_data(
+            submissions[i]["title"], submissions[i]["author"], submissions[i]["content"],
+            submissions[i]["category"]), runs),
+        "create_story_excerpt": _sample(lambda i: app._create_story_excerpt(submissions[i]["content"]), runs),
+        "handle_story_interaction": _sample(
+            lambda i: app._handle_story_interaction(rng.choice(stories), rng.choice(["upvote", "downvote"])), runs),
+        "render_statistics": _sample(lambda i: app._render_statistics(), runs),
+        # The card body: the st.fragment wrapper does nothing outside a script run
+        "render_story_card": _sample(lambda i: type(app)._render_story_card.__wrapped__(app, stories[i % 10]), runs),
+    }
+    app.votes.flush()
+    return results
+
+
+@contextmanager
+def _compiled_once() -> Iterator[None]:
+    """Have ``AppTest`` runs share one compiled script, as a server's runs do."""
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    from streamlit.testing.v1 import local_script_runner
+
+    # Each run's script runner makes its own ScriptCache, so app.py is parsed and compiled on every rerun
+    script_cache = ScriptCache()
+    fresh_cache = local_script_runner.ScriptCache
+    local_script_runner.ScriptCache = lambda: script_cache
+    try:
+        yield
+    finally:
+        local_script_runner.ScriptCache = fresh_cache
+
+
+def macro_benchmarks(runs: int) -> Dict[str, Dict[str, Any]]:
+    """Time full reruns of ``app.py`` under ``AppTest``."""
+    from streamlit.testing.v1 import AppTest
+
+    def new_session() -> AppTest:
+        return AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=60).run()
+
+    results = {"rerun/first_run": _sample(lambda i: new_session(), max(runs // 4, 3), warmup=1)}
+
+    at = new_session()
+    results["rerun/home"] = _sample(lambda i: at.run(), runs)
+
+    # The same rerun with render profiling on (read by app.py on every script run)
+    os.environ["TELUGU_STORIES_METRICS"] = "1"
+    try:
+        at = new_session()
+        results["rerun/home_profiled"] = _sample(lambda i: at.run(), runs)
+    finally:
+        del os.environ["TELUGU_STORIES_METRICS"]
+
+    at = new_session()
+    at.text_input(key="main_search").input(SEARCH_QUERY).run()
+    # Entering text only shows suggestions; the button runs the search
+    at.button(key="run_search").click().run()
+    results["rerun/search"] = _sample(lambda i: at.run(), runs)
+
+    at = new_session()
+
+    def vote(i: int) -> None:
+        upvotes = [b for b in at.button if (b.key or "").startswith("upvote_")]
+        upvotes[i % len(upvotes)].click().run()
+    results["rerun/vote"] = _sample(vote, runs)
+
+    at = new_session()
+    next(b for b in at.button if b.label == "📊 గణాంకాలు").click().run()
+    results["rerun/statistics"] = _sample(lambda i: at.run(), runs)
+    return results
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Print current versus baseline medians; returns the cases that regressed."""
+    for key in ("size", "python", "streamlit", "machine"):
+        if baseline["meta"].get(key) != results["meta"].get(key):
+            print(f"note: baseline {key} is {baseline['meta'].get(key)!r}, "
+                  f"this run {results['meta'].get(key)!r}")
+    regressions = []
+    print(f"{'case':<28} {'baseline ms':>12} {'current ms':>11} {'change':>8}")
+    for name, current in results["cases"].items():
+        previous = baseline["cases"].get(name)
+        if previous is None:
+            print(f"{name:<28} {'-':>12} {current['median_ms']:>11.3f} {'new':>8}")
+            continue
+        change = current["median_ms"] / max(previous["median_ms"], 1e-9) - 1
+        flag = ""
+        if change > tolerance and current["median_ms"] - previous["median_ms"] > MIN_DELTA_MS:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<28} {previous['median_ms']:>12.3f} {current['median_ms']:>11.3f} {change:>+8.0%}{flag}")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=10000, help="stories in the benchmark store")
+    parser.add_argument("--runs", type=int, default=200, help="timed calls per micro-benchmark")
+    parser.add_argument("--reruns", type=int, default=20, help="timed reruns per macro-benchmark")
+    parser.add_argument("--skip-macro", action="store_true", help="only run the micro-benchmarks")
+    parser.add_argument("--output", help="write this run's results to a JSON file")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="write the results to --baseline")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE,
+                        help="allowed slowdown of a median before it counts as a regression")
+    args = parser.parse_args(argv)
+
+    # Every Streamlit call outside a script run would log a warning
+    logging.disable(logging.WARNING)
+    with tempfile.TemporaryDirectory() as directory:
+        # Read by app.py at import time
+        os.environ["TELUGU_STORIES_BACKEND"] = "sqlite"
+        os.environ["TELUGU_STORIES_DB"] = os.path.join(directory, "stories.db")
+        _fill_store(os.environ["TELUGU_STORIES_DB"], args.size)
+        import streamlit
+        results: Dict[str, Any] = {
+            "meta": {
+                "size": args.size,
+                "python": platform.python_version(),
+                "streamlit": streamlit.__version__,
+                "machine": f"{platform.system()} {platform.machine()} {platform.processor()}".strip(),
+                "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            },
+            "cases": micro_benchmarks(args.runs),
+        }
+        if not args.skip_macro:
+            with _compiled_once():
+                results["cases"].update(macro_benchmarks(args.reruns))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as out:
+            json.dump(results, out, indent=2, ensure_ascii=False)
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as out:
+            json.dump(results, out, indent=2, ensure_ascii=False)
+            out.write("\n")
+    if args.save_baseline or not os.path.exists(args.baseline):
+        for name, case in results["cases"].items():
+            print(f"{name:<28} {case['median_ms']:>11.3f} ms (p95 {case['p95_ms']:.3f})")
+        print(f"baseline written to {args.baseline}" if args.save_baseline else
+              f"no baseline at {args.baseline}; run with --save-baseline to create one")
+        return 0
+    with open(args.baseline, encoding="utf-8") as source:
+        baseline = json.load(source)
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"{len(regressions)} case(s) slower than the baseline by more than {args.tolerance:.0%}: "
+              + ", ".join(regressions))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
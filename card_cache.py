@@ -0,0 +1,53 @@
+"""Pre-rendered story card HTML, shared by every session.
+
+Most of a card (category, title, author, excerpt, tags) only changes when the
+story is edited, which bumps its ``version`` (see ``story_store.StoryStore``).
+``CardCache`` keeps that HTML per story id together with the version it was
+built from, and rebuilds it when a newer version is rendered. The card is kept
+as static parts with gaps between them for the values that change from rerun
+to rerun, like the relative time and the view count.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Tuple
+
+CARD_CACHE_SIZE = 4096
+
+CardParts = Tuple[str, ...]
+
+
+class CardCache:
+    """Least recently used cache of card HTML parts by story id, checked against the story version."""
+
+    def __init__(self, max_size: int = CARD_CACHE_SIZE):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        # story id -> (version, parts), least recently used first
+        self._cards: "OrderedDict[str, Tuple[int, CardParts]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, story: Dict[str, Any], build: Callable[[Dict[str, Any]], CardParts]) -> CardParts:
+        """The cached parts of ``story``'s card, built with ``build`` if missing or outdated."""
+        story_id, version = story["id"], story["version"]
+        with self._lock:
+            cached = self._cards.get(story_id)
+            if cached is not None and cached[0] == version:
+                self._cards.move_to_end(story_id)
+                self.hits += 1
+                return cached[1]
+            self.misses += 1
+        # Built outside the lock; two sessions may both build a new card, which is harmless
+        parts = build(story)
+        with self._lock:
+            cached = self._cards.get(story_id)
+            if cached is None or cached[0] <= version:
+                self._cards[story_id] = (version, parts)
+                self._cards.move_to_end(story_id)
+                while len(self._cards) > self.max_size:
+                    self._cards.popitem(last=False)
+        return parts
+
+    def __len__(self) -> int:
+        return len(self._cards)
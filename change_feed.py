@@ -0,0 +1,160 @@
+"""Replaying other processes' writes into this process's in-memory indexes.
+
+Several app processes (replicas behind a load balancer) can share one SQLite
+database. The store is shared, but the search, tag and ranking indexes,
+suggestions and statistics are built in each process and only see the writes
+that process makes. The store therefore appends every new story, vote delta
+and view count to a ``changes`` table, numbered in commit order and tagged
+with the writing store's ``origin``. ``ChangeFeed`` polls that table from
+the last number it has seen, so a poll costs one indexed range read of the
+new changes, however large the corpus.
+
+Each index subscribes with the number of the newest change when it started
+building from the store, and gets every later change from other origins
+(its own process updated it directly). New stories are read back from the
+store once per batch, with their bodies. An index that falls behind the
+changes still kept (``RETENTION``) is dropped through its ``expired``
+callback and rebuilt.
+
+Indexes skip stories they already hold, so a story written while an index
+was being built is not indexed twice. Counters have no such check: a vote,
+view or (for the statistics) story written in that window may be counted
+twice. The statistics page's consistency check repairs the totals.
+"""
+
+import logging
+import threading
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from story_store import STORY_ADDED, VIEWS_RECORDED, VOTES_CHANGED, Change, StoryStore
+
+logger = logging.getLogger(__name__)
+
+
+class _Subscription(NamedTuple):
+    story_added: Optional[Callable[[int, dict], None]]
+    votes_changed: Optional[Callable[[int, int, int], None]]
+    views_recorded: Optional[Callable[[int, int], None]]
+    expired: Optional[Callable[[], None]]
+
+
+class ChangeFeed:
+    """Polls the store's change feed and hands other processes' writes to subscribed indexes."""
+
+    POLL_INTERVAL_MS = 500
+    BATCH_SIZE = 1000
+    # Changes kept in the store; a process further behind than this rebuilds its indexes
+    RETENTION = 100000
+    # Prune the table once every this many polls that found changes
+    PRUNE_EVERY = 100
+
+    def __init__(self, store: StoryStore, poll_interval_ms: Optional[int] = None):
+        self.store = store
+        self.poll_interval_ms = poll_interval_ms or self.POLL_INTERVAL_MS
+        # Serializes polls; subscriptions are changed under it too
+        self._lock = threading.Lock()
+        self._subscriptions: Dict[str, _Subscription] = {}
+        # name -> number of the last change applied to it
+        self._positions: Dict[str, int] = {}
+        self._polls = 0
+        self._closed = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def position(self) -> int:
+        """Number of the newest change; take it before building an index from the store."""
+        return self.store.last_change()
+
+    def subscribe(self, name: str, since: int, story_added: Optional[Callable[[int, dict], None]] = None,
+                  votes_changed: Optional[Callable[[int, int, int], None]] = None,
+                  views_recorded: Optional[Callable[[int, int], None]] = None,
+                  expired: Optional[Callable[[], None]] = None) -> None:
+        """Apply changes after ``since`` to the index called ``name``, replacing an earlier one of that name.
+
+        ``story_added(seq, story)``, ``votes_changed(seq, upvote_delta,
+        downvote_delta)`` and ``views_recorded(seq, count)`` receive the
+        changes of their kind; ``expired()`` is called if the index falls too
+        far behind and must be rebuilt.
+        """
+        with self._lock:
+            self._subscriptions[name] = _Subscription(story_added, votes_changed, views_recorded, expired)
+            self._positions[name] = since
+
+    def start(self) -> "ChangeFeed":
+        """Start polling in a background thread."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="ChangeFeed-poller", daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self) -> None:
+        while not self._closed.wait(self.poll_interval_ms / 1000):
+            try:
+                self.poll()
+            except Exception:
+                logger.exception("Polling the change feed failed")
+
+    def close(self) -> None:
+        """Stop the poller."""
+        self._closed.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def poll(self) -> int:
+        """Apply every change written since the last poll; returns how many came from other processes."""
+        with self._lock:
+            expired = self._expire_lagging()
+            after = min(self._positions.values(), default=None)
+            applied = 0
+            while after is not None:
+                changes = self.store.changes_since(after, self.BATCH_SIZE)
+                if not changes:
+                    break
+                applied += self._apply(changes)
+                after = changes[-1].change_seq
+                if len(changes) < self.BATCH_SIZE:
+                    break
+            if applied:
+                self._polls += 1
+                if self._polls % self.PRUNE_EVERY == 0:
+                    self.store.prune_changes(self.RETENTION)
+        # Outside the lock: rebuilding an index subscribes it again
+        for callback in expired:
+            callback()
+        return applied
+
+    def _expire_lagging(self) -> List[Callable[[], None]]:
+        """Drop subscriptions whose next change has already been pruned; returns their ``expired`` callbacks."""
+        if not self._positions:
+            return []
+        first = self.store.first_change()
+        callbacks = []
+        for name, position in list(self._positions.items()):
+            if first > position + 1:
+                subscription = self._subscriptions.pop(name)
+                del self._positions[name]
+                logger.warning("%s fell behind the change feed and is rebuilt", name)
+                if subscription.expired is not None:
+                    callbacks.append(subscription.expired)
+        return callbacks
+
+    def _apply(self, changes: List[Change]) -> int:
+        foreign = [change for change in changes if change.origin != self.store.origin]
+        new_seqs = [change.seq for change in foreign if change.kind == STORY_ADDED]
+        stories = ({story["seq"]: story for story in self.store.get_stories_by_seq(new_seqs, content=True)}
+                   if new_seqs else {})
+        for name, subscription in self._subscriptions.items():
+            position = self._positions[name]
+            for change in foreign:
+                if change.change_seq <= position:
+                    continue
+                if change.kind == STORY_ADDED and subscription.story_added and change.seq in stories:
+                    # Counters as written; votes and views since then follow as changes of their own
+                    story = {**stories[change.seq], "upvotes": change.upvotes, "downvotes": change.downvotes,
+                             "views": change.views}
+                    subscription.story_added(change.seq, story)
+                elif change.kind == VOTES_CHANGED and subscription.votes_changed:
+                    subscription.votes_changed(change.seq, change.upvotes, change.downvotes)
+                elif change.kind == VIEWS_RECORDED and subscription.views_recorded:
+                    subscription.views_recorded(change.seq, change.views)
+            self._positions[name] = max(position, changes[-1].change_seq)
+        return len(foreign)
@@ -0,0 +1,149 @@
+"""Prefix completion of weighted keys.
+
+``CompletionTrie`` is a burst trie: keys branch one character at a time, and
+keys below a branch with few of them sit in a flat container until it grows
+past ``BURST_SIZE``, so there are far fewer nodes than characters. Every node
+keeps its subtree's ``TOP_K`` heaviest keys and updates them as weights
+change, so completing a prefix is a walk down the prefix plus a slice.
+
+Keys are expected to be normalized already (see ``tags.tag_key``). Branching
+on characters rather than aksharas lets a prefix that stops in the middle of
+an akshara, like a consonant still waiting for its vowel sign or a virama
+before the second half of a conjunct, complete to every key it starts.
+"""
+
+import heapq
+from typing import Dict, List, Optional, Set, Tuple
+
+# Child holding the key that ends exactly at its parent's prefix; no character compares equal to it
+_END = ""
+
+
+class _Node:
+    """A container (``keys``) or a branch (``children`` by next character, and ``top``)."""
+
+    __slots__ = ("keys", "children", "top")
+
+    def __init__(self):
+        self.keys: Set[str] = set()
+        self.children: Optional[Dict[str, "_Node"]] = None
+        self.top: List[str] = []
+
+
+class CompletionTrie:
+    """Weighted keys that can be completed from a prefix, heaviest first.
+
+    Not thread-safe; owners hold their own lock around it.
+    """
+
+    TOP_K = 10
+    BURST_SIZE = 32
+
+    def __init__(self):
+        self._root = _Node()
+        self._weights: Dict[str, float] = {}
+
+    def __len__(self) -> int:
+        return len(self._weights)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._weights
+
+    def weight(self, key: str) -> float:
+        return self._weights.get(key, 0)
+
+    def _rank(self, key: str) -> Tuple[float, str]:
+        """Sort key: heaviest first, then alphabetical."""
+        return -self._weights[key], key
+
+    def add(self, key: str, delta: float = 1) -> None:
+        """Add ``delta`` to ``key``'s weight, inserting the key if it is new."""
+        old = self._weights.get(key)
+        self._weights[key] = (old or 0) + delta
+        branches = self._insert(key) if old is None else self._branches(key)
+        if old is None or delta >= 0:
+            for node in branches:
+                self._offer(node, key)
+        else:
+            # A lighter key may fall out of a top list; refill those from the level below, deepest first
+            for node in reversed(branches):
+                if key in node.top:
+                    node.top = self._best(self._candidates(node), self.TOP_K)
+
+    def complete(self, prefix: str, limit: int = TOP_K) -> List[str]:
+        """Up to ``limit`` (at most ``TOP_K``) keys starting with ``prefix``, heaviest first."""
+        node = self._root
+        for char in prefix:
+            if node.children is None:
+                return self._best([key for key in node.keys if key.startswith(prefix)], limit)
+            node = node.children.get(char)
+            if node is None:
+                return []
+        if node.children is None:
+            return self._best(node.keys, limit)
+        return node.top[:limit]
+
+    def _best(self, keys, limit: int) -> List[str]:
+        return heapq.nsmallest(limit, keys, key=self._rank)
+
+    def _offer(self, node: _Node, key: str) -> None:
+        """Keep ``node.top`` sorted after ``key`` got heavier."""
+        top = node.top
+        if key not in top:
+            if len(top) >= self.TOP_K:
+                if self._rank(key) >= self._rank(top[-1]):
+                    return
+                top.pop()
+            top.append(key)
+        top.sort(key=self._rank)
+
+    def _candidates(self, node: _Node) -> List[str]:
+        """Every key that can be in a branch's top list: its children's tops and containers."""
+        keys: List[str] = []
+        for child in node.children.values():
+            keys.extend(child.top if child.children is not None else child.keys)
+        return keys
+
+    def _branches(self, key: str) -> List[_Node]:
+        """Branch nodes on the path to ``key``, root first."""
+        branches = []
+        node = self._root
+        depth = 0
+        while node.children is not None:
+            branches.append(node)
+            node = node.children[key[depth] if depth < len(key) else _END]
+            depth += 1
+        return branches
+
+    def _insert(self, key: str) -> List[_Node]:
+        """Put a new key in its container, bursting it if full; returns the branches above it."""
+        branches = []
+        node = self._root
+        depth = 0
+        while node.children is not None:
+            branches.append(node)
+            char = key[depth] if depth < len(key) else _END
+            child = node.children.get(char)
+            if child is None:
+                child = node.children[char] = _Node()
+            node = child
+            depth += 1
+        node.keys.add(key)
+        # A container of the key equal to its prefix never grows, so it is never burst
+        while len(node.keys) > self.BURST_SIZE:
+            self._burst(node, depth)
+            branches.append(node)
+            char = key[depth] if depth < len(key) else _END
+            node = node.children[char]
+            depth += 1
+        return branches
+
+    def _burst(self, node: _Node, depth: int) -> None:
+        """Turn a full container into a branch with one container per next character."""
+        children: Dict[str, _Node] = {}
+        for key in node.keys:
+            char = key[depth] if depth < len(key) else _END
+            children.setdefault(char, _Node()).keys.add(key)
+        node.top = self._best(node.keys, self.TOP_K)
+        node.children = children
+        node.keys = set()
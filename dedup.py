@@ -0,0 +1,132 @@
+"""Duplicate and near-duplicate detection for submitted stories.
+
+* Titles are compared by a normalized key (NFC, zero-width joiners removed,
+  case-folded, whitespace collapsed), stored with each story and indexed.
+  Author names get the same key, so one author's stories are indexed and
+  counted together however the name was typed.
+* Story bodies get a MinHash signature over shingles of three aksharas,
+  computed with one-permutation hashing (one hash per shingle, spread over
+  ``SIGNATURE_BINS`` bins). Signatures are cut into LSH bands; stories that
+  share a band are near-duplicate candidates, which are then confirmed by
+  the estimated Jaccard similarity.
+"""
+
+import re
+import unicodedata
+import zlib
+from array import array
+from functools import lru_cache
+from typing import List, Optional, Sequence, Set
+
+from telugu_text import split_aksharas
+
+SIGNATURE_BINS = 32
+BAND_ROWS = 4
+BANDS = SIGNATURE_BINS // BAND_ROWS
+SHINGLE_AKSHARAS = 3
+NEAR_DUPLICATE_THRESHOLD = 0.8
+
+_EMPTY_BIN = 0xFFFFFFFF
+_BIN_BITS = SIGNATURE_BINS.bit_length() - 1
+# Zero-width space, ZWNJ, ZWJ, word joiner and BOM
+_ZERO_WIDTH = re.compile("[\u200b\u200c\u200d\u2060\ufeff]+")
+_WHITESPACE = re.compile(r"\s+")
+# Punctuation and symbols (including the dandas । and ॥), dropped before shingling
+_PUNCTUATION = re.compile("[" + "".join(re.escape(chr(cp)) for cp in range(0x10000)
+                                        if unicodedata.category(chr(cp))[0] in "PS") + "]+")
+
+
+def _normalize(text: str) -> str:
+    text = _ZERO_WIDTH.sub("", unicodedata.normalize("NFC", text)).casefold()
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def normalize_title(title: str) -> str:
+    """Key under which two titles count as the same title."""
+    return _normalize(title)
+
+
+def normalize_author(name: str) -> str:
+    """Form an author name is stored in: NFC, with runs of whitespace collapsed."""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFC", name)).strip()
+
+
+def author_key(name: str) -> str:
+    """Key under which two author names count as the same author."""
+    return _normalize(name)
+
+
+def content_shingles(content: str) -> Set[str]:
+    """Overlapping runs of ``SHINGLE_AKSHARAS`` aksharas, ignoring punctuation."""
+    aksharas = split_aksharas(_normalize(_PUNCTUATION.sub("", content)))
+    if len(aksharas) < SHINGLE_AKSHARAS:
+        return {"".join(aksharas)} if aksharas else set()
+    return set(map("".join, zip(*(aksharas[i:] for i in range(SHINGLE_AKSHARAS)))))
+
+
+def _mix32(value: int) -> int:
+    """MurmurHash3 finalizer; spreads CRC32's linear bits before taking minima."""
+    value ^= value >> 16
+    value = (value * 0x85EBCA6B) & 0xFFFFFFFF
+    value ^= value >> 13
+    value = (value * 0xC2B2AE35) & 0xFFFFFFFF
+    return value ^ (value >> 16)
+
+
+# Validation and the insert that follows it both need a story's signature;
+# callers must treat the returned array as read-only
+@lru_cache(maxsize=4096)
+def content_signature(content: str) -> array:
+    """MinHash signature (one-permutation hashing) of a story body."""
+    signature = array("I", [_EMPTY_BIN] * SIGNATURE_BINS)
+    shift = 32 - _BIN_BITS
+    for shingle in content_shingles(content):
+        hashed = _mix32(zlib.crc32(shingle.encode("utf-8")))
+        slot = hashed >> shift
+        value = hashed & ((1 << shift) - 1)
+        if value < signature[slot]:
+            signature[slot] = value
+    return signature
+
+
+def signature_from_bytes(data: bytes) -> array:
+    signature = array("I")
+    signature.frombytes(data)
+    return signature
+
+
+def band_keys(signature: Sequence[int]) -> List[int]:
+    """One stable 64-bit key per LSH band; bands with an empty bin are skipped."""
+    keys = []
+    for band in range(BANDS):
+        rows = signature[band * BAND_ROWS:(band + 1) * BAND_ROWS]
+        if _EMPTY_BIN in rows:
+            continue
+        keys.append((band << 32) | zlib.crc32(array("I", rows).tobytes()))
+    return keys
+
+
+def signature_similarity(first: Sequence[int], second: Sequence[int]) -> float:
+    """Estimated Jaccard similarity of the shingle sets behind two signatures."""
+    compared = equal = 0
+    for a, b in zip(first, second):
+        if a == _EMPTY_BIN and b == _EMPTY_BIN:
+            continue
+        compared += 1
+        equal += a == b
+    return equal / compared if compared else 0.0
+
+
+def most_similar(signature: Sequence[int], candidates: List[dict],
+                 threshold: float = NEAR_DUPLICATE_THRESHOLD) -> Optional[dict]:
+    """Pick the candidate most similar to ``signature`` if it reaches ``threshold``.
+
+    Candidates are dicts with a ``signature`` entry, as returned by
+    ``StoryStore.find_similar_content``.
+    """
+    best, best_score = None, threshold
+    for candidate in candidates:
+        score = signature_similarity(signature, candidate["signature"])
+        if score >= best_score:
+            best, best_score = candidate, score
+    return best
@@ -0,0 +1,130 @@
+"""A process-wide, read-only copy of the newest stories, read by every session's feed.
+
+Almost every rerun of every session shows the first pages of the newest-first
+feed. ``FeedSnapshot`` keeps the newest ``SIZE`` stories as an immutable
+``Snapshot``: a version number and a tuple of read-only mappings, newest
+first. Sessions read the current snapshot without a lock or a store
+connection and copy only the page they show, so nothing about the corpus is
+kept per session.
+
+A published snapshot is never changed. A new story publishes the next
+version, a new tuple that shares every other story with the last one.
+Counter changes (flushed votes and views, comments, other processes' writes)
+mark the snapshot stale instead; the next reader to notice rebuilds it from
+the store with one query while other readers keep the old one. A snapshot
+older than ``MAX_AGE_MS`` is rebuilt the same way, which picks up changes no
+one reports, such as comments written by other processes.
+"""
+
+import threading
+import time
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional, Tuple
+
+from story_store import StoryStore, with_previews
+
+
+def _frozen(story: Dict[str, Any]) -> Mapping[str, Any]:
+    # Feed cards never show the body
+    fields = {key: value for key, value in story.items() if key != "content"}
+    return MappingProxyType({**fields, "tags": tuple(story.get("tags", ()))})
+
+
+class Snapshot(NamedTuple):
+    """One published version of the newest stories."""
+
+    version: int
+    # Newest first
+    stories: Tuple[Mapping[str, Any], ...]
+    # Whether ``stories`` holds every stored story, so a page may end before it is full
+    complete: bool
+    built_at: float
+
+
+class FeedSnapshot:
+    """Copy-on-write snapshots of the newest stories, read without locks."""
+
+    # Twenty feed pages
+    SIZE = 200
+    MAX_AGE_MS = 1000
+
+    def __init__(self, store: StoryStore, size: Optional[int] = None, max_age_ms: Optional[int] = None):
+        self.store = store
+        self.size = size or self.SIZE
+        self.max_age_ms = max_age_ms or self.MAX_AGE_MS
+        # Serializes publishing; readers never take it
+        self._lock = threading.Lock()
+        # Held by the one reader rebuilding a stale snapshot
+        self._rebuilding = threading.Lock()
+        self._stale = False
+        self._snapshot = self._build(0)
+
+    def _build(self, version: int) -> Snapshot:
+        stories = self.store.list_stories(limit=self.size)
+        return Snapshot(version, tuple(_frozen(story) for story in stories), len(stories) < self.size,
+                        time.monotonic())
+
+    def current(self) -> Snapshot:
+        """The newest published snapshot, rebuilt first if it is stale and no one else is rebuilding it."""
+        snapshot = self._snapshot
+        expired = time.monotonic() - snapshot.built_at > self.max_age_ms / 1000
+        if (self._stale or expired) and self._rebuilding.acquire(blocking=False):
+            try:
+                snapshot = self._rebuild()
+            finally:
+                self._rebuilding.release()
+        return snapshot
+
+    def _rebuild(self) -> Snapshot:
+        # Cleared before reading, so changes made during the read mark the new snapshot stale
+        self._stale = False
+        started = self._snapshot.version
+        fresh = self._build(started + 1)
+        with self._lock:
+            if self._snapshot.version != started:
+                # A story was published meanwhile and may be missing from ``fresh``
+                self._stale = True
+                return self._snapshot
+            self._snapshot = fresh
+        return fresh
+
+    def invalidate(self) -> None:
+        """Have the next reader rebuild the snapshot, after counters changed in the store."""
+        self._stale = True
+
+    def story_added(self, seq: int, story: Dict[str, Any]) -> None:
+        """Publish the next version with a newly stored story."""
+        record = _frozen({"version": 1, "upvotes": 0, "downvotes": 0, "comments": 0, "views": 0,
+                          **with_previews(story), "seq": seq})
+        with self._lock:
+            snapshot = self._snapshot
+            stories = snapshot.stories
+            # Concurrent writers may finish out of order
+            position = next((i for i, other in enumerate(stories) if other["seq"] <= seq), len(stories))
+            if position < len(stories) and stories[position]["seq"] == seq:
+                return
+            if position == len(stories) and not snapshot.complete:
+                # Older than every story kept
+                return
+            stories = stories[:position] + (record,) + stories[position:]
+            complete = snapshot.complete and len(stories) <= self.size
+            self._snapshot = snapshot._replace(version=snapshot.version + 1, stories=stories[:self.size],
+                                               complete=complete)
+
+    def page(self, category: Optional[str] = None, limit: Optional[int] = None,
+             before: Optional[int] = None) -> Optional[List[Dict[str, Any]]]:
+        """``StoryStore.list_stories`` answered from the snapshot, or None if the page reaches past it.
+
+        The stories are copies the caller may change.
+        """
+        snapshot = self.current()
+        page = []
+        for story in snapshot.stories:
+            if (before is None or story["seq"] < before) and (category is None or story["category"] == category):
+                page.append({**story, "tags": list(story["tags"])})
+                if limit is not None and len(page) == limit:
+                    return page
+        return page if snapshot.complete else None
+
+    def __len__(self) -> int:
+        return len(self._snapshot.stories)
@@ -0,0 +1,111 @@
+"""Search in Latin script: trigram postings over the romanized title, author and tags of every story.
+
+Each story stores ``story_store.latin_text``, the ``transliteration.latin_key``
+of its title, author and tags, written when the story is. The index keeps
+that text per story and a sorted posting list per character trigram of it.
+A query is folded by the same ``latin_key``, so "palleturi prayanam" finds
+"పల్లెటూరి ప్రయాణం"; its trigrams narrow the stories down and a substring
+check of the stored text confirms each match. Nothing is romanized at query
+time except the query itself. A query needs a trigram, so keys shorter than
+three letters are not searched; matches are found newest first and a page
+stops once it is full.
+"""
+
+import threading
+from array import array
+from bisect import bisect_left, insort
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Set
+
+from story_store import FIELD_SEPARATOR, StoryStore, latin_text
+from transliteration import latin_key
+
+
+def _contains(postings: array, seq: int) -> bool:
+    position = bisect_left(postings, seq)
+    return position < len(postings) and postings[position] == seq
+
+
+class LatinSearchIndex:
+    """Trigram postings over the Latin keys of every story's title, author and tags."""
+
+    NGRAM_SIZE = 3
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # trigram -> sorted array of story sequence numbers
+        self._postings: Dict[str, array] = {}
+        # seq -> latin_text, for the final substring check
+        self._texts: Dict[int, str] = {}
+
+    @classmethod
+    def from_store(cls, store: StoryStore) -> "LatinSearchIndex":
+        """Build an index over every story currently in ``store``."""
+        index = cls()
+        for seq, text in store.iter_latin_documents():
+            index.add_document(seq, text)
+        return index
+
+    def _ngrams(self, text: str) -> Set[str]:
+        size = self.NGRAM_SIZE
+        return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+    def add_story(self, seq: int, story: dict) -> None:
+        """Index a newly stored story."""
+        self.add_document(seq, latin_text(story))
+
+    def add_document(self, seq: int, text: str) -> None:
+        """Index a story's stored ``latin_text`` under ``seq``."""
+        ngrams = [g for g in self._ngrams(text) if FIELD_SEPARATOR not in g and g.strip()]
+        with self._lock:
+            self._texts[seq] = text
+            for ngram in ngrams:
+                postings = self._postings.get(ngram)
+                if postings is None:
+                    self._postings[ngram] = array("I", (seq,))
+                elif postings[-1] < seq:
+                    postings.append(seq)
+                elif not _contains(postings, seq):
+                    # Concurrent writers may finish out of order
+                    insort(postings, seq)
+
+    def _newest_matches(self, key: str, before: Optional[int]) -> Iterator[int]:
+        """Stories whose text contains ``key``, newest first, below ``before``; called under the lock.
+
+        Walks the shortest posting list of ``key``'s trigrams backwards and
+        probes the others by binary search, so a page stops as soon as it is full.
+        """
+        postings = []
+        for ngram in self._query_ngrams(key):
+            found = self._postings.get(ngram)
+            if found is None:
+                return
+            postings.append(found)
+        postings.sort(key=len)
+        shortest, others = postings[0], postings[1:]
+        end = len(shortest) if before is None else bisect_left(shortest, before)
+        for position in range(end - 1, -1, -1):
+            seq = shortest[position]
+            if all(_contains(other, seq) for other in others) and key in self._texts[seq]:
+                yield seq
+
+    def _query_ngrams(self, key: str) -> Set[str]:
+        return {g for g in self._ngrams(key) if g.strip()}
+
+    def matches(self, query: str, before: Optional[int] = None, limit: Optional[int] = None) -> List[int]:
+        """Sequence numbers of the stories matching a Latin-script ``query``, newest first, below ``before``.
+
+        Stops after ``limit`` matches. Keys shorter than ``NGRAM_SIZE`` letters match nothing.
+        """
+        key = latin_key(query)
+        if not self._query_ngrams(key):
+            return []
+        with self._lock:
+            return list(islice(self._newest_matches(key, before), limit))
+
+    def has_matches(self, query: str) -> bool:
+        """Whether any story matches a Latin-script ``query``."""
+        return bool(self.matches(query, limit=1))
+
+    def __len__(self) -> int:
+        return len(self._texts)
@@ -0,0 +1,139 @@
+"""Story previews computed once at write time: excerpt, word count and reading time.
+
+Excerpts are cut on akshara boundaries (``telugu_text.split_aksharas``), so a
+consonant is never separated from its virama, vowel sign or conjunct, and
+prefer ending on a full stop, danda (।) or double danda (॥).
+
+Stores write these fields with every new story and record ``PREVIEW_VERSION``
+beside them. Stories written before a change to this module are recomputed
+by the backfill, which spreads the work over a process pool::
+
+    python previews.py --db stories.db --workers 4
+"""
+
+import argparse
+import math
+import os
+import re
+import sys
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from telugu_text import split_aksharas
+
+EXCERPT_LENGTH = 150
+# Silent reading speed for Telugu prose; its words are long and agglutinative
+WORDS_PER_MINUTE = 150
+# Bump whenever the output of ``story_preview`` changes, so the backfill redoes stored previews
+PREVIEW_VERSION = 1
+BACKFILL_BATCH = 2000
+
+SENTENCE_ENDS = (".", "।", "॥", "?", "!")
+# A word is a whitespace-separated token with at least one letter or digit
+_WORD = re.compile(r"\S*\w\S*")
+
+
+def create_story_excerpt(content: str) -> str:
+    """At most ``EXCERPT_LENGTH`` characters of whole aksharas, ending on a sentence or word."""
+    content = content.strip()
+    if len(content) <= EXCERPT_LENGTH:
+        return content
+
+    # A cluster's extent depends only on the characters before it, so splitting one
+    # character past the limit is enough to find the last whole akshara that fits
+    end = 0
+    for cluster in split_aksharas(content[:EXCERPT_LENGTH + 1]):
+        if end + len(cluster) > EXCERPT_LENGTH:
+            break
+        end += len(cluster)
+    excerpt = content[:end]
+    last_sentence = max(excerpt.rfind(mark) for mark in SENTENCE_ENDS)
+    last_space = excerpt.rfind(' ')
+
+    if last_sentence > EXCERPT_LENGTH * 0.7:
+        return excerpt[:last_sentence + 1]
+    elif last_space > 0:
+        return excerpt[:last_space] + "..."
+    else:
+        return excerpt + "..."
+
+
+def count_words(content: str) -> int:
+    return len(_WORD.findall(content))
+
+
+def reading_minutes(word_count: int) -> int:
+    """Whole minutes to read ``word_count`` words, at least one."""
+    return max(1, math.ceil(word_count / WORDS_PER_MINUTE))
+
+
+def story_preview(content: str) -> Dict[str, Any]:
+    """The preview fields stored with a story."""
+    word_count = count_words(content)
+    return {
+        "excerpt": create_story_excerpt(content),
+        "word_count": word_count,
+        "reading_minutes": reading_minutes(word_count),
+    }
+
+
+def _preview_rows(batch: List[Tuple[int, str]]) -> List[Tuple[int, str, int, int]]:
+    """Worker task: ``(seq, excerpt, word_count, reading_minutes)`` per ``(seq, content)``."""
+    rows = []
+    for seq, content in batch:
+        preview = story_preview(content)
+        rows.append((seq, preview["excerpt"], preview["word_count"], preview["reading_minutes"]))
+    return rows
+
+
+def backfill_previews(store, workers: Optional[int] = None, batch_size: int = BACKFILL_BATCH) -> int:
+    """Recompute previews of stories written by an older ``PREVIEW_VERSION``; returns how many.
+
+    Batches of stories are read in order, previewed by a pool of ``workers``
+    processes (one process per CPU by default) and written back as they
+    finish. Stories can keep being added meanwhile; they already carry
+    current previews.
+    """
+    updated = 0
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # A bounded window of batches in flight keeps memory flat for any corpus size
+        in_flight: Deque[Future] = deque()
+        for batch in store.iter_stale_previews(PREVIEW_VERSION, batch_size):
+            in_flight.append(pool.submit(_preview_rows, batch))
+            if len(in_flight) >= 2 * workers:
+                updated += _write(store, in_flight.popleft().result())
+        while in_flight:
+            updated += _write(store, in_flight.popleft().result())
+    return updated
+
+
+def _write(store, rows: List[Tuple[int, str, int, int]]) -> int:
+    store.apply_previews(rows, PREVIEW_VERSION)
+    return len(rows)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from story_store import create_story_store
+
+    parser = argparse.ArgumentParser(description="Backfill story previews with a process pool.")
+    parser.add_argument("--db", default=os.environ.get("TELUGU_STORIES_DB", "stories.db"),
+                        help="SQLite database file (default: $TELUGU_STORIES_DB or stories.db)")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument("--batch-size", type=int, default=BACKFILL_BATCH)
+    args = parser.parse_args(argv)
+
+    store = create_story_store("sqlite", path=args.db)
+    start = time.perf_counter()
+    try:
+        updated = backfill_previews(store, args.workers, args.batch_size)
+    finally:
+        store.close()
+    print(f"updated {updated} previews in {time.perf_counter() - start:.1f} s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
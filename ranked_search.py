@@ -0,0 +1,425 @@
+"""Relevance-ranked full-text search: BM25 over per-field postings with MaxScore top-k.
+
+Titles, authors, tags and story text are tokenized and stemmed
+(``telugu_text.tokenize`` and ``stem``), so "కథలు", "కథలో" and "కథ" are one
+term. Each (term, field) pair has its own posting list of story sequence
+numbers and term frequencies. A story's score is the sum over query terms and
+fields of ``FIELD_WEIGHTS[field]`` times the field's BM25 score, so a word in
+the title counts three times as much as the same word in the text.
+
+Because the score is a plain sum over posting lists, each list has an upper
+bound (its weight and idf at its highest term frequency in a field of length
+zero). ``search`` walks the lists document-at-a-time with MaxScore: once the
+top ``k`` scores are known, lists whose bounds together cannot reach the
+``k``-th score are no longer walked, only probed by binary search for stories
+the other lists bring up. Ties go to the newer story.
+
+The index is saved to a file beside the database (``open``), so a restart
+loads it and indexes only stories written since, instead of rebuilding. The
+file records the store's ``database_id`` and is rebuilt from scratch when it
+was saved for other data, or holds more stories than the store. Saving runs
+on a background thread, never in the request that added a story::
+
+    python ranked_search.py --db stories.db     # build or refresh the file
+"""
+
+import argparse
+import heapq
+import json
+import logging
+import math
+import os
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from story_store import StoryStore
+from telugu_text import STEMMER_VERSION, stem, tokenize
+
+FIELDS = ("title", "author", "tags", "content")
+FIELD_WEIGHTS = (3.0, 2.0, 2.0, 1.0)
+
+logger = logging.getLogger(__name__)
+
+_MAGIC = b"TSRANKED"
+# Bump whenever the file layout changes; files in another format are rebuilt
+FORMAT_VERSION = 2
+_MAX_TF = 0xFFFF
+
+
+class _Postings:
+    """Stories with a term in one field, by seq, and the term's frequency in each."""
+
+    __slots__ = ("seqs", "tfs", "max_tf")
+
+    def __init__(self, seqs: Optional[array] = None, tfs: Optional[array] = None):
+        self.seqs = seqs if seqs is not None else array("I")
+        self.tfs = tfs if tfs is not None else array("H")
+        self.max_tf = max(self.tfs, default=0)
+
+
+class _ScoredList(NamedTuple):
+    bound: float
+    weight: float
+    field: int
+    seqs: array
+    tfs: array
+
+
+class RankedSearchIndex:
+    """BM25 postings per field over every story, with top-k retrieval."""
+
+    K1 = 1.2
+    B = 0.75
+    # Saved after this many stories were added since the file was last written
+    SAVE_EVERY = 200
+
+    def __init__(self, path: Optional[str] = None, database_id: str = ""):
+        self.path = path
+        # ``StoryStore.database_id`` of the stories indexed
+        self.database_id = database_id
+        self._lock = threading.RLock()
+        # Held by the background thread writing the file
+        self._saving = threading.Lock()
+        self._saver: Optional[threading.Thread] = None
+        # term -> one posting list per field (None where the term never occurs)
+        self._postings: Dict[str, List[Optional[_Postings]]] = {}
+        # term -> stories with the term in any field
+        self._df: Dict[str, int] = {}
+        # Per story, indexed by seq: category number (-1 for seqs not indexed) and field lengths
+        self._categories = array("b")
+        self._lengths = [array("I") for _ in FIELDS]
+        self._category_names: List[str] = []
+        self._category_numbers: Dict[str, int] = {}
+        self._length_totals = [0] * len(FIELDS)
+        self.document_count = 0
+        # Every seq up to this one is indexed; a restart catches up from here
+        self._complete_through = 0
+        self._unsaved = 0
+
+    @classmethod
+    def open(cls, store: StoryStore, path: Optional[str] = None) -> "RankedSearchIndex":
+        """Load the index saved at ``path`` for ``store``'s data (if any), index stories added since and save it.
+
+        The save runs in the background; ``wait_saved`` waits for it.
+        """
+        index = cls.load(path, store.database_id) if path else None
+        if index is not None and index.document_count > store.count_stories():
+            # Saved before the database was restored from an older copy
+            index = None
+        if index is None:
+            index = cls(path, store.database_id)
+        added = index.catch_up(store)
+        if path and added:
+            index.save_soon()
+        return index
+
+    def catch_up(self, store: StoryStore) -> int:
+        """Index the stories ``store`` holds beyond what is indexed; returns how many."""
+        added = 0
+        for seq, category, title, author, tags, content in store.iter_ranked_documents(self._complete_through):
+            added += self.add_document(seq, category, (title, author, " ".join(tags), content))
+            # The store lists every story up to this one, so seqs it skipped were never written
+            with self._lock:
+                self._complete_through = max(self._complete_through, seq)
+        return added
+
+    def add_story(self, seq: int, story: dict) -> None:
+        """Index a newly stored story, saving the file in the background every ``SAVE_EVERY`` stories."""
+        fields = (story["title"], story["author"], " ".join(story.get("tags", [])), story["content"])
+        self.add_document(seq, story["category"], fields)
+        if self.path and self._unsaved >= self.SAVE_EVERY:
+            self.save_soon()
+
+    def _grow(self, seq: int) -> None:
+        while len(self._categories) <= seq:
+            self._categories.append(-1)
+            for lengths in self._lengths:
+                lengths.append(0)
+
+    def add_document(self, seq: int, category: str, fields: Iterable[str]) -> bool:
+        """Index one story's fields (in ``FIELDS`` order); False if ``seq`` is already indexed."""
+        terms = [Counter(stem(token) for token in tokenize(text)) for text in fields]
+        with self._lock:
+            self._grow(seq)
+            if self._categories[seq] >= 0:
+                return False
+            number = self._category_numbers.get(category)
+            if number is None:
+                number = self._category_numbers[category] = len(self._category_names)
+                self._category_names.append(category)
+            self._categories[seq] = number
+            seen = set()
+            for field, counts in enumerate(terms):
+                length = sum(counts.values())
+                self._lengths[field][seq] = length
+                self._length_totals[field] += length
+                for term, tf in counts.items():
+                    per_field = self._postings.get(term)
+                    if per_field is None:
+                        per_field = self._postings[term] = [None] * len(FIELDS)
+                    postings = per_field[field]
+                    if postings is None:
+                        postings = per_field[field] = _Postings()
+                    tf = min(tf, _MAX_TF)
+                    # Concurrent writers may finish out of order
+                    position = len(postings.seqs) if not postings.seqs or postings.seqs[-1] < seq \
+                        else bisect_left(postings.seqs, seq)
+                    postings.seqs.insert(position, seq)
+                    postings.tfs.insert(position, tf)
+                    postings.max_tf = max(postings.max_tf, tf)
+                    seen.add(term)
+            for term in seen:
+                self._df[term] = self._df.get(term, 0) + 1
+            self.document_count += 1
+            self._unsaved += 1
+            while self._complete_through + 1 < len(self._categories) \
+                    and self._categories[self._complete_through + 1] >= 0:
+                self._complete_through += 1
+            return True
+
+    @staticmethod
+    def query_terms(query: str) -> List[str]:
+        """Distinct stemmed terms of a query, in order."""
+        return list(dict.fromkeys(stem(token) for token in tokenize(query)))
+
+    def has_terms(self, query: str) -> bool:
+        """Whether any story contains a term of ``query``."""
+        return any(term in self._df for term in self.query_terms(query))
+
+    def _scored_lists(self, query: str) -> List[_ScoredList]:
+        lists = []
+        for term in self.query_terms(query):
+            df = self._df.get(term)
+            if not df:
+                continue
+            idf = math.log(1 + (self.document_count - df + 0.5) / (df + 0.5))
+            for field, postings in enumerate(self._postings[term]):
+                if postings is None:
+                    continue
+                weight = FIELD_WEIGHTS[field] * idf
+                # The BM25 term score grows with tf and shrinks with field length, which is at least 0
+                bound = weight * (self.K1 + 1) * postings.max_tf / (postings.max_tf + self.K1 * (1 - self.B))
+                lists.append(_ScoredList(bound, weight, field, postings.seqs, postings.tfs))
+        return lists
+
+    def _scorer(self):
+        """``score(list, position)``: one posting's share of a story's score."""
+        k1, b = self.K1, self.B
+        averages = [max(total / max(self.document_count, 1), 1.0) for total in self._length_totals]
+        lengths = self._lengths
+
+        def score(scored: _ScoredList, position: int) -> float:
+            tf = scored.tfs[position]
+            length = lengths[scored.field][scored.seqs[position]]
+            norm = k1 * (1 - b + b * length / averages[scored.field])
+            return scored.weight * tf * (k1 + 1) / (tf + norm)
+        return score
+
+    def search(self, query: str, limit: int, category: Optional[str] = None) -> List[Tuple[float, int]]:
+        """The ``limit`` best ``(score, seq)`` for ``query``, best first, optionally in one category."""
+        with self._lock:
+            number = None
+            if category is not None:
+                number = self._category_numbers.get(category)
+                if number is None:
+                    return []
+            lists = sorted(self._scored_lists(query), key=lambda scored: scored.bound)
+            return self._max_score(lists, limit, number) if lists and limit > 0 else []
+
+    def _max_score(self, lists: List[_ScoredList], limit: int, category: Optional[int]) -> List[Tuple[float, int]]:
+        score = self._scorer()
+        categories = self._categories
+        # cumulative[i]: the most lists[0..i] can add to a score
+        cumulative = []
+        total = 0.0
+        for scored in lists:
+            total += scored.bound
+            cumulative.append(total)
+        positions = [0] * len(lists)
+        top: List[Tuple[float, int]] = []
+        threshold = -1.0
+        # lists[:essential] cannot lift a story into the top alone; they are only probed
+        essential = 0
+        while True:
+            seq = None
+            for i in range(essential, len(lists)):
+                seqs, position = lists[i].seqs, positions[i]
+                if position < len(seqs) and (seq is None or seqs[position] < seq):
+                    seq = seqs[position]
+            if seq is None:
+                break
+            total = 0.0
+            for i in range(essential, len(lists)):
+                seqs, position = lists[i].seqs, positions[i]
+                if position < len(seqs) and seqs[position] == seq:
+                    total += score(lists[i], position)
+                    positions[i] = position + 1
+            if category is not None and categories[seq] != category:
+                continue
+            for i in range(essential - 1, -1, -1):
+                if total + cumulative[i] < threshold:
+                    break
+                seqs = lists[i].seqs
+                position = positions[i] = bisect_left(seqs, seq, positions[i])
+                if position < len(seqs) and seqs[position] == seq:
+                    total += score(lists[i], position)
+                    positions[i] = position + 1
+            else:
+                # Ties go to the newer story, which comes later
+                if len(top) < limit:
+                    heapq.heappush(top, (total, seq))
+                elif (total, seq) > top[0]:
+                    heapq.heapreplace(top, (total, seq))
+                else:
+                    continue
+                if len(top) == limit:
+                    threshold = top[0][0]
+                    while essential < len(lists) and cumulative[essential] < threshold:
+                        essential += 1
+        return sorted(top, reverse=True)
+
+    def scores(self, query: str) -> Dict[int, float]:
+        """Score of every story matching a term of ``query``; ``search`` returns the best of these."""
+        with self._lock:
+            score = self._scorer()
+            totals: Dict[int, float] = {}
+            for scored in self._scored_lists(query):
+                for position, seq in enumerate(scored.seqs):
+                    totals[seq] = totals.get(seq, 0.0) + score(scored, position)
+            return totals
+
+    def save_soon(self) -> None:
+        """Save the index on a background thread, unless a save is already running."""
+        if self._saving.acquire(blocking=False):
+            self._saver = threading.Thread(target=self._save_in_background, name="RankedSearchIndex-saver",
+                                           daemon=True)
+            self._saver.start()
+
+    def _save_in_background(self) -> None:
+        try:
+            self.save()
+            # Stories added while writing would otherwise wait for the next one after them
+            while self._unsaved >= self.SAVE_EVERY:
+                self.save()
+        except Exception:
+            # The stories stay indexed in memory; the next save writes them
+            logger.exception("Saving the ranked search index to %s failed", self.path)
+        finally:
+            self._saving.release()
+
+    def wait_saved(self) -> None:
+        """Wait for a background save to finish."""
+        saver = self._saver
+        if saver is not None:
+            saver.join()
+
+    def save(self) -> None:
+        """Write the index to ``path`` atomically; only copying the postings holds up searches and submits."""
+        with self._lock:
+            terms = []
+            blobs = [self._categories.tobytes()] + [lengths.tobytes() for lengths in self._lengths]
+            for term, per_field in self._postings.items():
+                counts = []
+                for postings in per_field:
+                    counts.append(0 if postings is None else len(postings.seqs))
+                    if postings is not None:
+                        blobs += [postings.seqs.tobytes(), postings.tfs.tobytes()]
+                terms.append([term, self._df[term], counts])
+            header = json.dumps({
+                "format": FORMAT_VERSION, "stemmer": STEMMER_VERSION, "byteorder": sys.byteorder,
+                "fields": FIELDS, "database": self.database_id, "size": len(self._categories), "documents": self.document_count,
+                "complete_through": self._complete_through, "categories": self._category_names,
+                "length_totals": self._length_totals, "terms": terms,
+            }, ensure_ascii=False).encode("utf-8")
+            unsaved, self._unsaved = self._unsaved, 0
+        temporary = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temporary, "wb") as file:
+                file.write(_MAGIC + len(header).to_bytes(8, "little") + header)
+                for blob in blobs:
+                    file.write(blob)
+            # Another process may save at the same time; each file is complete either way
+            os.replace(temporary, self.path)
+        except BaseException:
+            with self._lock:
+                self._unsaved += unsaved
+            raise
+
+    @classmethod
+    def load(cls, path: str, database_id: Optional[str] = None) -> Optional["RankedSearchIndex"]:
+        """The index saved at ``path``, or None if there is none or it was built differently.
+
+        With a ``database_id``, also None if the file was saved for another database.
+        """
+        try:
+            with open(path, "rb") as file:
+                data = memoryview(file.read())
+        except FileNotFoundError:
+            return None
+        if bytes(data[:len(_MAGIC)]) != _MAGIC:
+            return None
+        header_start = len(_MAGIC) + 8
+        offset = header_start + int.from_bytes(data[len(_MAGIC):header_start], "little")
+        header = json.loads(bytes(data[header_start:offset]))
+        if (header["format"], header["stemmer"], header["byteorder"], tuple(header["fields"])) != \
+                (FORMAT_VERSION, STEMMER_VERSION, sys.byteorder, FIELDS):
+            return None
+        if database_id is not None and header["database"] != database_id:
+            return None
+
+        def take(typecode: str, count: int) -> array:
+            nonlocal offset
+            values = array(typecode)
+            end = offset + count * values.itemsize
+            values.frombytes(data[offset:end])
+            offset = end
+            return values
+
+        index = cls(path, header["database"])
+        size = header["size"]
+        index._categories = take("b", size)
+        index._lengths = [take("I", size) for _ in FIELDS]
+        index._category_names = header["categories"]
+        index._category_numbers = {name: number for number, name in enumerate(index._category_names)}
+        index._length_totals = header["length_totals"]
+        index.document_count = header["documents"]
+        index._complete_through = header["complete_through"]
+        for term, df, counts in header["terms"]:
+            index._df[term] = df
+            index._postings[term] = [_Postings(take("I", count), take("H", count)) if count else None
+                                     for count in counts]
+        return index
+
+
+def index_path(db_path: str) -> str:
+    """Where the ranked index of the database at ``db_path`` is saved."""
+    return f"{db_path}.ranked"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from story_store import create_story_store
+
+    parser = argparse.ArgumentParser(description="Build or refresh the saved ranked search index.")
+    parser.add_argument("--db", default=os.environ.get("TELUGU_STORIES_DB", "stories.db"),
+                        help="SQLite database file (default: $TELUGU_STORIES_DB or stories.db)")
+    parser.add_argument("--index", help="index file (default: the database path plus .ranked)")
+    args = parser.parse_args(argv)
+
+    store = create_story_store("sqlite", path=args.db)
+    start = time.perf_counter()
+    try:
+        index = RankedSearchIndex.open(store, args.index or index_path(args.db))
+        index.wait_saved()
+    finally:
+        store.close()
+    print(f"{index.document_count} stories indexed in {time.perf_counter() - start:.1f} s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
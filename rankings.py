@@ -0,0 +1,210 @@
+"""Feed rankings kept sorted as votes and views change.
+
+"new" is the store's own insertion order. For the other rankings every story
+has an integer score; ``StoryRankings`` keeps one sorted list of
+``(score, seq)`` keys per ranking and category, updated whenever a vote or
+view changes a score. A page of the top ``k`` stories is a binary search for
+the cursor plus ``k`` steps, merged across categories with a heap when no
+category is selected, instead of sorting every story on each rerun.
+
+The "hot" score follows Reddit's formula: ``log10`` of the net votes plus the
+creation time divided by ``HOT_DECAY_SECONDS``. Newer stories start higher, so
+scores never have to be recomputed as time passes.
+"""
+
+import heapq
+import math
+import threading
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from story_store import StoryStore
+
+RANKINGS = ("new", "hot", "top", "views")
+
+# Keys pack (score, seq) into one int; seq must stay below this
+_SEQ_SPAN = 1 << 32
+
+
+class SortedKeyList:
+    """Sorted list of ints split into buckets, so inserts and deletes move few items."""
+
+    LOAD = 512
+
+    def __init__(self, keys: Iterable[int] = ()):
+        keys = sorted(keys)
+        self._buckets: List[List[int]] = [keys[i:i + self.LOAD] for i in range(0, len(keys), self.LOAD)]
+        self._maxes: List[int] = [bucket[-1] for bucket in self._buckets]
+        self._len = len(keys)
+
+    def __len__(self) -> int:
+        return self._len
+
+    def add(self, key: int) -> None:
+        if not self._buckets:
+            self._buckets.append([key])
+            self._maxes.append(key)
+        else:
+            position = min(bisect_left(self._maxes, key), len(self._maxes) - 1)
+            bucket = self._buckets[position]
+            insort(bucket, key)
+            self._maxes[position] = bucket[-1]
+            if len(bucket) > 2 * self.LOAD:
+                self._buckets[position:position + 1] = [bucket[:self.LOAD], bucket[self.LOAD:]]
+                self._maxes[position:position + 1] = [bucket[self.LOAD - 1], bucket[-1]]
+        self._len += 1
+
+    def remove(self, key: int) -> None:
+        position = bisect_left(self._maxes, key)
+        bucket = self._buckets[position] if position < len(self._buckets) else []
+        index = bisect_left(bucket, key)
+        if index == len(bucket) or bucket[index] != key:
+            raise KeyError(key)
+        del bucket[index]
+        if bucket:
+            self._maxes[position] = bucket[-1]
+        else:
+            del self._buckets[position]
+            del self._maxes[position]
+        self._len -= 1
+
+    def iter_after(self, key: Optional[int] = None) -> Iterator[int]:
+        """Yield keys greater than ``key`` (all keys if None) in ascending order."""
+        position = index = 0
+        if key is not None:
+            position = bisect_right(self._maxes, key)
+            if position < len(self._buckets):
+                index = bisect_right(self._buckets[position], key)
+        for bucket_position in range(position, len(self._buckets)):
+            bucket = self._buckets[bucket_position]
+            yield from bucket[index:] if bucket_position == position else bucket
+
+
+class StoryRankings:
+    """Per-ranking, per-category sorted story keys, maintained incrementally."""
+
+    HOT_DECAY_SECONDS = 45000
+    # Reddit's epoch; only keeps the time term of hot scores small
+    HOT_EPOCH = 1134028003
+    # Hot scores are fractional; they are stored as integers at this resolution
+    HOT_RESOLUTION = 10 ** 6
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Per story, indexed by seq: category number, creation time and counters
+        self._category_of = array("l")
+        self._created = array("d")
+        self._net_votes = array("q")
+        self._views = array("q")
+        self._categories: List[str] = []
+        self._category_numbers: Dict[str, int] = {}
+        # ranking -> category number -> keys, best story first
+        self._lists: Dict[str, Dict[int, SortedKeyList]] = {ranking: {} for ranking in RANKINGS[1:]}
+
+    @classmethod
+    def from_store(cls, store: StoryStore) -> "StoryRankings":
+        """Build every ranking from the counters currently in ``store``."""
+        rankings = cls()
+        keys: Dict[str, Dict[int, List[int]]] = {ranking: {} for ranking in RANKINGS[1:]}
+        for seq, category, created_at, upvotes, downvotes, views in store.iter_ranking_rows():
+            number = rankings._remember(seq, category, created_at, upvotes - downvotes, views)
+            for ranking in keys:
+                keys[ranking].setdefault(number, []).append(rankings._key(ranking, seq))
+        for ranking, per_category in keys.items():
+            rankings._lists[ranking] = {number: SortedKeyList(k) for number, k in per_category.items()}
+        return rankings
+
+    @staticmethod
+    def _timestamp(created_at: str) -> float:
+        try:
+            return datetime.fromisoformat(created_at).timestamp()
+        except ValueError:
+            return StoryRankings.HOT_EPOCH
+
+    def _remember(self, seq: int, category: str, created_at: str, net_votes: int, views: int) -> int:
+        number = self._category_numbers.get(category)
+        if number is None:
+            number = self._category_numbers[category] = len(self._categories)
+            self._categories.append(category)
+        while len(self._category_of) <= seq:
+            # Unused slots for seqs that never reach this process stay at -1
+            self._category_of.append(-1)
+            self._created.append(0.0)
+            self._net_votes.append(0)
+            self._views.append(0)
+        self._category_of[seq] = number
+        self._created[seq] = self._timestamp(created_at)
+        self._net_votes[seq] = net_votes
+        self._views[seq] = views
+        return number
+
+    def _score(self, ranking: str, seq: int) -> int:
+        if ranking == "top":
+            return self._net_votes[seq]
+        if ranking == "views":
+            return self._views[seq]
+        net = self._net_votes[seq]
+        order = math.log10(max(abs(net), 1))
+        sign = (net > 0) - (net < 0)
+        hot = sign * order + (self._created[seq] - self.HOT_EPOCH) / self.HOT_DECAY_SECONDS
+        return round(hot * self.HOT_RESOLUTION)
+
+    def _key(self, ranking: str, seq: int) -> int:
+        # Negated so ascending order is best first; ties go to the newer story
+        return -(self._score(ranking, seq) * _SEQ_SPAN + seq)
+
+    def _rescore(self, seq: int, rankings: Tuple[str, ...], update) -> None:
+        """Apply ``update`` to a story's counters and move its keys accordingly."""
+        if seq >= len(self._category_of) or self._category_of[seq] < 0:
+            return
+        number = self._category_of[seq]
+        old_keys = [self._key(ranking, seq) for ranking in rankings]
+        update()
+        for ranking, old_key in zip(rankings, old_keys):
+            new_key = self._key(ranking, seq)
+            if new_key != old_key:
+                keys = self._lists[ranking][number]
+                keys.remove(old_key)
+                keys.add(new_key)
+
+    def story_added(self, seq: int, story: dict) -> None:
+        """Rank a newly stored story; a story already ranked is left alone."""
+        with self._lock:
+            if seq < len(self._category_of) and self._category_of[seq] >= 0:
+                return
+            number = self._remember(seq, story["category"], story["created_at"],
+                                    story.get("upvotes", 0) - story.get("downvotes", 0), story.get("views", 0))
+            for ranking, per_category in self._lists.items():
+                per_category.setdefault(number, SortedKeyList()).add(self._key(ranking, seq))
+
+    def votes_changed(self, seq: int, upvote_delta: int, downvote_delta: int) -> None:
+        """Move a story after its vote counters changed."""
+        def update():
+            self._net_votes[seq] += upvote_delta - downvote_delta
+        with self._lock:
+            self._rescore(seq, ("top", "hot"), update)
+
+    def views_recorded(self, seq: int, count: int = 1) -> None:
+        """Move a story after it was read."""
+        def update():
+            self._views[seq] += count
+        with self._lock:
+            self._rescore(seq, ("views",), update)
+
+    def page(self, ranking: str, category: Optional[str] = None, limit: int = 10,
+             after: Optional[int] = None) -> List[Tuple[int, int]]:
+        """The next ``limit`` stories of a ranking as ``(cursor, seq)`` pairs, best first.
+
+        ``after`` is the cursor of the last story of the previous page.
+        """
+        with self._lock:
+            if category is None:
+                lists = self._lists[ranking].values()
+            else:
+                number = self._category_numbers.get(category)
+                lists = [self._lists[ranking][number]] if number is not None else []
+            keys = heapq.merge(*(keys.iter_after(after) for keys in lists))
+            return [(key, (-key) % _SEQ_SPAN) for key in islice(keys, limit)]
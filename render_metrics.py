@@ -0,0 +1,346 @@
+"""Opt-in per-rerun render profiling, exported in Prometheus text format.
+
+Nothing here runs unless the app turns it on (``TELUGU_STORIES_METRICS=1``);
+with it off no method is wrapped and a rerun only pays for ``note_page`` and
+one check per ``fragment_body`` call.
+
+When on, ``RenderMetrics.instrument`` wraps the ``_render_*``, ``_filter_*``
+and ``_load_*`` methods of the app class with timers, and ``counting`` puts a
+proxy in front of the ``streamlit`` module that counts element calls
+(``st.markdown``, ``st.button``, ...). Within ``RenderMetrics.rerun`` both are
+collected per rerun; at the end the time spent in each method is observed
+into a latency histogram per page and method, alongside the whole rerun.
+
+A ``st.fragment`` reruns on its own, without the script around it, when one
+of its widgets is used. Bodies marked with ``fragment_body`` are then timed
+as a rerun of their own, under the page ``fragment:<method>``.
+"""
+
+import atexit
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+INSTRUMENTED_PREFIXES = ("_render_", "_filter_", "_load_")
+# Upper bounds in seconds, Prometheus' default buckets extended both ways
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUANTILES = (0.5, 0.95, 0.99)
+
+MARKDOWN_CALLS = frozenset({"markdown", "caption", "write", "title", "header", "subheader", "text"})
+WIDGET_CALLS = frozenset({"button", "form_submit_button", "text_input", "text_area", "selectbox",
+                          "multiselect", "checkbox", "radio", "slider", "number_input"})
+# Calls that are not elements of the page and are never counted
+_UNCOUNTED_CALLS = frozenset({"cache_resource", "cache_data", "get_option", "rerun", "set_page_config",
+                              "fragment", "stop"})
+
+_local = threading.local()
+# Set by ``RenderMetrics.instrument``; fragment reruns are timed into it
+_profiling: Optional["RenderMetrics"] = None
+
+
+def call_kind(name: str) -> str:
+    """Group a Streamlit call as "markdown", "widget" or another "element"."""
+    if name in MARKDOWN_CALLS:
+        return "markdown"
+    if name in WIDGET_CALLS:
+        return "widget"
+    return "element"
+
+
+def note_page(page: str) -> None:
+    """Label the current rerun with the page it renders (no-op unless profiling)."""
+    rerun = getattr(_local, "rerun", None)
+    if rerun is not None:
+        rerun.page = page
+
+
+def fragment_body(method: Callable) -> Callable:
+    """Mark the body of a ``st.fragment`` method, so its own reruns are timed (no-op unless profiling).
+
+    Goes under ``@st.fragment``. Within a whole rerun the body is timed like
+    any other instrumented method.
+    """
+    @wraps(method)
+    def body(*args, **kwargs):
+        metrics = _profiling
+        if metrics is None or getattr(_local, "rerun", None) is not None:
+            return method(*args, **kwargs)
+        with metrics.rerun():
+            note_page(f"fragment:{method.__name__}")
+            return RenderMetrics._timed(method.__name__, method)(*args, **kwargs)
+    return body
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram with quantile estimates."""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        # One count per bucket plus the +Inf bucket, not cumulative
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        position = 0
+        while position < len(self.buckets) and seconds > self.buckets[position]:
+            position += 1
+        self.counts[position] += 1
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+
+    def quantile(self, q: float) -> float:
+        """Estimate by linear interpolation inside the bucket holding the ``q``-th observation."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for position, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                if position == len(self.buckets):
+                    return self.max
+                lower = self.buckets[position - 1] if position else 0.0
+                upper = min(self.buckets[position], self.max)
+                return lower + (upper - lower) * max(rank - seen, 0) / count
+            seen += count
+        return self.max
+
+
+class _Rerun:
+    """What one rerun spent, by method, and the Streamlit calls it made."""
+
+    __slots__ = ("page", "started", "spans", "calls")
+
+    def __init__(self):
+        self.page = "unknown"
+        self.started = time.perf_counter()
+        # method name -> [seconds, calls]
+        self.spans: Dict[str, List[float]] = {}
+        self.calls: Dict[str, int] = {}
+
+
+class _CountingStreamlit:
+    """Stands in for the ``streamlit`` module and counts element calls per rerun."""
+
+    def __init__(self, module: Any):
+        self._module = module
+        self._wrapped: Dict[str, Callable] = {}
+
+    def __getattr__(self, name: str) -> Any:
+        wrapped = self._wrapped.get(name)
+        if wrapped is not None:
+            return wrapped
+        value = getattr(self._module, name)
+        if not callable(value) or isinstance(value, type) or name in _UNCOUNTED_CALLS:
+            return value
+
+        @wraps(value)
+        def counted(*args, **kwargs):
+            rerun = getattr(_local, "rerun", None)
+            if rerun is not None:
+                rerun.calls[name] = rerun.calls.get(name, 0) + 1
+            return value(*args, **kwargs)
+        self._wrapped[name] = counted
+        return counted
+
+
+class RenderMetrics:
+    """Process-wide render timings and Streamlit call counts, by page."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reruns: Dict[str, LatencyHistogram] = {}
+        self.spans: Dict[Tuple[str, str], LatencyHistogram] = {}
+        # (page, call) -> calls made, summed over every rerun
+        self.calls: Dict[Tuple[str, str], int] = {}
+        self.last_rerun: Dict[str, Dict[str, Any]] = {}
+
+    def instrument(self, cls: type, prefixes: Tuple[str, ...] = INSTRUMENTED_PREFIXES) -> type:
+        """Wrap the methods of ``cls`` whose names start with ``prefixes`` in timers, and time fragment reruns."""
+        global _profiling
+        _profiling = self
+        for name, method in list(vars(cls).items()):
+            if name.startswith(prefixes) and callable(method) and not getattr(method, "_timed", False):
+                setattr(cls, name, self._timed(name, method))
+        return cls
+
+    @staticmethod
+    def _timed(name: str, method: Callable) -> Callable:
+        @wraps(method)
+        def timed(*args, **kwargs):
+            rerun = getattr(_local, "rerun", None)
+            if rerun is None:
+                return method(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                span = rerun.spans.get(name)
+                if span is None:
+                    span = rerun.spans[name] = [0.0, 0]
+                span[0] += time.perf_counter() - start
+                span[1] += 1
+        timed._timed = True
+        return timed
+
+    @staticmethod
+    def counting(module: Any) -> Any:
+        """A stand-in for ``module`` (``streamlit``) that counts element calls."""
+        return _CountingStreamlit(module)
+
+    @contextmanager
+    def rerun(self) -> Iterator[None]:
+        """Collect timings and call counts of the script run inside the block."""
+        rerun = _local.rerun = _Rerun()
+        try:
+            yield
+        finally:
+            # st.rerun() and st.stop() end the block with an exception; the work is still counted
+            _local.rerun = None
+            self._record(rerun, time.perf_counter() - rerun.started)
+
+    def _record(self, rerun: _Rerun, seconds: float) -> None:
+        page = rerun.page
+        with self._lock:
+            self.reruns.setdefault(page, LatencyHistogram()).observe(seconds)
+            for name, (span_seconds, _) in rerun.spans.items():
+                self.spans.setdefault((page, name), LatencyHistogram()).observe(span_seconds)
+            for name, count in rerun.calls.items():
+                self.calls[(page, name)] = self.calls.get((page, name), 0) + count
+            kinds: Dict[str, int] = {}
+            for name, count in rerun.calls.items():
+                kinds[call_kind(name)] = kinds.get(call_kind(name), 0) + count
+            self.last_rerun[page] = {
+                "seconds": seconds,
+                "spans": {name: tuple(span) for name, span in rerun.spans.items()},
+                "calls": kinds,
+            }
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """Rows of page, span and p50/p95/p99 milliseconds for the debug panel."""
+        with self._lock:
+            histograms = [((page, "rerun"), h) for page, h in self.reruns.items()] + list(self.spans.items())
+            rows = []
+            for (page, span), histogram in sorted(histograms):
+                row = {"page": page, "span": span, "reruns": histogram.count}
+                for q in QUANTILES:
+                    row[f"p{round(q * 100)}_ms"] = round(histogram.quantile(q) * 1000, 2)
+                rows.append(row)
+        return rows
+
+    def prometheus_text(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        lines: List[str] = []
+        with self._lock:
+            _histogram_lines(lines, "telugu_stories_rerun_seconds", "Wall time of a whole script rerun.",
+                             [({"page": page}, h) for page, h in sorted(self.reruns.items())])
+            _histogram_lines(lines, "telugu_stories_render_seconds",
+                             "Time spent in one app method during a rerun, summed over its calls.",
+                             [({"page": page, "method": name}, h) for (page, name), h in sorted(self.spans.items())])
+            lines.append("# HELP telugu_stories_streamlit_calls_total Streamlit element calls made by reruns.")
+            lines.append("# TYPE telugu_stories_streamlit_calls_total counter")
+            for (page, name), count in sorted(self.calls.items()):
+                labels = _labels({"page": page, "kind": call_kind(name), "call": name})
+                lines.append(f"telugu_stories_streamlit_calls_total{labels} {count}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(labels: Dict[str, str]) -> str:
+    escaped = (f'{key}="{_escape(value)}"' for key, value in labels.items())
+    return "{" + ",".join(escaped) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _histogram_lines(lines: List[str], name: str, help_text: str,
+                     series: List[Tuple[Dict[str, str], LatencyHistogram]]) -> None:
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} histogram")
+    for labels, histogram in series:
+        cumulative = 0
+        for bound, count in zip(histogram.buckets + (float("inf"),), histogram.counts):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(f"{name}_bucket{_labels({**labels, 'le': le})} {cumulative}")
+        lines.append(f"{name}_sum{_labels(labels)} {histogram.sum!r}")
+        lines.append(f"{name}_count{_labels(labels)} {histogram.count}")
+
+
+class MetricsFile:
+    """Rewrites a Prometheus text file (e.g. for node_exporter's textfile collector) periodically."""
+
+    FLUSH_INTERVAL_MS = 15000
+
+    def __init__(self, metrics: RenderMetrics, path: str, flush_interval_ms: Optional[int] = None):
+        self.metrics = metrics
+        self.path = path
+        self.flush_interval_ms = flush_interval_ms or self.FLUSH_INTERVAL_MS
+        self._closed = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "MetricsFile":
+        """Rewrite the file every ``flush_interval_ms`` from a background thread, and once more at exit."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="MetricsFile-writer", daemon=True)
+            self._thread.start()
+            atexit.register(self.close)
+        return self
+
+    def _run(self) -> None:
+        while not self._closed.wait(self.flush_interval_ms / 1000):
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Writing the metrics file %s failed", self.path)
+
+    def close(self) -> None:
+        """Stop the writer and rewrite the file a last time."""
+        self._closed.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self.flush()
+
+    def flush(self) -> int:
+        """Rewrite the file now; returns the number of samples written."""
+        text = self.metrics.prometheus_text()
+        # Written beside the target and renamed, so a scrape never reads half a file
+        temporary = f"{self.path}.{os.getpid()}.tmp"
+        with open(temporary, "w", encoding="utf-8") as out:
+            out.write(text)
+        os.replace(temporary, self.path)
+        return sum(1 for line in text.splitlines() if line and not line.startswith("#"))
+
+
+def serve_metrics(metrics: RenderMetrics, port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Serve ``/metrics`` on a local port from a daemon thread."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics.prometheus_text().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
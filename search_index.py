@@ -0,0 +1,136 @@
+"""In-memory inverted index that narrows down search candidates.
+
+Every story is indexed by the sequence number the store assigned to it,
+under two kinds of keys taken from its lower-cased search text:
+
+* aksharas (Telugu grapheme clusters, see ``telugu_text.split_aksharas``)
+* character n-grams, so short and non-Telugu queries can still be narrowed
+
+A query only uses keys that must be present in any text containing it as a
+substring, so the candidate set never misses a match. The store still does the
+final substring check, which keeps results identical to the plain scan.
+"""
+
+import threading
+from array import array
+from bisect import bisect_left, insort
+from typing import Dict, List, Optional, Set, Tuple
+
+from story_store import FIELD_SEPARATOR, StoryStore, normalize_query, search_text
+from telugu_text import split_aksharas, stable_inner_aksharas
+
+
+def _indexable(key: str) -> bool:
+    """Skip keys that would match nearly every story or span two fields."""
+    return bool(key.strip()) and FIELD_SEPARATOR not in key
+
+
+def _contains(postings: array, seq: int) -> bool:
+    position = bisect_left(postings, seq)
+    return position < len(postings) and postings[position] == seq
+
+
+class StorySearchIndex:
+    """Akshara and n-gram postings over the searchable text of every story."""
+
+    NGRAM_SIZE = 2
+    # Probe by binary search when a posting list is this many times longer than the candidates
+    GALLOP_RATIO = 32
+    # Above this share of all stories, a plain scan is cheaper than fetching candidates
+    SCAN_RATIO = 0.3
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # key -> sorted array of story sequence numbers
+        self._akshara_postings: Dict[str, array] = {}
+        self._ngram_postings: Dict[str, array] = {}
+        self.document_count = 0
+
+    @classmethod
+    def from_store(cls, store: StoryStore) -> "StorySearchIndex":
+        """Build an index over every story currently in ``store``."""
+        index = cls()
+        for seq, text in store.iter_search_documents():
+            index.add_document(seq, text)
+        return index
+
+    def _ngrams(self, text: str) -> Set[str]:
+        size = self.NGRAM_SIZE
+        return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+    def _document_keys(self, text: str) -> Tuple[List[str], List[str]]:
+        # De-duplicate before filtering; documents repeat most of their keys
+        aksharas = [a for a in set(split_aksharas(text)) if _indexable(a)]
+        ngrams = [g for g in self._ngrams(text) if _indexable(g)]
+        return aksharas, ngrams
+
+    def add_story(self, seq: int, story: dict) -> None:
+        """Index a newly stored story."""
+        self.add_document(seq, search_text(story))
+
+    def add_document(self, seq: int, text: str) -> None:
+        """Index already lower-cased search text under ``seq``, unless it is indexed already."""
+        aksharas, ngrams = self._document_keys(text)
+        with self._lock:
+            if self._indexed(seq, aksharas, ngrams):
+                return
+            for postings_map, keys in ((self._akshara_postings, aksharas), (self._ngram_postings, ngrams)):
+                for key in keys:
+                    postings = postings_map.get(key)
+                    if postings is None:
+                        postings_map[key] = array("I", (seq,))
+                    elif postings[-1] < seq:
+                        postings.append(seq)
+                    elif not _contains(postings, seq):
+                        # Concurrent writers may finish out of order
+                        insort(postings, seq)
+            self.document_count += 1
+
+    def _indexed(self, seq: int, aksharas: List[str], ngrams: List[str]) -> bool:
+        """Whether the document with these keys was already indexed under ``seq``."""
+        if aksharas:
+            postings = self._akshara_postings.get(aksharas[0])
+        elif ngrams:
+            postings = self._ngram_postings.get(ngrams[0])
+        else:
+            return False
+        return postings is not None and _contains(postings, seq)
+
+    def _query_postings(self, query: str) -> Optional[List[array]]:
+        """Posting lists a match must appear in, or None if no key applies."""
+        keys = {(True, a) for a in stable_inner_aksharas(query) if _indexable(a)}
+        keys.update((False, g) for g in self._ngrams(query) if _indexable(g))
+        if not keys:
+            return None
+        postings = []
+        for is_akshara, key in keys:
+            found = (self._akshara_postings if is_akshara else self._ngram_postings).get(key)
+            if found is None:
+                return []
+            postings.append(found)
+        return postings
+
+    def candidates(self, query: str) -> Optional[List[int]]:
+        """Sequence numbers of stories that may contain ``query``.
+
+        Returns None when the index cannot narrow the query down enough to
+        beat a plain scan; callers then fall back to scanning.
+        """
+        postings = self._query_postings(normalize_query(query))
+        if postings is None:
+            return None
+        if not postings:
+            return []
+        postings.sort(key=len)
+        result: Set[int] = set(postings[0])
+        for other in postings[1:]:
+            if len(other) > len(result) * self.GALLOP_RATIO:
+                # Few candidates left: probe the long list by binary search
+                result = {seq for seq in result if _contains(other, seq)}
+            else:
+                result.intersection_update(other)
+            if not result:
+                return []
+        if len(result) > self.document_count * self.SCAN_RATIO:
+            return None
+        return sorted(result)
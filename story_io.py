@@ -0,0 +1,277 @@
+"""Bulk import and export of stories as newline-delimited JSON.
+
+Usage::
+
+    python story_io.py import stories.ndjson --rejects rejects.ndjson
+    python story_io.py export stories.ndjson --order time
+
+One story per line, with the fields the app stores (on import ``seq`` and
+``version`` are ignored and the preview fields ``excerpt``, ``word_count`` and
+``reading_minutes`` are recomputed). Records go through the
+same rules as the submission form (``story_rules``): field checks, duplicate
+titles and near-duplicate bodies, both against the store and against the
+batch not yet written. Lines are read ``--batch-size`` at a time: a pool of
+``--workers`` processes builds their stories and MinHash signatures, and each
+batch is checked with one store lookup per kind of duplicate and written in
+one transaction, so memory stays flat for any file size. Rejected lines are
+written to ``--rejects`` with their line number and the reason.
+
+Imported stories reach running app processes through the change feed
+(``change_feed``), like stories published on another server process.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime
+from itertools import islice
+from typing import Any, Deque, Dict, IO, Iterable, Iterator, List, Optional, Tuple
+
+import story_rules
+from dedup import most_similar
+from story_store import StoryStore, WriteKeys, create_story_store, write_keys
+
+BATCH_SIZE = 1000
+STORY_ORDERS = ("id", "time")
+
+_TEXT_FIELDS = ("title", "author", "content", "category")
+_COUNTER_FIELDS = ("upvotes", "downvotes", "comments", "views")
+
+# (line number, source line, parsed record or None, error or "")
+ParsedLine = Tuple[int, str, Optional[Dict[str, Any]], str]
+# (line number, source line, story or None, its write keys or None, error or "")
+PreparedLine = Tuple[int, str, Optional[Dict[str, Any]], Optional[WriteKeys], str]
+
+
+class RecordError(ValueError):
+    """A record that cannot be imported; the message goes to the rejects file."""
+
+
+def parse_lines(lines: Iterable[str]) -> Iterator[ParsedLine]:
+    """Decode each non-blank line as a JSON object."""
+    for line_number, line in enumerate(lines, start=1):
+        line = line.rstrip("\n")
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as exc:
+            yield line_number, line, None, f"invalid JSON: {exc}"
+            continue
+        if not isinstance(record, dict):
+            yield line_number, line, None, "not a JSON object"
+            continue
+        yield line_number, line, record, ""
+
+
+def story_from_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Check a record's fields and build the story to store, keeping its id, time and counters."""
+    for field in _TEXT_FIELDS:
+        if not isinstance(record.get(field, ""), str):
+            raise RecordError(f"{field} must be a string")
+    is_valid, error_message = story_rules.validate_story_fields(
+        record.get("title", ""), record.get("author", ""), record.get("content", ""), record.get("category", ""))
+    if not is_valid:
+        raise RecordError(error_message)
+
+    tags = record.get("tags") or []
+    if not isinstance(tags, list) or not all(isinstance(tag, str) for tag in tags):
+        raise RecordError("tags must be a list of strings")
+    story_id = record.get("id")
+    if story_id is not None and (not isinstance(story_id, str) or not story_id.strip()):
+        raise RecordError("id must be a non-empty string")
+    created_at = record.get("created_at")
+    if created_at is not None:
+        try:
+            datetime.fromisoformat(created_at)
+        except (TypeError, ValueError):
+            raise RecordError("created_at must be an ISO 8601 timestamp") from None
+    counters = {}
+    for field in _COUNTER_FIELDS:
+        value = record.get(field, 0)
+        if not isinstance(value, int) or isinstance(value, bool) or value < 0:
+            raise RecordError(f"{field} must be a non-negative integer")
+        counters[field] = value
+
+    timestamp = record.get("timestamp")
+    story = story_rules.build_story(record["title"], record["author"], record["category"], record["content"],
+                                    tags, story_id=story_id, created_at=created_at, counters=counters)
+    story["timestamp"] = timestamp if isinstance(timestamp, str) and timestamp else story["created_at"]
+    return story
+
+
+def prepare_lines(batch: List[ParsedLine]) -> List[PreparedLine]:
+    """Build each line's story and its ``write_keys`` (MinHash signature included); the workers' part of an import."""
+    prepared = []
+    for line_number, line, record, error in batch:
+        story = keys = None
+        if not error:
+            try:
+                story = story_from_record(record)
+                keys = write_keys(story)
+            except RecordError as exc:
+                error = str(exc)
+        prepared.append((line_number, line, story, keys, error))
+    return prepared
+
+
+def _batches(parsed: Iterable[ParsedLine], size: int) -> Iterator[List[ParsedLine]]:
+    parsed = iter(parsed)
+    while True:
+        batch = list(islice(parsed, size))
+        if not batch:
+            return
+        yield batch
+
+
+class StoryImporter:
+    """Validates parsed records and writes accepted stories in batched transactions.
+
+    Each batch of lines is prepared (``prepare_lines``) by a pool of ``workers``
+    processes, or inline with one. It is then checked against the store with one
+    lookup each for ids, titles and similar bodies, and against the stories
+    accepted before it in the batch, and written in one transaction with the
+    keys the workers computed.
+    """
+
+    def __init__(self, store: StoryStore, batch_size: int = BATCH_SIZE, near_duplicates: bool = True,
+                 workers: int = 1):
+        self.store = store
+        self.batch_size = batch_size
+        self.near_duplicates = near_duplicates
+        self.workers = workers
+        self.imported = 0
+        self.rejected = 0
+
+    def _import(self, prepared: List[PreparedLine], rejects: Optional[IO[str]]) -> None:
+        """Check a prepared batch against the store and itself, then write the stories that pass."""
+        candidates = [(story, keys) for _, _, story, keys, _ in prepared if story is not None]
+        known_ids = self.store.existing_ids([story["id"] for story, _ in candidates])
+        known_titles = self.store.existing_title_keys([keys.title_key for _, keys in candidates])
+        stored_similar = iter(self.store.find_similar_contents([keys.signature for _, keys in candidates])
+                              if self.near_duplicates else [])
+        # Keys of the stories accepted so far, which the store cannot see yet
+        batch_ids: set = set()
+        batch_titles: set = set()
+        batch_bands: Dict[int, List[Dict[str, Any]]] = {}
+        stories: List[Dict[str, Any]] = []
+        story_keys: List[WriteKeys] = []
+        for line_number, line, story, keys, error in prepared:
+            if story is not None:
+                similar = None
+                stored = next(stored_similar, [])
+                if self.near_duplicates:
+                    in_batch = {id(c): c for band in keys.bands for c in batch_bands.get(band, ())}
+                    similar = most_similar(keys.signature, stored) \
+                        or most_similar(keys.signature, list(in_batch.values()))
+                if story["id"] in batch_ids or story["id"] in known_ids:
+                    error = f"id already exists: {story['id']}"
+                elif keys.title_key in batch_titles or keys.title_key in known_titles:
+                    error = story_rules.DUPLICATE_TITLE_ERROR
+                elif similar:
+                    error = story_rules.SIMILAR_CONTENT_ERROR.format(title=similar["title"])
+                else:
+                    stories.append(story)
+                    story_keys.append(keys)
+                    batch_ids.add(story["id"])
+                    batch_titles.add(keys.title_key)
+                    candidate = {"id": story["id"], "title": story["title"], "signature": keys.signature}
+                    for band in keys.bands:
+                        batch_bands.setdefault(band, []).append(candidate)
+                    continue
+            self.rejected += 1
+            if rejects is not None:
+                rejects.write(json.dumps({"line": line_number, "error": error, "source": line},
+                                         ensure_ascii=False) + "\n")
+        if stories:
+            self.store.add_stories(stories, story_keys)
+            self.imported += len(stories)
+
+    def run(self, parsed: Iterable[ParsedLine], rejects: Optional[IO[str]] = None) -> None:
+        """Import every parsed line, writing rejected ones to ``rejects``."""
+        batches = _batches(parsed, self.batch_size)
+        if self.workers <= 1:
+            for batch in batches:
+                self._import(prepare_lines(batch), rejects)
+            return
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            # A bounded window of batches in flight keeps memory flat for any file size
+            in_flight: Deque[Future] = deque()
+            for batch in batches:
+                in_flight.append(pool.submit(prepare_lines, batch))
+                if len(in_flight) >= 2 * self.workers:
+                    self._import(in_flight.popleft().result(), rejects)
+            while in_flight:
+                self._import(in_flight.popleft().result(), rejects)
+
+
+def export_stories(store: StoryStore, out: IO[str], order: str = "id") -> int:
+    """Write every story as one JSON line; returns how many were written."""
+    count = 0
+    for story in store.iter_stories(order):
+        del story["seq"]
+        out.write(json.dumps(story, ensure_ascii=False) + "\n")
+        count += 1
+    return count
+
+
+def _open(path: str, mode: str) -> IO[str]:
+    if path == "-":
+        return sys.stdin if "r" in mode else sys.stdout
+    return open(path, mode, encoding="utf-8")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", default=os.environ.get("TELUGU_STORIES_DB", "stories.db"),
+                        help="SQLite database file (default: $TELUGU_STORIES_DB or stories.db)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    import_parser = commands.add_parser("import", help="add stories from an NDJSON file ('-' for stdin)")
+    import_parser.add_argument("file")
+    import_parser.add_argument("--rejects", help="write rejected lines to this NDJSON file")
+    import_parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    import_parser.add_argument("--no-near-duplicates", action="store_true",
+                               help="only reject exact duplicate titles, not similar bodies")
+    import_parser.add_argument("--workers", type=int,
+                               help="processes building stories and signatures (default: one per CPU)")
+    export_parser = commands.add_parser("export", help="write every story to an NDJSON file ('-' for stdout)")
+    export_parser.add_argument("file")
+    export_parser.add_argument("--order", choices=STORY_ORDERS, default="id")
+    args = parser.parse_args(argv)
+
+    store = create_story_store("sqlite", path=args.db)
+    start = time.perf_counter()
+    try:
+        if args.command == "import":
+            importer = StoryImporter(store, args.batch_size, near_duplicates=not args.no_near_duplicates,
+                                     workers=args.workers or os.cpu_count() or 1)
+            source = _open(args.file, "r")
+            rejects = _open(args.rejects, "w") if args.rejects else None
+            try:
+                importer.run(parse_lines(source), rejects)
+            finally:
+                for stream in (source, rejects):
+                    if stream not in (None, sys.stdin, sys.stdout):
+                        stream.close()
+            elapsed = time.perf_counter() - start
+            print(f"imported {importer.imported}, rejected {importer.rejected} in {elapsed:.1f} s "
+                  f"({(importer.imported + importer.rejected) / max(elapsed, 1e-9):.0f} lines/s)", file=sys.stderr)
+        else:
+            out = _open(args.file, "w")
+            try:
+                count = export_stories(store, out, args.order)
+            finally:
+                if out is not sys.stdout:
+                    out.close()
+            print(f"exported {count} in {time.perf_counter() - start:.1f} s", file=sys.stderr)
+    finally:
+        store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
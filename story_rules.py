@@ -0,0 +1,127 @@
+"""Story and comment validation rules shared by the app and ``story_io``; previews come from ``previews``."""
+
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from dedup import content_signature, most_similar, normalize_author
+from previews import EXCERPT_LENGTH, create_story_excerpt, story_preview  # noqa: F401
+from story_store import StoryStore
+from tags import clean_tag, tag_key
+
+CATEGORIES = ["కథ", "చరిత్ర", "సంస్కృతి", "కవిత", "విజ్ఞానం", "ఇతర"]
+MIN_TITLE_LENGTH = 3
+MIN_CONTENT_LENGTH = 50
+MAX_TITLE_LENGTH = 100
+MAX_AUTHOR_LENGTH = 50
+MAX_TAGS = 5
+MAX_COMMENT_LENGTH = 2000
+DUPLICATE_TITLE_ERROR = "ఈ శీర్షికతో కథ ఇప్పటికే ఉంది"
+SIMILAR_CONTENT_ERROR = "ఇలాంటి కథ ఇప్పటికే ఉంది: \"{title}\""
+
+
+def validate_story_fields(title: str, author: str, content: str, category: str) -> Tuple[bool, str]:
+    """Check required fields and lengths; returns ``(is_valid, error_message)``."""
+    title = title.strip()
+    author = author.strip()
+    content = content.strip()
+
+    if not title:
+        return False, "శీర్షిక తప్పనిసరి"
+    if not author:
+        return False, "రచయిత పేరు తప్పనిసరి"
+    if not content:
+        return False, "కథ/రచన తప్పనిసరి"
+    if not category:
+        return False, "విభాగం ఎంపిక తప్పనిసరి"
+    if category not in CATEGORIES:
+        return False, f"తెలియని విభాగం: {category}"
+
+    if len(title) < MIN_TITLE_LENGTH:
+        return False, f"శీర్షిక కనీసం {MIN_TITLE_LENGTH} అక్షరాలు ఉండాలి"
+    if len(title) > MAX_TITLE_LENGTH:
+        return False, f"శీర్షిక {MAX_TITLE_LENGTH} అక్షరాలకు మించకూడదు"
+    if len(content) < MIN_CONTENT_LENGTH:
+        return False, f"కథ/రచన కనీసం {MIN_CONTENT_LENGTH} అక్షరాలు ఉండాలి"
+    if len(author) > MAX_AUTHOR_LENGTH:
+        return False, f"రచయిత పేరు {MAX_AUTHOR_LENGTH} అక్షరాలకు మించకూడదు"
+    return True, ""
+
+
+def validate_comment_fields(author: str, body: str) -> Tuple[bool, str]:
+    """Check a comment's fields; returns ``(is_valid, error_message)``."""
+    author = author.strip()
+    body = body.strip()
+
+    if not author:
+        return False, "పేరు తప్పనిసరి"
+    if not body:
+        return False, "వ్యాఖ్య తప్పనిసరి"
+    if len(author) > MAX_AUTHOR_LENGTH:
+        return False, f"పేరు {MAX_AUTHOR_LENGTH} అక్షరాలకు మించకూడదు"
+    if len(body) > MAX_COMMENT_LENGTH:
+        return False, f"వ్యాఖ్య {MAX_COMMENT_LENGTH} అక్షరాలకు మించకూడదు"
+    return True, ""
+
+
+def check_duplicates(store: StoryStore, title: str, content: str,
+                     near_duplicates: bool = True) -> Tuple[bool, str]:
+    """Reject titles already in ``store`` and, optionally, near-duplicate content."""
+    if store.title_exists(title.strip()):
+        return False, DUPLICATE_TITLE_ERROR
+    if near_duplicates:
+        signature = content_signature(content.strip())
+        similar = most_similar(signature, store.find_similar_content(signature))
+        if similar:
+            return False, SIMILAR_CONTENT_ERROR.format(title=similar["title"])
+    return True, ""
+
+
+def clean_tags(tags: Iterable[str]) -> List[str]:
+    """Tags in stored form (see ``tags.clean_tag``), without blanks or repeats, at most ``MAX_TAGS``."""
+    cleaned: Dict[str, str] = {}
+    for tag in tags:
+        key = tag_key(tag)
+        if key and key not in cleaned:
+            cleaned[key] = clean_tag(tag)
+    return list(cleaned.values())[:MAX_TAGS]
+
+
+def parse_tags(tags_input: str) -> List[str]:
+    """Tags typed into the form, separated by commas."""
+    return clean_tags(tags_input.split(","))
+
+
+def build_story(title: str, author: str, category: str, content: str, tags: Optional[List[str]] = None,
+                story_id: Optional[str] = None, created_at: Optional[str] = None,
+                timestamp: str = "ఇప్పుడే", counters: Optional[Dict[str, int]] = None) -> Dict[str, Any]:
+    """Assemble a story record, with its previews, ready for ``StoryStore.add_story``."""
+    counters = counters or {}
+    story = {
+        "id": story_id or str(uuid.uuid4()),
+        "title": title.strip(),
+        "author": normalize_author(author),
+        "timestamp": timestamp,
+        "category": category,
+        "content": content.strip(),
+        "upvotes": counters.get("upvotes", 0),
+        "downvotes": counters.get("downvotes", 0),
+        "comments": counters.get("comments", 0),
+        "views": counters.get("views", 0),
+        "created_at": created_at or datetime.now().isoformat(),
+        "tags": clean_tags(tags or []),
+    }
+    story.update(story_preview(story["content"]))
+    return story
+
+
+def build_comment(story_id: str, author: str, body: str, parent_id: Optional[str] = None) -> Dict[str, Any]:
+    """Assemble a comment record ready for ``StoryStore.add_comment``."""
+    return {
+        "id": str(uuid.uuid4()),
+        "story_id": story_id,
+        "parent_id": parent_id,
+        "author": author.strip(),
+        "body": body.strip(),
+        "created_at": datetime.now().isoformat(),
+    }
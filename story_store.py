@@ -0,0 +1,1413 @@
+"""Shared story storage for the Telugu Stories platform.
+
+Streamlit re-runs ``app.py`` for every browser session, so anything kept in
+``st.session_state`` is copied once per user. The stores in this module live
+once per process (see ``get_story_store`` in ``app.py``) and every session
+reads and writes through them.
+"""
+
+import json
+import queue
+import sqlite3
+import sys
+import threading
+import uuid
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from contextlib import contextmanager
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from dedup import author_key, band_keys, content_signature, normalize_title, signature_from_bytes
+from previews import PREVIEW_VERSION, story_preview
+from sketches import HyperLogLog
+from transliteration import TRANSLITERATION_VERSION, latin_key
+
+
+# Separates fields in ``search_text`` so a query never matches across two fields
+FIELD_SEPARATOR = "\x00"
+
+
+def search_text(story: Dict[str, Any]) -> str:
+    """Lower-cased text of every searchable field, computed once at write time."""
+    fields = [story["title"], story["author"], story["content"], story.get("excerpt", "")]
+    fields.extend(story.get("tags", []))
+    return FIELD_SEPARATOR.join(field.lower() for field in fields)
+
+
+def latin_text(story: Dict[str, Any]) -> str:
+    """``transliteration.latin_key`` of the title, author and each tag, computed once at write time."""
+    fields = [story["title"], story["author"], *story.get("tags", [])]
+    return FIELD_SEPARATOR.join(latin_key(field) for field in fields)
+
+
+PREVIEW_FIELDS = ("excerpt", "word_count", "reading_minutes")
+
+
+def with_previews(story: Dict[str, Any]) -> Dict[str, Any]:
+    """``story`` with any missing preview field computed (see ``previews``)."""
+    if all(field in story for field in PREVIEW_FIELDS):
+        return story
+    return {**story_preview(story["content"]), **story}
+
+
+class WriteKeys(NamedTuple):
+    """What a store derives from a story to write it: dedup keys, LSH bands and stored search texts."""
+    title_key: str
+    signature: array
+    bands: List[int]
+    author_key: str
+    latin_text: str
+    search_text: str
+
+
+def write_keys(story: Dict[str, Any]) -> WriteKeys:
+    """The ``WriteKeys`` of a story with its previews; pure, so bulk imports compute them in worker processes."""
+    signature = content_signature(story["content"])
+    return WriteKeys(normalize_title(story["title"]), signature, band_keys(signature), author_key(story["author"]),
+                     latin_text(story), search_text(story))
+
+
+# Per-voter vote states kept in the vote log and the ``votes`` table
+UPVOTED, NOT_VOTED, DOWNVOTED = 1, 0, -1
+
+
+def vote_deltas(old_state: int, new_state: int) -> Tuple[int, int]:
+    """Upvote and downvote counter changes for a voter moving between two states."""
+    return ((new_state == UPVOTED) - (old_state == UPVOTED),
+            (new_state == DOWNVOTED) - (old_state == DOWNVOTED))
+
+
+def comment_path(parent_path: Optional[str], seq: int) -> str:
+    """Materialized path of a comment: its parent's path and its own fixed-width segment.
+
+    Sorting paths gives a thread in depth-first order with older siblings
+    first, and every reply below a comment has a path starting with the
+    comment's path followed by ".".
+    """
+    segment = f"{seq:08x}"
+    return f"{parent_path}.{segment}" if parent_path else segment
+
+
+def subtree_bounds(path: str) -> Tuple[str, str]:
+    """Exclusive path bounds of every reply below the comment at ``path`` ("/" sorts right after ".")."""
+    return path + ".", path + "/"
+
+
+# Kinds of entries in the change feed (see ``change_feed``)
+STORY_ADDED, VOTES_CHANGED, VIEWS_RECORDED = "story", "votes", "views"
+
+
+class Change(NamedTuple):
+    """One write in the change feed: a new story with its initial counters, or a story's counter deltas."""
+    change_seq: int
+    origin: str
+    kind: str
+    seq: int
+    upvotes: int
+    downvotes: int
+    views: int
+
+
+def normalize_query(query: str) -> str:
+    """Lower-case and trim a search box query the way ``search_text`` is built."""
+    return query.lower().strip().replace(FIELD_SEPARATOR, "")
+
+
+class StoryStore:
+    """Interface every story storage backend implements.
+
+    Stories carry a ``version`` that goes up whenever a stored field other than
+    the counters changes, so renderings can be cached per (id, version).
+
+    A story's ``content`` is kept apart from what its feed card shows. Feed
+    reads (``list_stories``, ``search_stories``, ``get_stories_by_seq`` and
+    ``list_author_stories``) return stories without it; ``get_story`` and
+    ``iter_stories`` return whole stories.
+
+    Every store has an ``origin``, unique to the store object. Stores that
+    several processes can share record new stories, vote deltas and view
+    counts as ``Change`` entries tagged with the writer's origin, numbered in
+    commit order, so each process can replay the others' writes into its
+    in-memory indexes (see ``change_feed``).
+
+    ``database_id`` is random and fixed when the stored data is created, so
+    files derived from it, such as the saved ranked index, can tell whether
+    they belong to this data.
+    """
+
+    origin = ""
+    database_id = ""
+
+    def seed_if_empty(self, stories: List[Dict[str, Any]]) -> bool:
+        """Insert ``stories`` only if the store holds no stories yet."""
+        raise NotImplementedError
+
+    def add_story(self, story: Dict[str, Any]) -> int:
+        """Persist a new story and return its sequence number."""
+        raise NotImplementedError
+
+    def add_stories(self, stories: List[Dict[str, Any]], keys: Optional[List[WriteKeys]] = None) -> None:
+        """Persist a batch of new stories in a single transaction (oldest first).
+
+        ``keys`` are the stories' ``write_keys``, when the caller has already computed them.
+        """
+        raise NotImplementedError
+
+    def get_story(self, story_id: str) -> Optional[Dict[str, Any]]:
+        """Return the story with ``story_id`` or ``None``."""
+        raise NotImplementedError
+
+    def list_stories(self, category: Optional[str] = None, limit: Optional[int] = None,
+                     before: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Return stories newest first, optionally limited to one category.
+
+        ``before`` is a cursor: only stories with a smaller ``seq`` are
+        returned, so the ``seq`` of the last story of a page fetches the next.
+        """
+        raise NotImplementedError
+
+    def get_stories_by_seq(self, seqs: List[int], content: bool = False) -> List[Dict[str, Any]]:
+        """Return the stories with these sequence numbers, in the order given, with their ``content`` if asked."""
+        raise NotImplementedError
+
+    def search_stories(self, query: str, category: Optional[str] = None,
+                       candidates: Optional[Iterable[int]] = None, limit: Optional[int] = None,
+                       before: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Return stories whose text fields contain ``query`` (case-insensitive).
+
+        ``candidates`` optionally restricts the scan to these sequence numbers
+        (as produced by ``search_index.StorySearchIndex``). ``limit`` and
+        ``before`` page through results as in ``list_stories``.
+        """
+        raise NotImplementedError
+
+    def count_stories(self, category: Optional[str] = None) -> int:
+        """Return the number of stories, optionally in one category."""
+        raise NotImplementedError
+
+    def iter_stories(self, order: str = "id") -> Iterator[Dict[str, Any]]:
+        """Yield every story, ordered by ``id`` or by ``time`` (``created_at``, then seq)."""
+        raise NotImplementedError
+
+    def iter_search_documents(self) -> Iterator[Tuple[int, str]]:
+        """Yield ``(seq, search_text)`` for every story in insertion order."""
+        raise NotImplementedError
+
+    def iter_latin_documents(self) -> Iterator[Tuple[int, str]]:
+        """Yield ``(seq, latin_text)`` for every story in insertion order."""
+        raise NotImplementedError
+
+    def iter_ranking_rows(self) -> Iterator[Tuple[int, str, str, int, int, int]]:
+        """Yield ``(seq, category, created_at, upvotes, downvotes, views)`` for every story."""
+        raise NotImplementedError
+
+    def iter_story_tags(self) -> Iterator[Tuple[int, List[str]]]:
+        """Yield ``(seq, tags)`` for every story in insertion order."""
+        raise NotImplementedError
+
+    def iter_suggestion_rows(self) -> Iterator[Tuple[int, str, str, int, int]]:
+        """Yield ``(seq, title, author, views, upvotes)`` for every story in insertion order."""
+        raise NotImplementedError
+
+    def iter_ranked_documents(self, after: int = 0) -> Iterator[Tuple[int, str, str, str, List[str], str]]:
+        """Yield ``(seq, category, title, author, tags, content)`` for every story after seq ``after``."""
+        raise NotImplementedError
+
+    def last_change(self) -> int:
+        """Number of the newest change in the change feed, or 0 if it is empty."""
+        raise NotImplementedError
+
+    def first_change(self) -> int:
+        """Number of the oldest change still kept, or 0 if the feed is empty."""
+        raise NotImplementedError
+
+    def changes_since(self, after: int, limit: int) -> List[Change]:
+        """Up to ``limit`` changes numbered above ``after``, oldest first."""
+        raise NotImplementedError
+
+    def prune_changes(self, keep: int) -> None:
+        """Delete all but the newest ``keep`` changes."""
+        raise NotImplementedError
+
+    def title_exists(self, title: str) -> bool:
+        """Check whether a story with the same normalized title exists (see ``dedup``)."""
+        raise NotImplementedError
+
+    def find_similar_content(self, signature: Sequence[int]) -> List[Dict[str, Any]]:
+        """Stories sharing an LSH band with ``signature``: dicts of id, title and signature."""
+        raise NotImplementedError
+
+    def existing_ids(self, story_ids: Iterable[str]) -> Set[str]:
+        """The ids among ``story_ids`` that stored stories have."""
+        raise NotImplementedError
+
+    def existing_title_keys(self, title_keys: Iterable[str]) -> Set[str]:
+        """The normalized titles (``dedup.normalize_title``) among ``title_keys`` that stored stories have."""
+        raise NotImplementedError
+
+    def find_similar_contents(self, signatures: List[Sequence[int]]) -> List[List[Dict[str, Any]]]:
+        """``find_similar_content`` for each of ``signatures``, looked up together."""
+        raise NotImplementedError
+
+    def apply_vote(self, story_id: str, upvote_delta: int, downvote_delta: int) -> bool:
+        """Atomically add vote deltas to a story. Returns False if it does not exist."""
+        raise NotImplementedError
+
+    def get_vote_states(self, voter: str, story_ids: Iterable[str]) -> Dict[str, int]:
+        """Return ``voter``'s non-neutral vote state for each of ``story_ids``."""
+        raise NotImplementedError
+
+    def apply_vote_events(self, events: List[Tuple[str, str, int, float]]) -> None:
+        """Append ``(story_id, voter, state, created_at)`` events to the vote log.
+
+        In one transaction, each event moves the voter's stored state and the
+        story's counters by the difference from the previously stored state, so
+        replaying or racing events from several processes never double counts.
+        """
+        raise NotImplementedError
+
+    def apply_view_batch(self, counts: Dict[str, int], viewers: Dict[str, HyperLogLog]) -> None:
+        """Add view counts and merge unique-viewer sketches per story, in one transaction."""
+        raise NotImplementedError
+
+    def get_viewer_sketch(self, story_id: str) -> Optional[HyperLogLog]:
+        """Return the stored unique-viewer sketch of a story, if it has been read."""
+        raise NotImplementedError
+
+    def add_comment(self, comment: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Store a comment and count it on its story and parent, in one transaction.
+
+        Returns the stored comment with ``seq``, ``path``, ``depth`` and
+        ``replies`` set, or ``None`` if its story or parent comment does not exist.
+        """
+        raise NotImplementedError
+
+    def list_comments(self, story_id: str, limit: int, before: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Return top-level comments of a story, newest first.
+
+        ``before`` is a cursor: the ``path`` of the last comment of the previous page.
+        """
+        raise NotImplementedError
+
+    def list_replies(self, comment_id: str, limit: int, after: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Return the replies below a comment, nested ones included, in thread order.
+
+        ``after`` is a cursor: the ``path`` of the last reply of the previous page.
+        """
+        raise NotImplementedError
+
+    def iter_stale_previews(self, version: int, batch_size: int) -> Iterator[List[Tuple[int, str]]]:
+        """Yield batches of ``(seq, content)`` for stories whose previews predate ``version``."""
+        raise NotImplementedError
+
+    def apply_previews(self, rows: List[Tuple[int, str, int, int]], version: int) -> None:
+        """Store ``(seq, excerpt, word_count, reading_minutes)`` rows computed by ``version``."""
+        raise NotImplementedError
+
+    def iter_authors(self) -> Iterator[str]:
+        """Yield the key of every distinct author (see ``dedup.author_key``)."""
+        raise NotImplementedError
+
+    def get_author(self, name: str) -> Optional[Dict[str, Any]]:
+        """Return an author's rollup, or ``None`` if they have no stories.
+
+        Looked up by ``dedup.author_key(name)``; holds the latest spelling of
+        the ``name``, the number of ``stories``, their ``views``, ``upvotes`` and
+        ``downvotes``, and ``category_counts`` (most stories first). Rollups are
+        updated together with the stories and counters they add up.
+        """
+        raise NotImplementedError
+
+    def list_author_stories(self, name: str, limit: Optional[int] = None,
+                            before: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Return an author's stories newest first; ``before`` is a cursor as in ``list_stories``."""
+        raise NotImplementedError
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Return platform totals and per-category story counts (newest category first)."""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Release any resources held by the store."""
+
+
+def _matches_query(story: Dict[str, Any], query: str) -> bool:
+    """Substring match used by the search box (query already lower-cased)."""
+    return (query in story["title"].lower() or
+            query in story["author"].lower() or
+            query in story["content"].lower() or
+            query in story.get("excerpt", "").lower() or
+            any(query in tag.lower() for tag in story.get("tags", [])))
+
+
+# What a story's feed card shows, in ``StoryRecord`` slot order, and its counters
+RECORD_FIELDS = ("seq", "id", "title", "author", "timestamp", "category", "excerpt", "created_at", "tags",
+                 "word_count", "reading_minutes", "version")
+COUNTER_FIELDS = ("upvotes", "downvotes", "comments", "views")
+
+
+class StoryRecord:
+    """A story without its body and counters, in slots instead of a dict per story."""
+
+    __slots__ = RECORD_FIELDS
+
+    def __init__(self, story: Dict[str, Any]):
+        for field in RECORD_FIELDS:
+            setattr(self, field, story[field])
+        # Repeated across many stories; one string each
+        self.author, self.category, self.timestamp = (sys.intern(story[field])
+                                                      for field in ("author", "category", "timestamp"))
+        self.tags = tuple(story["tags"])
+
+    def to_story(self) -> Dict[str, Any]:
+        """The record as a story dict, without ``content`` or counters."""
+        story = {field: getattr(self, field) for field in RECORD_FIELDS}
+        story["tags"] = list(self.tags)
+        return story
+
+
+_STORY_ORDERS = {
+    "id": lambda record: record.id,
+    "time": lambda record: (record.created_at, record.seq),
+}
+
+
+class MemoryStoryStore(StoryStore):
+    """Process-local, non-persistent store. Handy for development and benchmarks.
+
+    No other process can write to it, so its change feed is always empty.
+    """
+
+    def __init__(self):
+        self.origin = uuid.uuid4().hex
+        self.database_id = uuid.uuid4().hex
+        self._lock = threading.Lock()
+        # Stories by position in insertion order (seq is position + 1), looked up by id
+        # through ``_by_id``; newest-first is a reversed walk. Each story is a ``StoryRecord``,
+        # its counters are one array per field and its body is kept apart in ``_bodies``.
+        self._records: List[StoryRecord] = []
+        self._counters: Dict[str, array] = {field: array("q") for field in COUNTER_FIELDS}
+        self._bodies: List[str] = []
+        self._by_id: Dict[str, int] = {}
+        self._title_keys: set = set()
+        # LSH band key -> sequence numbers; signatures are kept beside the stories
+        self._bands: Dict[int, List[int]] = {}
+        self._signatures: List[array] = []
+        # Author key of each story by position, and per author key the rollup and sequence numbers
+        self._story_authors: List[str] = []
+        self._authors: Dict[str, Dict[str, Any]] = {}
+        self._author_seqs: Dict[str, List[int]] = {}
+        self._votes: Dict[Tuple[str, str], int] = {}
+        self._vote_events: List[Tuple[str, str, int, float]] = []
+        self._viewers: Dict[str, HyperLogLog] = {}
+        # Comments by id and by path; per story, all paths sorted and top-level paths in order
+        self._comments: Dict[str, Dict[str, Any]] = {}
+        self._comments_by_path: Dict[str, Dict[str, Any]] = {}
+        self._thread_paths: Dict[str, List[str]] = {}
+        self._top_comment_paths: Dict[str, List[str]] = {}
+
+    def _append(self, story: Dict[str, Any], keys: Optional[WriteKeys] = None) -> int:
+        story = with_previews(story)
+        keys = keys or write_keys(story)
+        seq = len(self._records) + 1
+        self._records.append(StoryRecord({"version": 1, "tags": [], **story, "seq": seq}))
+        for field, values in self._counters.items():
+            values.append(story.get(field, 0))
+        self._bodies.append(story["content"])
+        self._by_id[story["id"]] = seq
+        self._title_keys.add(keys.title_key)
+        self._signatures.append(keys.signature)
+        for band in keys.bands:
+            self._bands.setdefault(band, []).append(seq)
+        key = keys.author_key
+        self._story_authors.append(key)
+        self._author_seqs.setdefault(key, []).append(seq)
+        rollup = self._authors.setdefault(key, {"key": key, "stories": 0, "views": 0, "upvotes": 0,
+                                                "downvotes": 0, "category_counts": {}})
+        rollup["name"] = story["author"]
+        rollup["stories"] += 1
+        rollup["views"] += story.get("views", 0)
+        rollup["upvotes"] += story.get("upvotes", 0)
+        rollup["downvotes"] += story.get("downvotes", 0)
+        rollup["category_counts"][story["category"]] = rollup["category_counts"].get(story["category"], 0) + 1
+        return seq
+
+    def _story(self, position: int, content: bool = False) -> Dict[str, Any]:
+        """The story at ``position`` as a new dict, with its ``content`` if asked."""
+        story = self._records[position].to_story()
+        for field, values in self._counters.items():
+            story[field] = values[position]
+        if content:
+            story["content"] = self._bodies[position]
+        return story
+
+    def _add_counter(self, seq: int, field: str, delta: int) -> None:
+        """Move a story's counter and its author's rollup by ``delta``."""
+        self._counters[field][seq - 1] += delta
+        rollup = self._authors[self._story_authors[seq - 1]]
+        if field in rollup:
+            rollup[field] += delta
+
+    def _newest_first(self, before: Optional[int]) -> Iterator[int]:
+        """Positions of the stories below ``before``, newest first."""
+        end = len(self._records) if before is None else min(before - 1, len(self._records))
+        return iter(range(end - 1, -1, -1))
+
+    def _matches(self, position: int, query: str) -> bool:
+        record = self._records[position]
+        return _matches_query({"title": record.title, "author": record.author, "content": self._bodies[position],
+                               "excerpt": record.excerpt, "tags": record.tags}, query)
+
+    def seed_if_empty(self, stories: List[Dict[str, Any]]) -> bool:
+        with self._lock:
+            if self._records:
+                return False
+            for story in reversed(stories):
+                self._append(story)
+            return True
+
+    def add_story(self, story: Dict[str, Any]) -> int:
+        with self._lock:
+            return self._append(story)
+
+    def add_stories(self, stories: List[Dict[str, Any]], keys: Optional[List[WriteKeys]] = None) -> None:
+        with self._lock:
+            for position, story in enumerate(stories):
+                self._append(story, None if keys is None else keys[position])
+
+    def get_story(self, story_id: str) -> Optional[Dict[str, Any]]:
+        seq = self._by_id.get(story_id)
+        return self._story(seq - 1, content=True) if seq else None
+
+    def list_stories(self, category: Optional[str] = None, limit: Optional[int] = None,
+                     before: Optional[int] = None) -> List[Dict[str, Any]]:
+        positions = (p for p in self._newest_first(before)
+                     if category is None or self._records[p].category == category)
+        return [self._story(p) for p in islice(positions, limit)]
+
+    def get_stories_by_seq(self, seqs: List[int], content: bool = False) -> List[Dict[str, Any]]:
+        return [self._story(seq - 1, content) for seq in seqs if 0 < seq <= len(self._records)]
+
+    def search_stories(self, query: str, category: Optional[str] = None,
+                       candidates: Optional[Iterable[int]] = None, limit: Optional[int] = None,
+                       before: Optional[int] = None) -> List[Dict[str, Any]]:
+        query = normalize_query(query)
+        if candidates is None:
+            positions: Iterable[int] = self._newest_first(before)
+        else:
+            positions = (seq - 1 for seq in sorted(candidates, reverse=True) if before is None or seq < before)
+        matches = (p for p in positions
+                   if (category is None or self._records[p].category == category) and self._matches(p, query))
+        return [self._story(p) for p in islice(matches, limit)]
+
+    def count_stories(self, category: Optional[str] = None) -> int:
+        if category is None:
+            return len(self._records)
+        return sum(1 for record in self._records if record.category == category)
+
+    def iter_stories(self, order: str = "id") -> Iterator[Dict[str, Any]]:
+        key = _STORY_ORDERS[order]
+        for record in sorted(list(self._records), key=key):
+            yield self._story(record.seq - 1, content=True)
+
+    def iter_search_documents(self) -> Iterator[Tuple[int, str]]:
+        for position in range(len(self._records)):
+            yield position + 1, search_text(self._story(position, content=True))
+
+    def iter_latin_documents(self) -> Iterator[Tuple[int, str]]:
+        for record in list(self._records):
+            yield record.seq, latin_text(record.to_story())
+
+    def iter_ranking_rows(self) -> Iterator[Tuple[int, str, str, int, int, int]]:
+        upvotes, downvotes, views = (self._counters[field] for field in ("upvotes", "downvotes", "views"))
+        for position, record in enumerate(list(self._records)):
+            yield (record.seq, record.category, record.created_at,
+                   upvotes[position], downvotes[position], views[position])
+
+    def iter_story_tags(self) -> Iterator[Tuple[int, List[str]]]:
+        for record in list(self._records):
+            yield record.seq, list(record.tags)
+
+    def iter_suggestion_rows(self) -> Iterator[Tuple[int, str, str, int, int]]:
+        upvotes, views = self._counters["upvotes"], self._counters["views"]
+        for position, record in enumerate(list(self._records)):
+            yield record.seq, record.title, record.author, views[position], upvotes[position]
+
+    def iter_ranked_documents(self, after: int = 0) -> Iterator[Tuple[int, str, str, str, List[str], str]]:
+        for position in range(after, len(self._records)):
+            record = self._records[position]
+            yield (record.seq, record.category, record.title, record.author,
+                   list(record.tags), self._bodies[position])
+
+    def last_change(self) -> int:
+        return 0
+
+    def first_change(self) -> int:
+        return 0
+
+    def changes_since(self, after: int, limit: int) -> List[Change]:
+        return []
+
+    def prune_changes(self, keep: int) -> None:
+        pass
+
+    def title_exists(self, title: str) -> bool:
+        return normalize_title(title) in self._title_keys
+
+    def find_similar_content(self, signature: Sequence[int]) -> List[Dict[str, Any]]:
+        seqs = set()
+        for key in band_keys(signature):
+            seqs.update(self._bands.get(key, ()))
+        newest = sorted(seqs, reverse=True)[:_SIMILAR_LIMIT]
+        return [{"id": self._records[seq - 1].id, "title": self._records[seq - 1].title,
+                 "signature": self._signatures[seq - 1]} for seq in newest]
+
+    def existing_ids(self, story_ids: Iterable[str]) -> Set[str]:
+        return {story_id for story_id in story_ids if story_id in self._by_id}
+
+    def existing_title_keys(self, title_keys: Iterable[str]) -> Set[str]:
+        return {key for key in title_keys if key in self._title_keys}
+
+    def find_similar_contents(self, signatures: List[Sequence[int]]) -> List[List[Dict[str, Any]]]:
+        return [self.find_similar_content(signature) for signature in signatures]
+
+    def apply_vote(self, story_id: str, upvote_delta: int, downvote_delta: int) -> bool:
+        with self._lock:
+            seq = self._by_id.get(story_id)
+            if seq is None:
+                return False
+            self._add_counter(seq, "upvotes", upvote_delta)
+            self._add_counter(seq, "downvotes", downvote_delta)
+            return True
+
+    def get_vote_states(self, voter: str, story_ids: Iterable[str]) -> Dict[str, int]:
+        states = {story_id: self._votes.get((story_id, voter), NOT_VOTED) for story_id in story_ids}
+        return {story_id: state for story_id, state in states.items() if state != NOT_VOTED}
+
+    def apply_vote_events(self, events: List[Tuple[str, str, int, float]]) -> None:
+        with self._lock:
+            self._vote_events.extend(events)
+            for story_id, voter, state, _ in events:
+                seq = self._by_id.get(story_id)
+                old_state = self._votes.get((story_id, voter), NOT_VOTED)
+                if seq is None or old_state == state:
+                    continue
+                self._votes[(story_id, voter)] = state
+                upvote_delta, downvote_delta = vote_deltas(old_state, state)
+                self._add_counter(seq, "upvotes", upvote_delta)
+                self._add_counter(seq, "downvotes", downvote_delta)
+
+    def apply_view_batch(self, counts: Dict[str, int], viewers: Dict[str, HyperLogLog]) -> None:
+        with self._lock:
+            for story_id, count in counts.items():
+                seq = self._by_id.get(story_id)
+                if seq is not None:
+                    self._add_counter(seq, "views", count)
+            for story_id, sketch in viewers.items():
+                stored = self._viewers.setdefault(story_id, HyperLogLog(sketch.precision))
+                stored.merge(sketch)
+
+    def get_viewer_sketch(self, story_id: str) -> Optional[HyperLogLog]:
+        stored = self._viewers.get(story_id)
+        return HyperLogLog.from_bytes(stored.to_bytes()) if stored else None
+
+    def add_comment(self, comment: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            parent = None
+            if comment.get("parent_id"):
+                parent = self._comments.get(comment["parent_id"])
+                if parent is None or parent["story_id"] != comment["story_id"]:
+                    return None
+            story_seq = self._by_id.get(comment["story_id"])
+            if story_seq is None:
+                return None
+            seq = len(self._comments) + 1
+            stored = dict(comment, seq=seq, path=comment_path(parent and parent["path"], seq),
+                          depth=parent["depth"] + 1 if parent else 0, replies=0)
+            self._comments[stored["id"]] = stored
+            self._comments_by_path[stored["path"]] = stored
+            insort(self._thread_paths.setdefault(comment["story_id"], []), stored["path"])
+            if parent is None:
+                self._top_comment_paths.setdefault(comment["story_id"], []).append(stored["path"])
+            else:
+                parent["replies"] += 1
+            self._add_counter(story_seq, "comments", 1)
+            return dict(stored)
+
+    def list_comments(self, story_id: str, limit: int, before: Optional[str] = None) -> List[Dict[str, Any]]:
+        paths = self._top_comment_paths.get(story_id, [])
+        end = len(paths) if before is None else bisect_left(paths, before)
+        return [dict(self._comments_by_path[path]) for path in reversed(paths[max(end - limit, 0):end])]
+
+    def list_replies(self, comment_id: str, limit: int, after: Optional[str] = None) -> List[Dict[str, Any]]:
+        comment = self._comments.get(comment_id)
+        if comment is None:
+            return []
+        paths = self._thread_paths[comment["story_id"]]
+        low, high = subtree_bounds(comment["path"])
+        start = bisect_right(paths, max(after or low, low))
+        end = min(bisect_left(paths, high), start + limit)
+        return [dict(self._comments_by_path[path]) for path in paths[start:end]]
+
+    def iter_stale_previews(self, version: int, batch_size: int) -> Iterator[List[Tuple[int, str]]]:
+        # Previews are computed on append and the store does not outlive the process
+        return iter(())
+
+    def apply_previews(self, rows: List[Tuple[int, str, int, int]], version: int) -> None:
+        with self._lock:
+            for seq, excerpt, word_count, minutes in rows:
+                record = self._records[seq - 1]
+                record.excerpt, record.word_count, record.reading_minutes = excerpt, word_count, minutes
+                record.version += 1
+
+    def iter_authors(self) -> Iterator[str]:
+        yield from list(self._authors)
+
+    def get_author(self, name: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            rollup = self._authors.get(author_key(name))
+            if rollup is None:
+                return None
+            counts = sorted(rollup["category_counts"].items(), key=lambda item: (-item[1], item[0]))
+            return dict(rollup, category_counts=dict(counts))
+
+    def list_author_stories(self, name: str, limit: Optional[int] = None,
+                            before: Optional[int] = None) -> List[Dict[str, Any]]:
+        seqs = self._author_seqs.get(author_key(name), [])
+        end = len(seqs) if before is None else bisect_left(seqs, before)
+        start = 0 if limit is None else max(end - limit, 0)
+        return [self._story(seq - 1) for seq in reversed(seqs[start:end])]
+
+    def get_statistics(self) -> Dict[str, Any]:
+        category_counts: Dict[str, int] = {}
+        for record in reversed(list(self._records)):
+            category_counts[record.category] = category_counts.get(record.category, 0) + 1
+        return {
+            "total_stories": len(self._records),
+            "total_authors": len(self._authors),
+            "total_views": sum(self._counters["views"]),
+            "total_upvotes": sum(self._counters["upvotes"]),
+            "total_downvotes": sum(self._counters["downvotes"]),
+            "category_counts": category_counts,
+        }
+
+
+# SQL is kept in module constants so every pooled connection reuses the same
+# compiled statements from sqlite3's per-connection statement cache.
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS stories (
+    seq        INTEGER PRIMARY KEY AUTOINCREMENT,
+    id         TEXT NOT NULL UNIQUE,
+    title      TEXT NOT NULL,
+    author     TEXT NOT NULL,
+    timestamp  TEXT NOT NULL,
+    category   TEXT NOT NULL,
+    excerpt    TEXT NOT NULL,
+    upvotes    INTEGER NOT NULL DEFAULT 0,
+    downvotes  INTEGER NOT NULL DEFAULT 0,
+    comments   INTEGER NOT NULL DEFAULT 0,
+    views      INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL,
+    tags       TEXT NOT NULL DEFAULT '[]'
+);
+CREATE TABLE IF NOT EXISTS story_bodies (
+    seq         INTEGER PRIMARY KEY REFERENCES stories (seq),
+    content     TEXT NOT NULL,
+    search_text TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS votes (
+    story_id TEXT NOT NULL,
+    voter    TEXT NOT NULL,
+    state    INTEGER NOT NULL,
+    PRIMARY KEY (story_id, voter)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS vote_events (
+    event_id   INTEGER PRIMARY KEY,
+    story_id   TEXT NOT NULL,
+    voter      TEXT NOT NULL,
+    state      INTEGER NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS story_viewers (
+    story_id TEXT PRIMARY KEY,
+    sketch   BLOB NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS content_bands (
+    band_key INTEGER NOT NULL,
+    seq      INTEGER NOT NULL REFERENCES stories (seq),
+    PRIMARY KEY (band_key, seq)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS comments (
+    seq        INTEGER PRIMARY KEY AUTOINCREMENT,
+    id         TEXT NOT NULL UNIQUE,
+    story_id   TEXT NOT NULL,
+    parent_id  TEXT,
+    path       TEXT NOT NULL DEFAULT '',
+    depth      INTEGER NOT NULL,
+    author     TEXT NOT NULL,
+    body       TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    replies    INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS authors (
+    author_key TEXT PRIMARY KEY,
+    name       TEXT NOT NULL,
+    stories    INTEGER NOT NULL DEFAULT 0,
+    views      INTEGER NOT NULL DEFAULT 0,
+    upvotes    INTEGER NOT NULL DEFAULT 0,
+    downvotes  INTEGER NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS author_categories (
+    author_key TEXT NOT NULL,
+    category   TEXT NOT NULL,
+    stories    INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (author_key, category)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS store_meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS changes (
+    change_seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    origin     TEXT NOT NULL,
+    kind       TEXT NOT NULL,
+    story_seq  INTEGER NOT NULL,
+    upvotes    INTEGER NOT NULL DEFAULT 0,
+    downvotes  INTEGER NOT NULL DEFAULT 0,
+    views      INTEGER NOT NULL DEFAULT 0
+);
+"""
+# Columns added after the first release; ``_migrate`` adds and backfills them
+_DEDUP_COLUMNS = {
+    "title_key": "TEXT NOT NULL DEFAULT ''",
+    "content_signature": "BLOB",
+}
+# Filled in by ``previews.backfill_previews`` for rows written before they existed
+_PREVIEW_COLUMNS = {
+    "word_count": "INTEGER NOT NULL DEFAULT 0",
+    "reading_minutes": "INTEGER NOT NULL DEFAULT 0",
+    "preview_version": "INTEGER NOT NULL DEFAULT 0",
+}
+# Bumped by every write that changes what a story looks like
+_VERSION_COLUMNS = {
+    "version": "INTEGER NOT NULL DEFAULT 1",
+}
+# ``dedup.author_key`` of the author; rows written before it existed are keyed by ``_migrate``
+_AUTHOR_COLUMNS = {
+    "author_key": "TEXT NOT NULL DEFAULT ''",
+}
+# ``latin_text`` of each story and the ``TRANSLITERATION_VERSION`` it was computed with
+_LATIN_COLUMNS = {
+    "latin_text": "TEXT NOT NULL DEFAULT ''",
+    "latin_version": "INTEGER NOT NULL DEFAULT 0",
+}
+# Columns of the first release that moved to ``story_bodies``; ``_migrate`` moves and drops them
+_BODY_COLUMNS = ("content", "search_text")
+_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_stories_category ON stories (category, seq);
+CREATE INDEX IF NOT EXISTS idx_stories_title_key ON stories (title_key);
+CREATE INDEX IF NOT EXISTS idx_stories_author ON stories (author_key, seq);
+CREATE INDEX IF NOT EXISTS idx_comments_thread ON comments (story_id, path);
+CREATE INDEX IF NOT EXISTS idx_comments_top ON comments (story_id, path) WHERE depth = 0;
+"""
+
+# A story's row holds what a feed card shows; its body and search text are in ``story_bodies``,
+# so feed pages and whole-table scans never read them
+_COLUMNS = ("id, title, author, timestamp, category, excerpt, "
+            "upvotes, downvotes, comments, views, created_at, tags, word_count, reading_minutes, "
+            "version")
+_INSERT_STORY = (f"INSERT INTO stories ({_COLUMNS}, title_key, content_signature, preview_version, "
+                 "author_key, latin_text, latin_version) "
+                 "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)")
+_INSERT_BODY = "INSERT INTO story_bodies (seq, content, search_text) VALUES (?, ?, ?)"
+_MOVE_BODIES = "INSERT INTO story_bodies (seq, content, search_text) SELECT seq, content, search_text FROM stories"
+_WITH_BODIES = "stories JOIN story_bodies USING (seq)"
+_INSERT_BAND = "INSERT OR IGNORE INTO content_bands (band_key, seq) VALUES (?, ?)"
+_SELECT_COLUMNS = f"seq, {_COLUMNS}"
+# Pages are keyset-paginated on seq; "no cursor" and "no limit" are passed as
+# _NO_CURSOR and -1 so each query keeps a single prepared form.
+_NO_CURSOR = 2 ** 63 - 1
+_PAGE = "ORDER BY seq DESC LIMIT :limit"
+_SELECT_STORY = f"SELECT {_SELECT_COLUMNS}, content FROM {_WITH_BODIES} WHERE id = ?"
+_SELECT_ALL = f"SELECT {_SELECT_COLUMNS} FROM stories WHERE seq < :before {_PAGE}"
+_SELECT_CATEGORY = (f"SELECT {_SELECT_COLUMNS} FROM stories WHERE category = :category "
+                    f"AND seq < :before {_PAGE}")
+_SEARCH_CONDITION = "instr(search_text, :q) > 0"
+_SEARCH_ALL = f"SELECT {_SELECT_COLUMNS} FROM {_WITH_BODIES} WHERE seq < :before AND {_SEARCH_CONDITION} {_PAGE}"
+_SEARCH_CATEGORY = (f"SELECT {_SELECT_COLUMNS} FROM {_WITH_BODIES} WHERE category = :category "
+                    f"AND seq < :before AND {_SEARCH_CONDITION} {_PAGE}")
+_CANDIDATES_CONDITION = "seq IN (SELECT value FROM json_each(:candidates))"
+_SEARCH_CANDIDATES = (f"SELECT {_SELECT_COLUMNS} FROM {_WITH_BODIES} WHERE {_CANDIDATES_CONDITION} "
+                      f"AND {_SEARCH_CONDITION} {_PAGE}")
+_SEARCH_CANDIDATES_CATEGORY = (f"SELECT {_SELECT_COLUMNS} FROM {_WITH_BODIES} WHERE {_CANDIDATES_CONDITION} "
+                               f"AND category = :category AND {_SEARCH_CONDITION} {_PAGE}")
+_COUNT_ALL = "SELECT COUNT(*) FROM stories"
+_COUNT_CATEGORY = "SELECT COUNT(*) FROM stories WHERE category = ?"
+_ITER_STORIES = {
+    # "id" walks the UNIQUE index on id; "time" sorts once in a temporary b-tree
+    "id": f"SELECT {_SELECT_COLUMNS}, content FROM {_WITH_BODIES} ORDER BY id",
+    "time": f"SELECT {_SELECT_COLUMNS}, content FROM {_WITH_BODIES} ORDER BY created_at, seq",
+}
+_SEARCH_DOCUMENTS = "SELECT seq, search_text FROM story_bodies ORDER BY seq"
+_LATIN_DOCUMENTS = "SELECT seq, latin_text FROM stories ORDER BY seq"
+_RANKING_ROWS = "SELECT seq, category, created_at, upvotes, downvotes, views FROM stories ORDER BY seq"
+_STORY_TAGS = "SELECT seq, tags FROM stories ORDER BY seq"
+_SUGGESTION_ROWS = "SELECT seq, title, author, views, upvotes FROM stories ORDER BY seq"
+_RANKED_DOCUMENTS = (f"SELECT seq, category, title, author, tags, content FROM {_WITH_BODIES} "
+                     "WHERE seq > ? ORDER BY seq")
+_SELECT_BY_SEQ = f"SELECT {_SELECT_COLUMNS} FROM stories WHERE seq IN (SELECT value FROM json_each(?))"
+_SELECT_BY_SEQ_WITH_BODIES = (f"SELECT {_SELECT_COLUMNS}, content FROM {_WITH_BODIES} "
+                              "WHERE seq IN (SELECT value FROM json_each(?))")
+_TITLE_EXISTS = "SELECT 1 FROM stories WHERE title_key = ? LIMIT 1"
+# Candidates are capped so a band shared by many stories cannot flood the check
+_SIMILAR_LIMIT = 200
+_SIMILAR_CONTENT = ("SELECT id, title, content_signature FROM stories WHERE seq IN ("
+                    "SELECT seq FROM content_bands WHERE band_key IN (SELECT value FROM json_each(?))) "
+                    f"ORDER BY seq DESC LIMIT {_SIMILAR_LIMIT}")
+_EXISTING_IDS = "SELECT id FROM stories WHERE id IN (SELECT value FROM json_each(?))"
+_EXISTING_TITLE_KEYS = "SELECT title_key FROM stories WHERE title_key IN (SELECT value FROM json_each(?))"
+_BAND_SEQS = "SELECT band_key, seq FROM content_bands WHERE band_key IN (SELECT value FROM json_each(?))"
+_SIGNATURES_BY_SEQ = ("SELECT seq, id, title, content_signature FROM stories "
+                      "WHERE seq IN (SELECT value FROM json_each(?))")
+_UNKEYED_STORIES = f"SELECT seq, title, content FROM {_WITH_BODIES} WHERE content_signature IS NULL"
+_SET_DEDUP_KEYS = "UPDATE stories SET title_key = ?, content_signature = ? WHERE seq = ?"
+_STALE_PREVIEWS = (f"SELECT seq, content FROM {_WITH_BODIES} WHERE seq > ? AND preview_version < ? "
+                   "ORDER BY seq LIMIT ?")
+# search_text is left alone: an excerpt is a prefix of the content, which is searched anyway
+_SET_PREVIEW = ("UPDATE stories SET excerpt = ?, word_count = ?, reading_minutes = ?, preview_version = ?, "
+                "version = version + 1 WHERE seq = ?")
+_COMMENT_COLUMNS = "seq, id, story_id, parent_id, path, depth, author, body, created_at, replies"
+# Sorts after every comment path, for the first page of top-level comments
+_PATH_END = "~"
+_SELECT_COMMENT_PATH = "SELECT story_id, path, depth FROM comments WHERE id = ?"
+_COUNT_COMMENT = "UPDATE stories SET comments = comments + 1 WHERE id = ?"
+_INSERT_COMMENT = ("INSERT INTO comments (id, story_id, parent_id, depth, author, body, created_at) "
+                   "VALUES (?, ?, ?, ?, ?, ?, ?)")
+_SET_COMMENT_PATH = "UPDATE comments SET path = ? WHERE seq = ?"
+_COUNT_REPLY = "UPDATE comments SET replies = replies + 1 WHERE id = ?"
+_TOP_COMMENTS = (f"SELECT {_COMMENT_COLUMNS} FROM comments WHERE story_id = ? AND depth = 0 AND path < ? "
+                 "ORDER BY path DESC LIMIT ?")
+_COMMENT_REPLIES = (f"SELECT {_COMMENT_COLUMNS} FROM comments WHERE story_id = ? AND path > ? AND path < ? "
+                    "ORDER BY path LIMIT ?")
+_SELECT_AUTHOR_STORIES = (f"SELECT {_SELECT_COLUMNS} FROM stories WHERE author_key = :author_key "
+                          f"AND seq < :before {_PAGE}")
+_UPSERT_AUTHOR = ("INSERT INTO authors (author_key, name, stories, views, upvotes, downvotes) "
+                  "VALUES (?, ?, 1, ?, ?, ?) ON CONFLICT (author_key) DO UPDATE SET "
+                  "name = excluded.name, stories = stories + 1, views = views + excluded.views, "
+                  "upvotes = upvotes + excluded.upvotes, downvotes = downvotes + excluded.downvotes")
+_UPSERT_AUTHOR_CATEGORY = ("INSERT INTO author_categories (author_key, category, stories) VALUES (?, ?, 1) "
+                           "ON CONFLICT (author_key, category) DO UPDATE SET stories = stories + 1")
+_STORY_AUTHOR = "(SELECT author_key FROM stories WHERE id = ?)"
+_AUTHOR_VOTES = f"UPDATE authors SET upvotes = upvotes + ?, downvotes = downvotes + ? WHERE author_key = {_STORY_AUTHOR}"
+_AUTHOR_VIEWS = f"UPDATE authors SET views = views + ? WHERE author_key = {_STORY_AUTHOR}"
+_SELECT_AUTHOR = "SELECT author_key, name, stories, views, upvotes, downvotes FROM authors WHERE author_key = ?"
+_AUTHOR_CATEGORIES = ("SELECT category, stories FROM author_categories WHERE author_key = ? "
+                      "ORDER BY stories DESC, category")
+_UNKEYED_AUTHORS = "SELECT seq, author FROM stories WHERE author_key = ''"
+_SET_AUTHOR_KEY = "UPDATE stories SET author_key = ? WHERE seq = ?"
+_STALE_LATIN = "SELECT seq, title, author, tags FROM stories WHERE latin_version != ?"
+_SET_LATIN = "UPDATE stories SET latin_text = ?, latin_version = ? WHERE seq = ?"
+# The name is taken from each author's newest story, as the upserts above keep it
+_REBUILD_AUTHORS = (
+    "DELETE FROM authors",
+    "DELETE FROM author_categories",
+    "INSERT INTO authors (author_key, name, stories, views, upvotes, downvotes) "
+    "SELECT author_key, author, stories, views, upvotes, downvotes FROM ("
+    "SELECT author_key, author, MAX(seq), COUNT(*) AS stories, SUM(views) AS views, "
+    "SUM(upvotes) AS upvotes, SUM(downvotes) AS downvotes FROM stories GROUP BY author_key)",
+    "INSERT INTO author_categories (author_key, category, stories) "
+    "SELECT author_key, category, COUNT(*) FROM stories GROUP BY author_key, category",
+)
+_HAS_STORIES = "SELECT 1 FROM stories LIMIT 1"
+_APPLY_VOTE = "UPDATE stories SET upvotes = upvotes + ?, downvotes = downvotes + ? WHERE id = ?"
+_INSERT_VOTE_EVENT = "INSERT INTO vote_events (story_id, voter, state, created_at) VALUES (?, ?, ?, ?)"
+_SELECT_VOTE_STATE = "SELECT state FROM votes WHERE story_id = ? AND voter = ?"
+_SELECT_VOTE_STATES = ("SELECT story_id, state FROM votes WHERE voter = ? "
+                       "AND story_id IN (SELECT value FROM json_each(?)) AND state != 0")
+_UPSERT_VOTE = ("INSERT INTO votes (story_id, voter, state) VALUES (?, ?, ?) "
+                "ON CONFLICT (story_id, voter) DO UPDATE SET state = excluded.state")
+_RECORD_VIEWS = "UPDATE stories SET views = views + ? WHERE id = ?"
+# Writers hold the database lock from their first write to commit, so change_seq follows commit order
+_INSERT_META = "INSERT OR IGNORE INTO store_meta (key, value) VALUES (?, ?)"
+_SELECT_META = "SELECT value FROM store_meta WHERE key = ?"
+_CHANGE_COLUMNS = "change_seq, origin, kind, story_seq, upvotes, downvotes, views"
+# A new story's change carries its counters as written; later deltas have changes of their own
+_STORY_CHANGE = (f"INSERT INTO changes (origin, kind, story_seq, upvotes, downvotes, views) "
+                 f"VALUES (?, '{STORY_ADDED}', ?, ?, ?, ?)")
+_VOTES_CHANGE = (f"INSERT INTO changes (origin, kind, story_seq, upvotes, downvotes) "
+                 f"SELECT ?, '{VOTES_CHANGED}', seq, ?, ? FROM stories WHERE id = ?")
+_VIEWS_CHANGE = (f"INSERT INTO changes (origin, kind, story_seq, views) "
+                 f"SELECT ?, '{VIEWS_RECORDED}', seq, ? FROM stories WHERE id = ?")
+_LAST_CHANGE = "SELECT COALESCE(MAX(change_seq), 0) FROM changes"
+_FIRST_CHANGE = "SELECT COALESCE(MIN(change_seq), 0) FROM changes"
+_CHANGES_SINCE = f"SELECT {_CHANGE_COLUMNS} FROM changes WHERE change_seq > ? ORDER BY change_seq LIMIT ?"
+_PRUNE_CHANGES = "DELETE FROM changes WHERE change_seq <= (SELECT MAX(change_seq) FROM changes) - ?"
+_SELECT_VIEWER_SKETCH = "SELECT sketch FROM story_viewers WHERE story_id = ?"
+_UPSERT_VIEWER_SKETCH = ("INSERT INTO story_viewers (story_id, sketch) VALUES (?, ?) "
+                         "ON CONFLICT (story_id) DO UPDATE SET sketch = excluded.sketch")
+_TOTALS = ("SELECT COUNT(*), (SELECT COUNT(*) FROM authors), COALESCE(SUM(views), 0), "
+           "COALESCE(SUM(upvotes), 0), COALESCE(SUM(downvotes), 0) FROM stories")
+_DISTINCT_AUTHORS = "SELECT author_key FROM authors"
+_CATEGORY_COUNTS = "SELECT category, COUNT(*) FROM stories GROUP BY category ORDER BY MAX(seq) DESC"
+
+
+class _ConnectionPool:
+    """Fixed-size pool of SQLite connections shared by Streamlit's script threads."""
+
+    def __init__(self, path: str, size: int):
+        self._connections: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        for _ in range(size):
+            self._connections.put(self._connect(path))
+
+    @staticmethod
+    def _connect(path: str) -> sqlite3.Connection:
+        conn = sqlite3.connect(path, timeout=30, check_same_thread=False, cached_statements=256)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        conn = self._connections.get()
+        try:
+            yield conn
+        finally:
+            self._connections.put(conn)
+
+    def close(self) -> None:
+        while not self._connections.empty():
+            self._connections.get_nowait().close()
+
+
+class SQLiteStoryStore(StoryStore):
+    """Persistent store backed by a single SQLite database in WAL mode."""
+
+    def __init__(self, path: str = "stories.db", pool_size: int = 4):
+        self.path = path
+        self.origin = uuid.uuid4().hex
+        self._pool = _ConnectionPool(path, pool_size)
+        with self._pool.connection() as conn:
+            conn.executescript(_SCHEMA)
+            self._migrate(conn)
+            conn.executescript(_INDEXES)
+            with conn:
+                # The first process to open the database picks it; older databases get one now
+                conn.execute(_INSERT_META, ("database_id", uuid.uuid4().hex))
+            (self.database_id,) = conn.execute(_SELECT_META, ("database_id",)).fetchone()
+
+    @staticmethod
+    def _migrate(conn: sqlite3.Connection) -> None:
+        """Add newer columns to older databases, move bodies out of ``stories`` and backfill the keys.
+
+        Preview columns start out at version 0; ``previews.backfill_previews`` fills them.
+        Author rollups are rebuilt from the stories whenever author keys were backfilled.
+        """
+        existing = {row[1] for row in conn.execute("PRAGMA table_info(stories)")}
+        columns = {**_DEDUP_COLUMNS, **_PREVIEW_COLUMNS, **_VERSION_COLUMNS, **_AUTHOR_COLUMNS, **_LATIN_COLUMNS}
+        with conn:
+            for column, definition in columns.items():
+                if column not in existing:
+                    conn.execute(f"ALTER TABLE stories ADD COLUMN {column} {definition}")
+            moved = _BODY_COLUMNS[0] in existing
+            if moved:
+                conn.execute(_MOVE_BODIES)
+                for column in _BODY_COLUMNS:
+                    conn.execute(f"ALTER TABLE stories DROP COLUMN {column}")
+            for seq, title, content in conn.execute(_UNKEYED_STORIES).fetchall():
+                signature = content_signature(content)
+                conn.execute(_SET_DEDUP_KEYS, (normalize_title(title), signature.tobytes(), seq))
+                conn.executemany(_INSERT_BAND, [(key, seq) for key in band_keys(signature)])
+            unkeyed = conn.execute(_UNKEYED_AUTHORS).fetchall()
+            if unkeyed:
+                conn.executemany(_SET_AUTHOR_KEY, [(author_key(author), seq) for seq, author in unkeyed])
+                for statement in _REBUILD_AUTHORS:
+                    conn.execute(statement)
+            # Rows written before the column existed, or with older transliteration rules
+            stale = conn.execute(_STALE_LATIN, (TRANSLITERATION_VERSION,)).fetchall()
+            conn.executemany(_SET_LATIN, [
+                (latin_text({"title": title, "author": author, "tags": json.loads(tags)}),
+                 TRANSLITERATION_VERSION, seq) for seq, title, author, tags in stale])
+        if moved:
+            # Dropping the columns leaves the table's pages mostly empty; repack them once
+            conn.execute("VACUUM")
+
+    def _insert(self, conn: sqlite3.Connection, stories: Iterable[Dict[str, Any]],
+                keys: Optional[List[WriteKeys]] = None) -> List[int]:
+        """Insert stories with their title key, LSH bands, author rollups and changes; returns their seqs.
+
+        Only the story rows go one at a time, for their seqs; the other tables are written with one
+        ``executemany`` each.
+        """
+        seqs = []
+        bodies, bands, authors, author_categories, changes = [], [], [], [], []
+        for position, story in enumerate(stories):
+            story = with_previews(story)
+            story_keys = write_keys(story) if keys is None else keys[position]
+            row = SQLiteStoryStore._to_row(story) + (story_keys.title_key, story_keys.signature.tobytes(),
+                                                     PREVIEW_VERSION, story_keys.author_key, story_keys.latin_text,
+                                                     TRANSLITERATION_VERSION)
+            seq = conn.execute(_INSERT_STORY, row).lastrowid
+            bodies.append((seq, story["content"], story_keys.search_text))
+            bands.extend((band, seq) for band in story_keys.bands)
+            authors.append((story_keys.author_key, story["author"], story.get("views", 0),
+                            story.get("upvotes", 0), story.get("downvotes", 0)))
+            author_categories.append((story_keys.author_key, story["category"]))
+            changes.append((self.origin, seq, story.get("upvotes", 0), story.get("downvotes", 0),
+                            story.get("views", 0)))
+            seqs.append(seq)
+        conn.executemany(_INSERT_BODY, bodies)
+        conn.executemany(_INSERT_BAND, bands)
+        conn.executemany(_UPSERT_AUTHOR, authors)
+        conn.executemany(_UPSERT_AUTHOR_CATEGORY, author_categories)
+        conn.executemany(_STORY_CHANGE, changes)
+        return seqs
+
+    @staticmethod
+    def _to_row(story: Dict[str, Any]) -> tuple:
+        return (
+            story["id"], story["title"], story["author"], story["timestamp"],
+            story["category"], story["excerpt"],
+            story.get("upvotes", 0), story.get("downvotes", 0),
+            story.get("comments", 0), story.get("views", 0),
+            story["created_at"], json.dumps(story.get("tags", []), ensure_ascii=False),
+            story["word_count"], story["reading_minutes"], story.get("version", 1),
+        )
+
+    @staticmethod
+    def _to_story(row: tuple) -> Dict[str, Any]:
+        """A story from ``_SELECT_COLUMNS``, followed by its ``content`` if the row has one more column."""
+        story = {
+            "seq": row[0], "id": row[1], "title": row[2], "author": row[3], "timestamp": row[4],
+            "category": row[5], "excerpt": row[6],
+            "upvotes": row[7], "downvotes": row[8], "comments": row[9],
+            "views": row[10], "created_at": row[11], "tags": json.loads(row[12]),
+            "word_count": row[13], "reading_minutes": row[14], "version": row[15],
+        }
+        if len(row) > 16:
+            story["content"] = row[16]
+        return story
+
+    def seed_if_empty(self, stories: List[Dict[str, Any]]) -> bool:
+        with self._pool.connection() as conn:
+            # BEGIN IMMEDIATE takes the write lock so two sessions cannot both seed.
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if conn.execute(_HAS_STORIES).fetchone():
+                    conn.rollback()
+                    return False
+                self._insert(conn, reversed(stories))
+                conn.commit()
+                return True
+            except BaseException:
+                conn.rollback()
+                raise
+
+    def add_story(self, story: Dict[str, Any]) -> int:
+        with self._pool.connection() as conn, conn:
+            return self._insert(conn, [story])[0]
+
+    def add_stories(self, stories: List[Dict[str, Any]], keys: Optional[List[WriteKeys]] = None) -> None:
+        with self._pool.connection() as conn, conn:
+            self._insert(conn, stories, keys)
+
+    def get_story(self, story_id: str) -> Optional[Dict[str, Any]]:
+        with self._pool.connection() as conn:
+            row = conn.execute(_SELECT_STORY, (story_id,)).fetchone()
+        return self._to_story(row) if row else None
+
+    def list_stories(self, category: Optional[str] = None, limit: Optional[int] = None,
+                     before: Optional[int] = None) -> List[Dict[str, Any]]:
+        params = {"category": category, "limit": -1 if limit is None else limit,
+                  "before": _NO_CURSOR if before is None else before}
+        with self._pool.connection() as conn:
+            sql = _SELECT_ALL if category is None else _SELECT_CATEGORY
+            rows = conn.execute(sql, params).fetchall()
+        return [self._to_story(row) for row in rows]
+
+    def get_stories_by_seq(self, seqs: List[int], content: bool = False) -> List[Dict[str, Any]]:
+        with self._pool.connection() as conn:
+            sql = _SELECT_BY_SEQ_WITH_BODIES if content else _SELECT_BY_SEQ
+            rows = conn.execute(sql, (json.dumps(seqs),)).fetchall()
+        by_seq = {row[0]: self._to_story(row) for row in rows}
+        return [by_seq[seq] for seq in seqs if seq in by_seq]
+
+    def search_stories(self, query: str, category: Optional[str] = None,
+                       candidates: Optional[Iterable[int]] = None, limit: Optional[int] = None,
+                       before: Optional[int] = None) -> List[Dict[str, Any]]:
+        params = {"q": normalize_query(query), "category": category,
+                  "before": _NO_CURSOR if before is None else before}
+        if candidates is None:
+            params["limit"] = -1 if limit is None else limit
+            sql = _SEARCH_ALL if category is None else _SEARCH_CATEGORY
+            with self._pool.connection() as conn:
+                rows = conn.execute(sql, params).fetchall()
+            return [self._to_story(row) for row in rows]
+
+        # Verify candidates newest first in chunks, stopping once the page is full
+        pending = sorted((seq for seq in candidates if before is None or seq < before), reverse=True)
+        chunk_size = len(pending) if limit is None else max(limit * 4, 64)
+        sql = _SEARCH_CANDIDATES if category is None else _SEARCH_CANDIDATES_CATEGORY
+        stories: List[Dict[str, Any]] = []
+        with self._pool.connection() as conn:
+            for start in range(0, len(pending), chunk_size or 1):
+                params["candidates"] = json.dumps(pending[start:start + chunk_size])
+                params["limit"] = -1 if limit is None else limit - len(stories)
+                stories.extend(self._to_story(row) for row in conn.execute(sql, params))
+                if limit is not None and len(stories) >= limit:
+                    break
+        return stories
+
+    def count_stories(self, category: Optional[str] = None) -> int:
+        with self._pool.connection() as conn:
+            if category is None:
+                return conn.execute(_COUNT_ALL).fetchone()[0]
+            return conn.execute(_COUNT_CATEGORY, (category,)).fetchone()[0]
+
+    def iter_stories(self, order: str = "id") -> Iterator[Dict[str, Any]]:
+        sql = _ITER_STORIES[order]
+        with self._pool.connection() as conn:
+            for row in conn.execute(sql):
+                yield self._to_story(row)
+
+    def iter_search_documents(self) -> Iterator[Tuple[int, str]]:
+        with self._pool.connection() as conn:
+            yield from conn.execute(_SEARCH_DOCUMENTS)
+
+    def iter_latin_documents(self) -> Iterator[Tuple[int, str]]:
+        with self._pool.connection() as conn:
+            yield from conn.execute(_LATIN_DOCUMENTS)
+
+    def iter_ranking_rows(self) -> Iterator[Tuple[int, str, str, int, int, int]]:
+        with self._pool.connection() as conn:
+            yield from conn.execute(_RANKING_ROWS)
+
+    def iter_story_tags(self) -> Iterator[Tuple[int, List[str]]]:
+        with self._pool.connection() as conn:
+            for seq, tags in conn.execute(_STORY_TAGS):
+                yield seq, json.loads(tags)
+
+    def iter_suggestion_rows(self) -> Iterator[Tuple[int, str, str, int, int]]:
+        with self._pool.connection() as conn:
+            yield from conn.execute(_SUGGESTION_ROWS)
+
+    def iter_ranked_documents(self, after: int = 0) -> Iterator[Tuple[int, str, str, str, List[str], str]]:
+        with self._pool.connection() as conn:
+            for seq, category, title, author, tags, content in conn.execute(_RANKED_DOCUMENTS, (after,)):
+                yield seq, category, title, author, json.loads(tags), content
+
+    def last_change(self) -> int:
+        with self._pool.connection() as conn:
+            return conn.execute(_LAST_CHANGE).fetchone()[0]
+
+    def first_change(self) -> int:
+        with self._pool.connection() as conn:
+            return conn.execute(_FIRST_CHANGE).fetchone()[0]
+
+    def changes_since(self, after: int, limit: int) -> List[Change]:
+        with self._pool.connection() as conn:
+            return [Change(*row) for row in conn.execute(_CHANGES_SINCE, (after, limit))]
+
+    def prune_changes(self, keep: int) -> None:
+        with self._pool.connection() as conn, conn:
+            conn.execute(_PRUNE_CHANGES, (keep,))
+
+    def title_exists(self, title: str) -> bool:
+        with self._pool.connection() as conn:
+            return conn.execute(_TITLE_EXISTS, (normalize_title(title),)).fetchone() is not None
+
+    def find_similar_content(self, signature: Sequence[int]) -> List[Dict[str, Any]]:
+        keys = band_keys(signature)
+        if not keys:
+            return []
+        with self._pool.connection() as conn:
+            rows = conn.execute(_SIMILAR_CONTENT, (json.dumps(keys),)).fetchall()
+        return [{"id": row[0], "title": row[1], "signature": signature_from_bytes(row[2])} for row in rows]
+
+    def existing_ids(self, story_ids: Iterable[str]) -> Set[str]:
+        with self._pool.connection() as conn:
+            return {row[0] for row in conn.execute(_EXISTING_IDS, (json.dumps(list(story_ids)),))}
+
+    def existing_title_keys(self, title_keys: Iterable[str]) -> Set[str]:
+        with self._pool.connection() as conn:
+            return {row[0] for row in conn.execute(_EXISTING_TITLE_KEYS, (json.dumps(list(title_keys)),))}
+
+    def find_similar_contents(self, signatures: List[Sequence[int]]) -> List[List[Dict[str, Any]]]:
+        keys = [band_keys(signature) for signature in signatures]
+        # One read of every band involved, then one of the signatures of the newest stories sharing each
+        by_band: Dict[int, List[int]] = {}
+        with self._pool.connection() as conn:
+            bands = sorted({band for story_bands in keys for band in story_bands})
+            for band, seq in conn.execute(_BAND_SEQS, (json.dumps(bands),)):
+                by_band.setdefault(band, []).append(seq)
+            newest = [sorted({seq for band in story_bands for seq in by_band.get(band, ())},
+                             reverse=True)[:_SIMILAR_LIMIT] for story_bands in keys]
+            wanted = sorted({seq for seqs in newest for seq in seqs})
+            rows = conn.execute(_SIGNATURES_BY_SEQ, (json.dumps(wanted),)).fetchall() if wanted else []
+        found = {row[0]: {"id": row[1], "title": row[2], "signature": signature_from_bytes(row[3])} for row in rows}
+        return [[found[seq] for seq in seqs] for seqs in newest]
+
+    def apply_vote(self, story_id: str, upvote_delta: int, downvote_delta: int) -> bool:
+        with self._pool.connection() as conn, conn:
+            cursor = conn.execute(_APPLY_VOTE, (upvote_delta, downvote_delta, story_id))
+            conn.execute(_AUTHOR_VOTES, (upvote_delta, downvote_delta, story_id))
+            conn.execute(_VOTES_CHANGE, (self.origin, upvote_delta, downvote_delta, story_id))
+        return cursor.rowcount > 0
+
+    def get_vote_states(self, voter: str, story_ids: Iterable[str]) -> Dict[str, int]:
+        with self._pool.connection() as conn:
+            rows = conn.execute(_SELECT_VOTE_STATES, (voter, json.dumps(list(story_ids)))).fetchall()
+        return dict(rows)
+
+    def apply_vote_events(self, events: List[Tuple[str, str, int, float]]) -> None:
+        # Net counter deltas per story, written once each at the end of the batch
+        deltas: Dict[str, List[int]] = {}
+        with self._pool.connection() as conn, conn:
+            # The first write takes the database lock, so the states read below cannot change underneath
+            conn.executemany(_INSERT_VOTE_EVENT, events)
+            for story_id, voter, state, _ in events:
+                row = conn.execute(_SELECT_VOTE_STATE, (story_id, voter)).fetchone()
+                old_state = row[0] if row else NOT_VOTED
+                if old_state == state:
+                    continue
+                conn.execute(_UPSERT_VOTE, (story_id, voter, state))
+                upvote_delta, downvote_delta = vote_deltas(old_state, state)
+                story_deltas = deltas.setdefault(story_id, [0, 0])
+                story_deltas[0] += upvote_delta
+                story_deltas[1] += downvote_delta
+            changed = [(up, down, story_id) for story_id, (up, down) in deltas.items() if up or down]
+            conn.executemany(_APPLY_VOTE, changed)
+            conn.executemany(_AUTHOR_VOTES, changed)
+            conn.executemany(_VOTES_CHANGE, [(self.origin, *deltas) for deltas in changed])
+
+    def apply_view_batch(self, counts: Dict[str, int], viewers: Dict[str, HyperLogLog]) -> None:
+        with self._pool.connection() as conn, conn:
+            # The first write takes the database lock, so sketches are merged without racing other processes
+            conn.executemany(_RECORD_VIEWS, [(count, story_id) for story_id, count in counts.items()])
+            conn.executemany(_AUTHOR_VIEWS, [(count, story_id) for story_id, count in counts.items()])
+            conn.executemany(_VIEWS_CHANGE, [(self.origin, count, story_id) for story_id, count in counts.items()])
+            for story_id, sketch in viewers.items():
+                row = conn.execute(_SELECT_VIEWER_SKETCH, (story_id,)).fetchone()
+                if row:
+                    stored = HyperLogLog.from_bytes(row[0])
+                    stored.merge(sketch)
+                    sketch = stored
+                conn.execute(_UPSERT_VIEWER_SKETCH, (story_id, sketch.to_bytes()))
+
+    def get_viewer_sketch(self, story_id: str) -> Optional[HyperLogLog]:
+        with self._pool.connection() as conn:
+            row = conn.execute(_SELECT_VIEWER_SKETCH, (story_id,)).fetchone()
+        return HyperLogLog.from_bytes(row[0]) if row else None
+
+    def add_comment(self, comment: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        with self._pool.connection() as conn, conn:
+            parent_path, depth = None, 0
+            if comment.get("parent_id"):
+                parent = conn.execute(_SELECT_COMMENT_PATH, (comment["parent_id"],)).fetchone()
+                if parent is None or parent[0] != comment["story_id"]:
+                    return None
+                parent_path, depth = parent[1], parent[2] + 1
+            # The story's counter moves in the same transaction the comment is written in
+            if conn.execute(_COUNT_COMMENT, (comment["story_id"],)).rowcount == 0:
+                return None
+            seq = conn.execute(_INSERT_COMMENT, (
+                comment["id"], comment["story_id"], comment.get("parent_id"), depth,
+                comment["author"], comment["body"], comment["created_at"],
+            )).lastrowid
+            path = comment_path(parent_path, seq)
+            conn.execute(_SET_COMMENT_PATH, (path, seq))
+            if parent_path is not None:
+                conn.execute(_COUNT_REPLY, (comment["parent_id"],))
+        return dict(comment, seq=seq, path=path, depth=depth, replies=0)
+
+    @staticmethod
+    def _to_comment(row: tuple) -> Dict[str, Any]:
+        return {
+            "seq": row[0], "id": row[1], "story_id": row[2], "parent_id": row[3], "path": row[4],
+            "depth": row[5], "author": row[6], "body": row[7], "created_at": row[8], "replies": row[9],
+        }
+
+    def list_comments(self, story_id: str, limit: int, before: Optional[str] = None) -> List[Dict[str, Any]]:
+        with self._pool.connection() as conn:
+            rows = conn.execute(_TOP_COMMENTS, (story_id, before or _PATH_END, limit)).fetchall()
+        return [self._to_comment(row) for row in rows]
+
+    def list_replies(self, comment_id: str, limit: int, after: Optional[str] = None) -> List[Dict[str, Any]]:
+        with self._pool.connection() as conn:
+            comment = conn.execute(_SELECT_COMMENT_PATH, (comment_id,)).fetchone()
+            if comment is None:
+                return []
+            low, high = subtree_bounds(comment[1])
+            rows = conn.execute(_COMMENT_REPLIES, (comment[0], max(after or low, low), high, limit)).fetchall()
+        return [self._to_comment(row) for row in rows]
+
+    def iter_stale_previews(self, version: int, batch_size: int) -> Iterator[List[Tuple[int, str]]]:
+        after = 0
+        while True:
+            # One short query per batch, so no read transaction stays open between writes
+            with self._pool.connection() as conn:
+                batch = conn.execute(_STALE_PREVIEWS, (after, version, batch_size)).fetchall()
+            if not batch:
+                return
+            yield batch
+            after = batch[-1][0]
+
+    def apply_previews(self, rows: List[Tuple[int, str, int, int]], version: int) -> None:
+        with self._pool.connection() as conn, conn:
+            conn.executemany(_SET_PREVIEW, [(excerpt, word_count, minutes, version, seq)
+                                            for seq, excerpt, word_count, minutes in rows])
+
+    def iter_authors(self) -> Iterator[str]:
+        with self._pool.connection() as conn:
+            for (key,) in conn.execute(_DISTINCT_AUTHORS):
+                yield key
+
+    def get_author(self, name: str) -> Optional[Dict[str, Any]]:
+        key = author_key(name)
+        with self._pool.connection() as conn:
+            row = conn.execute(_SELECT_AUTHOR, (key,)).fetchone()
+            if row is None:
+                return None
+            category_counts = dict(conn.execute(_AUTHOR_CATEGORIES, (key,)).fetchall())
+        return {"key": row[0], "name": row[1], "stories": row[2], "views": row[3], "upvotes": row[4],
+                "downvotes": row[5], "category_counts": category_counts}
+
+    def list_author_stories(self, name: str, limit: Optional[int] = None,
+                            before: Optional[int] = None) -> List[Dict[str, Any]]:
+        params = {"author_key": author_key(name), "limit": -1 if limit is None else limit,
+                  "before": _NO_CURSOR if before is None else before}
+        with self._pool.connection() as conn:
+            rows = conn.execute(_SELECT_AUTHOR_STORIES, params).fetchall()
+        return [self._to_story(row) for row in rows]
+
+    def get_statistics(self) -> Dict[str, Any]:
+        with self._pool.connection() as conn:
+            totals = conn.execute(_TOTALS).fetchone()
+            category_counts = dict(conn.execute(_CATEGORY_COUNTS).fetchall())
+        return {
+            "total_stories": totals[0],
+            "total_authors": totals[1],
+            "total_views": totals[2],
+            "total_upvotes": totals[3],
+            "total_downvotes": totals[4],
+            "category_counts": category_counts,
+        }
+
+    def close(self) -> None:
+        self._pool.close()
+
+
+STORE_BACKENDS = {
+    "sqlite": SQLiteStoryStore,
+    "memory": MemoryStoryStore,
+}
+
+
+def create_story_store(backend: str = "sqlite", **options: Any) -> StoryStore:
+    """Instantiate a story store by backend name."""
+    try:
+        store_class = STORE_BACKENDS[backend]
+    except KeyError:
+        raise ValueError(f"Unknown story store backend: {backend!r}") from None
+    return store_class(**options)
@@ -0,0 +1,95 @@
+"""Delivery of the app stylesheet (``styles/app.css``).
+
+In ``static`` mode the stylesheet is minified, written once per process to
+``static/`` under a content-hashed name and pulled in by a one-line
+``<style>@import</style>`` element. Reruns then only resend that element and
+browsers fetch the file once. ``inline`` mode embeds the whole stylesheet in
+the page, which works without Streamlit's static file serving.
+
+Noto Sans Telugu is self-hosted when its ``.woff2`` files are placed in
+``static/fonts/``; otherwise it is loaded from Google Fonts.
+"""
+
+import hashlib
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import List
+
+APP_DIR = Path(__file__).resolve().parent
+SOURCE_PATH = APP_DIR / "styles" / "app.css"
+# Streamlit serves this directory at app/static/ when server.enableStaticServing is on
+STATIC_DIR = APP_DIR / "static"
+STATIC_URL = "app/static/"
+FONT_DIR = STATIC_DIR / "fonts"
+STYLE_MODES = ("static", "inline")
+
+GOOGLE_FONTS_URL = "https://fonts.googleapis.com/css2?{families}&display=swap"
+NOTO_SANS_TELUGU = "family=Noto+Sans+Telugu:wght@400;600;700;900"
+POPPINS = "family=Poppins:wght@300;400;500;600;700;800"
+# Self-hosted Noto Sans Telugu files looked up in FONT_DIR, by weight
+NOTO_SANS_TELUGU_FILES = {
+    400: "NotoSansTelugu-Regular.woff2",
+    600: "NotoSansTelugu-SemiBold.woff2",
+    700: "NotoSansTelugu-Bold.woff2",
+    900: "NotoSansTelugu-Black.woff2",
+}
+
+_COMMENTS = re.compile(r"/\*.*?\*/", re.DOTALL)
+_WHITESPACE = re.compile(r"\s+")
+_AROUND_PUNCTUATION = re.compile(r"\s*([{};,])\s*")
+
+
+def minify_css(css: str) -> str:
+    """Drop comments and insignificant whitespace."""
+    css = _WHITESPACE.sub(" ", _COMMENTS.sub("", css))
+    css = _AROUND_PUNCTUATION.sub(r"\1", css).replace(": ", ":")
+    return css.replace(";}", "}").strip()
+
+
+def _font_rules(font_url: str) -> List[str]:
+    """``@import``/``@font-face`` rules; ``font_url`` is where ``static/fonts/`` is served from."""
+    hosted = {weight: name for weight, name in NOTO_SANS_TELUGU_FILES.items() if (FONT_DIR / name).is_file()}
+    if not hosted:
+        return [f"@import url('{GOOGLE_FONTS_URL.format(families=NOTO_SANS_TELUGU + '&' + POPPINS)}');"]
+    rules = [f"@import url('{GOOGLE_FONTS_URL.format(families=POPPINS)}');"]
+    for weight, name in hosted.items():
+        rules.append("@font-face { font-family: 'Noto Sans Telugu'; font-style: normal; "
+                     f"font-weight: {weight}; font-display: swap; "
+                     f"src: url('{font_url}{name}') format('woff2'); }}")
+    return rules
+
+
+def build_stylesheet(font_url: str, minify: bool = True) -> str:
+    """Font rules plus ``styles/app.css``."""
+    css = "\n".join(_font_rules(font_url) + [SOURCE_PATH.read_text(encoding="utf-8")])
+    return minify_css(css) if minify else css
+
+
+def publish_stylesheet() -> str:
+    """Write the stylesheet under a content-hashed name in ``static/``; return its URL."""
+    css = build_stylesheet(font_url="fonts/")
+    name = f"app.{hashlib.sha256(css.encode('utf-8')).hexdigest()[:12]}.css"
+    path = STATIC_DIR / name
+    if not path.exists():
+        STATIC_DIR.mkdir(exist_ok=True)
+        # Write then rename so concurrent server processes never serve a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=STATIC_DIR, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as tmp:
+            tmp.write(css)
+        # mkstemp creates the file readable by its owner only; static files are served to everyone
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    return STATIC_URL + name
+
+
+def style_element(mode: str) -> str:
+    """The ``<style>`` markup to emit on every rerun for ``mode``."""
+    if mode == "static":
+        return f'<style>@import url("{publish_stylesheet()}");</style>'
+    if mode == "inline":
+        # Left unminified: at over 10 KB (global.minCachedMessageSize) Streamlit
+        # replaces the element by a hash reference on reruns; minified it is not
+        return f"<style>{build_stylesheet(font_url=STATIC_URL + 'fonts/', minify=False)}</style>"
+    raise ValueError(f"style mode must be one of {STYLE_MODES}")
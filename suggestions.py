@@ -0,0 +1,145 @@
+"""Search-as-you-type suggestions from story titles, author names and tags.
+
+``SearchSuggestions`` completes what a reader has typed so far before the
+search is run. Titles and authors each have a ``completion.CompletionTrie``
+weighted by popularity (views plus upvotes, summed over an author's stories);
+tags come from the tag index, ranked by how many stories carry them. A title
+is indexed from the start of each of its first ``TITLE_WORDS`` words, so
+"ప్రయాణం" suggests "పల్లెటూరి ప్రయాణం".
+
+Results are cached per prefix in an LRU of ``CACHE_SIZE`` entries. A new story
+drops every entry, since it may add a title, author or tag; votes and reads
+only reorder suggestions, so entries are kept for up to ``CACHE_SECONDS``
+after they change.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterator, List, NamedTuple, Tuple
+
+from completion import CompletionTrie
+from dedup import author_key, normalize_title
+from story_store import StoryStore
+from tags import TagIndex
+
+TITLE, AUTHOR, TAG = "title", "author", "tag"
+# Joins a title suffix to the story's seq, so stories with the same title are separate keys
+_SEQ_SEPARATOR = "\x00"
+
+
+class Suggestion(NamedTuple):
+    kind: str
+    text: str
+    weight: int
+
+
+class SearchSuggestions:
+    """Top completions of a search prefix, by kind, with a per-prefix cache."""
+
+    PER_KIND = 5
+    TITLE_WORDS = 6
+    CACHE_SIZE = 1024
+    CACHE_SECONDS = 10.0
+
+    def __init__(self, tags: TagIndex):
+        self._lock = threading.Lock()
+        self._tags = tags
+        self._titles = CompletionTrie()
+        self._authors = CompletionTrie()
+        # seq -> (title, author key), to move a story's keys when its popularity changes
+        self._stories: Dict[int, Tuple[str, str]] = {}
+        # author key -> the spelling it was first used with
+        self._author_names: Dict[str, str] = {}
+        # Bumped by every new story; cached results from an older generation are stale
+        self._generation = 0
+        # prefix -> (generation, expiry, suggestions)
+        self._cache: "OrderedDict[str, Tuple[int, float, List[Suggestion]]]" = OrderedDict()
+
+    @classmethod
+    def from_store(cls, store: StoryStore, tags: TagIndex) -> "SearchSuggestions":
+        """Build suggestions over every story currently in ``store``."""
+        suggestions = cls(tags)
+        for seq, title, author, views, upvotes in store.iter_suggestion_rows():
+            suggestions._add(seq, title, author, views + upvotes)
+        return suggestions
+
+    def _title_keys(self, seq: int, title: str) -> Iterator[str]:
+        words = normalize_title(title).split(" ")
+        for start in range(min(len(words), self.TITLE_WORDS)):
+            yield f"{' '.join(words[start:])}{_SEQ_SEPARATOR}{seq}"
+
+    def _add(self, seq: int, title: str, author: str, popularity: int) -> None:
+        key = author_key(author)
+        self._stories[seq] = (title, key)
+        self._author_names.setdefault(key, author)
+        for title_key in self._title_keys(seq, title):
+            self._titles.add(title_key, popularity)
+        self._authors.add(key, popularity)
+
+    def _popularity_changed(self, seq: int, delta: int) -> None:
+        story = self._stories.get(seq)
+        if story is None or not delta:
+            return
+        title, key = story
+        for title_key in self._title_keys(seq, title):
+            self._titles.add(title_key, delta)
+        self._authors.add(key, delta)
+
+    def story_added(self, seq: int, story: dict) -> None:
+        """Suggest a newly stored story's title and author; its tags come from the tag index."""
+        with self._lock:
+            if seq in self._stories:
+                return
+            self._add(seq, story["title"], story["author"], story.get("views", 0) + story.get("upvotes", 0))
+            self._generation += 1
+
+    def votes_changed(self, seq: int, upvote_delta: int, downvote_delta: int) -> None:
+        """Reweigh a story and its author after a vote."""
+        with self._lock:
+            self._popularity_changed(seq, upvote_delta)
+
+    def views_recorded(self, seq: int, count: int = 1) -> None:
+        """Reweigh a story and its author after it was read."""
+        with self._lock:
+            self._popularity_changed(seq, count)
+
+    def suggest(self, prefix: str) -> List[Suggestion]:
+        """Up to ``PER_KIND`` titles, authors and tags starting with ``prefix``, most popular first.
+
+        A prefix starting with "#" only completes tags.
+        """
+        key = normalize_title(prefix)
+        if not key.lstrip("#"):
+            return []
+        now = time.monotonic()
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None and cached[0] == self._generation and now < cached[1]:
+                self._cache.move_to_end(key)
+                return list(cached[2])
+            generation = self._generation
+            found: List[Suggestion] = []
+            if not key.startswith("#"):
+                found.extend(self._complete_titles(key))
+                found.extend(Suggestion(AUTHOR, self._author_names[k], int(self._authors.weight(k)))
+                             for k in self._authors.complete(key, self.PER_KIND))
+        # The tag index has its own lock
+        found.extend(Suggestion(TAG, name, count) for name, count in self._tags.complete(key, self.PER_KIND))
+        with self._lock:
+            self._cache[key] = (generation, now + self.CACHE_SECONDS, found)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return list(found)
+
+    def _complete_titles(self, key: str) -> List[Suggestion]:
+        # A title matching at two of its word starts fills two places, so ask for the most
+        titles: List[Suggestion] = []
+        seen = set()
+        for title_key in self._titles.complete(key, CompletionTrie.TOP_K):
+            seq = int(title_key.rpartition(_SEQ_SEPARATOR)[2])
+            if seq not in seen and len(titles) < self.PER_KIND:
+                seen.add(seq)
+                titles.append(Suggestion(TITLE, self._stories[seq][0], int(self._titles.weight(title_key))))
+        return titles
@@ -0,0 +1,132 @@
+"""Tag index: the stories carrying each tag, tag completion and related tags.
+
+Tags are compared by ``tag_key`` (NFC, zero-width characters dropped,
+case-folded, whitespace collapsed, no leading "#"), so "#ప్రేమ" and "ప్రేమ "
+are one tag, shown in the spelling it was first used with. ``TagIndex`` is
+built once per process from the store and updated as stories are added, like
+``search_index.StorySearchIndex``. It keeps:
+
+* postings: tag key -> sorted story sequence numbers, for the tag filter
+* a ``completion.CompletionTrie`` of tag keys weighted by their story count
+* how often every pair of tags was used on the same story, for related tags
+"""
+
+import heapq
+import re
+import threading
+import unicodedata
+from array import array
+from bisect import bisect_left, insort
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from completion import CompletionTrie
+from story_store import StoryStore
+
+# Zero-width space, ZWNJ, ZWJ, word joiner and BOM, as in ``dedup``
+_ZERO_WIDTH = re.compile("[\u200b\u200c\u200d\u2060\ufeff]+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def clean_tag(tag: str) -> str:
+    """Form a tag is stored in: NFC, whitespace collapsed, without a leading "#"."""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFC", tag)).strip().lstrip("#").lstrip()
+
+
+def tag_key(tag: str) -> str:
+    """Key under which two tags count as the same tag."""
+    return _ZERO_WIDTH.sub("", clean_tag(tag)).casefold()
+
+
+class TagIndex:
+    """Tag postings, completion and co-occurrence counts over every story."""
+
+    RELATED_LIMIT = 5
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # tag key -> sorted array of story sequence numbers
+        self._postings: Dict[str, array] = {}
+        # tag key -> the spelling it was first used with
+        self._names: Dict[str, str] = {}
+        self._trie = CompletionTrie()
+        # tag key -> tag keys used on the same stories, with how many
+        self._pairs: Dict[str, Counter] = {}
+
+    @classmethod
+    def from_store(cls, store: StoryStore) -> "TagIndex":
+        """Build an index over every story currently in ``store``."""
+        index = cls()
+        for seq, tags in store.iter_story_tags():
+            index.add(seq, tags)
+        return index
+
+    def add_story(self, seq: int, story: dict) -> None:
+        """Index the tags of a newly stored story."""
+        self.add(seq, story.get("tags", []))
+
+    def add(self, seq: int, tags: Iterable[str]) -> None:
+        """Index ``tags`` as the tags of the story stored under ``seq``."""
+        names: Dict[str, str] = {}
+        for tag in tags:
+            key = tag_key(tag)
+            if key:
+                names.setdefault(key, clean_tag(tag))
+        with self._lock:
+            for key, name in names.items():
+                postings = self._postings.get(key)
+                if postings is None:
+                    self._postings[key] = array("I", (seq,))
+                    self._names[key] = name
+                elif postings[-1] < seq:
+                    postings.append(seq)
+                elif postings[bisect_left(postings, seq)] != seq:
+                    # Concurrent writers may finish out of order
+                    insort(postings, seq)
+                else:
+                    continue
+                self._trie.add(key)
+                pairs = self._pairs.setdefault(key, Counter())
+                pairs.update(other for other in names if other != key)
+
+    def name(self, tag: str) -> Optional[str]:
+        """The spelling ``tag`` is shown in, or ``None`` if no story carries it."""
+        return self._names.get(tag_key(tag))
+
+    def count(self, tag: str) -> int:
+        """Number of stories carrying ``tag``."""
+        postings = self._postings.get(tag_key(tag))
+        return len(postings) if postings is not None else 0
+
+    def stories(self, tag: str, before: Optional[int] = None) -> List[int]:
+        """Sequence numbers of the stories carrying ``tag``, newest first, below ``before`` if given."""
+        with self._lock:
+            postings = self._postings.get(tag_key(tag))
+            if postings is None:
+                return []
+            end = len(postings) if before is None else bisect_left(postings, before)
+            return postings[end - 1::-1].tolist() if end else []
+
+    def complete(self, prefix: str, limit: int = CompletionTrie.TOP_K) -> List[Tuple[str, int]]:
+        """The most used tags starting with ``prefix``, as ``(name, story count)``."""
+        key = tag_key(prefix)
+        if not key:
+            return []
+        with self._lock:
+            keys = self._trie.complete(key, limit)
+            return [(self._names[found], len(self._postings[found])) for found in keys]
+
+    def related(self, tags: Iterable[str], limit: int = RELATED_LIMIT) -> List[Tuple[str, int]]:
+        """Tags most often used together with ``tags``, as ``(name, stories shared)``."""
+        keys = {tag_key(tag) for tag in tags}
+        with self._lock:
+            totals: Counter = Counter()
+            for key in keys:
+                totals.update(self._pairs.get(key, {}))
+            for key in keys:
+                totals.pop(key, None)
+            best = heapq.nsmallest(limit, totals.items(), key=lambda item: (-item[1], item[0]))
+            return [(self._names[key], shared) for key, shared in best]
+
+    def __len__(self) -> int:
+        return len(self._postings)
@@ -0,0 +1,111 @@
+"""Telugu text helpers: akshara (grapheme cluster) segmentation and word stemming."""
+
+import re
+import unicodedata
+from functools import lru_cache
+from typing import List
+
+VIRAMA = "\u0c4d"
+ZWJ = "\u200d"
+ZWNJ = "\u200c"
+
+# Telugu consonant letters: క..హ and the archaic ౘ..ౝ
+_CONSONANTS = "క-హౘ-ౝ"
+
+
+def _combining_marks() -> str:
+    """Regex class body for combining marks (Mn, Mc, Me) in the BMP."""
+    marks = [chr(cp) for cp in range(0x10000) if unicodedata.category(chr(cp)) in ("Mn", "Mc", "Me")]
+    return "".join(re.escape(mark) for mark in marks)
+
+
+# An akshara is any character followed by combining marks, ZWJ/ZWNJ, and
+# consonants joined through a virama (optionally with a ZWJ in between).
+# Whether a character joins the cluster before it depends only on the two
+# preceding characters, so the split is the same wherever the text appears.
+# Search relies on this to know which clusters of a query must also be
+# clusters of any text containing it.
+_AKSHARA = re.compile(
+    "(?s).(?:[" + _combining_marks() + ZWJ + ZWNJ + "]"
+    "|(?<=" + VIRAMA + ")[" + _CONSONANTS + "]"
+    "|(?<=" + VIRAMA + ZWJ + ")[" + _CONSONANTS + "])*"
+)
+
+
+def is_telugu_consonant(char: str) -> bool:
+    """Return True for Telugu consonant letters."""
+    return "క" <= char <= "హ" or "ౘ" <= char <= "ౝ"
+
+
+def split_aksharas(text: str) -> List[str]:
+    """Split text into aksharas, e.g. "క్షేమం" -> ["క్షే", "మం"].
+
+    Non-Telugu text falls back to one cluster per base character with its
+    combining marks attached.
+    """
+    return _AKSHARA.findall(text)
+
+
+def stable_inner_aksharas(query: str) -> List[str]:
+    """Aksharas of ``query`` that are guaranteed to be whole aksharas in any text containing it.
+
+    The first and last clusters are dropped because the surrounding text may
+    extend them (a preceding virama, a following vowel sign). A cluster right
+    after a leading ZWJ is dropped too, since its boundary depends on the
+    character before the query.
+    """
+    clusters = split_aksharas(query)
+    stable = []
+    position = len(clusters[0]) if clusters else 0
+    for cluster in clusters[1:-1]:
+        if position >= 2 or query[position - 1] != ZWJ:
+            stable.append(cluster)
+        position += len(cluster)
+    return stable
+
+
+# Bump whenever ``stem`` or ``tokenize`` change, so stored indexes built with the old rules are rebuilt
+STEMMER_VERSION = 2
+# Zero-width space, ZWNJ, ZWJ, word joiner and BOM, as in ``dedup``
+_ZERO_WIDTH = re.compile("[\u200b\u200c\u200d\u2060\ufeff]+")
+# Letters, digits and the Telugu block, which includes the vowel signs \w leaves out
+_TOKEN = re.compile("[\\w\u0c00-\u0c7f]+")
+# Plural and case endings, tried longest first: plurals (-లు, -ాలు for nouns in -ం), their
+# oblique forms with case markers (-లలో, -లకు, ...), the case markers and postpositions
+# themselves, and the masculine nominative -డు
+_SUFFIXES = sorted([
+    "లు", "ళ్లు", "ళ్ళు", "ాలు", "ల", "లలో", "లలోని", "లలోకి", "లతో", "లకు", "లను", "లని", "లపై",
+    "ని", "ను", "కి", "కు", "లో", "లోని", "లోకి", "తో", "పై", "చే", "గా", "ాన్ని", "ానికి",
+    "నుండి", "నుంచి", "వల్ల", "కోసం", "గురించి", "యొక్క", "డు",
+], key=len, reverse=True)
+# Vowel signs, anusvara and visarga; one is dropped from the end of a stem, so
+# "కాకతీయులు" -> "కాకతీయు" -> "కాకతీయ" meets the query "కాకతీయ"
+_FINAL_SIGNS = set(chr(cp) for cp in range(0x0C3E, 0x0C4D)) | {"\u0c02", "\u0c03"}
+# Stems keep at least this many aksharas, so short words such as "నేల" stay whole
+_MIN_STEM_AKSHARAS = 2
+_VIRAMA = "\u0c4d"
+
+
+def tokenize(text: str) -> List[str]:
+    """Words of ``text`` for indexing: NFC, zero-width characters dropped, case-folded."""
+    text = _ZERO_WIDTH.sub("", unicodedata.normalize("NFC", text)).casefold()
+    return _TOKEN.findall(text)
+
+
+@lru_cache(maxsize=65536)
+def stem(word: str) -> str:
+    """Strip one plural or case ending and a final vowel sign from a Telugu word.
+
+    A light, rule-based stemmer: it conflates inflected forms such as "కథలు",
+    "కథలో" and "కథ", and leaves words without Telugu endings unchanged.
+    """
+    for suffix in _SUFFIXES:
+        # A stem ending in a virama would split a conjunct: "ఇల్లు" is not "ఇల్" + "లు"
+        stemmed = word[:-len(suffix)]
+        if word.endswith(suffix) and not stemmed.endswith(_VIRAMA) \
+                and len(split_aksharas(stemmed)) >= _MIN_STEM_AKSHARAS:
+            word = stemmed
+            break
+    if word[-1:] in _FINAL_SIGNS and len(split_aksharas(word)) >= _MIN_STEM_AKSHARAS:
+        word = word[:-1]
+    return word
@@ -0,0 +1,77 @@
+"""Feed pages stay put while votes move stories between page loads."""
+
+import logging
+import os
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import streamlit as st  # noqa: E402
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+from benchmarks.corpus import generate_stories  # noqa: E402
+from story_store import SQLiteStoryStore  # noqa: E402
+
+STORIES = 25
+
+
+class TestRankedFeedPages(unittest.TestCase):
+    def setUp(self):
+        # Every Streamlit call outside a script run would log a warning
+        logging.disable(logging.WARNING)
+        self.directory = tempfile.TemporaryDirectory()
+        path = os.path.join(self.directory.name, "stories.db")
+        # No votes, so the "top" feed is newest first until a vote moves a story
+        store = SQLiteStoryStore(path)
+        store.add_stories([dict(story, upvotes=0, downvotes=0) for story in generate_stories(STORIES)])
+        store.close()
+        self.environ = {key: os.environ.get(key) for key in ("TELUGU_STORIES_BACKEND", "TELUGU_STORIES_DB")}
+        os.environ.update(TELUGU_STORIES_BACKEND="sqlite", TELUGU_STORIES_DB=path)
+        # The store and indexes are process-wide; start from this test's database
+        st.cache_resource.clear()
+
+    def tearDown(self):
+        st.cache_resource.clear()
+        for key, value in self.environ.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        self.directory.cleanup()
+        logging.disable(logging.NOTSET)
+
+    @staticmethod
+    def _cards(at):
+        return [button.key[len("upvote_"):] for button in at.button if (button.key or "").startswith("upvote_")]
+
+    def _assert_runs(self, at):
+        self.assertFalse(at.exception, at.exception and at.exception[0].message)
+
+    def test_vote_between_page_loads(self):
+        for ranking in ("top", "hot", "views"):
+            with self.subTest(ranking=ranking):
+                at = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=60).run()
+                at.selectbox(key="feed_ranking").set_value(ranking).run()
+                at.button(key="load_more").click().run()
+                self._assert_runs(at)
+                first = self._cards(at)
+                self.assertEqual(len(first), 20)
+
+                # Downvoting the last card of page 1 drops it below page 2 of the current order
+                at.button(key=f"downvote_{first[9]}").click().run()
+                self._assert_runs(at)
+                self.assertEqual(self._cards(at), first)
+
+                at.button(key="load_more").click().run()
+                self._assert_runs(at)
+                cards = self._cards(at)
+                self.assertEqual(cards[:20], first)
+                self.assertEqual(len(cards), len(set(cards)))
+                self.assertEqual(len(cards), STORIES)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+"""Romanization of Telugu text, for searches typed in Latin script.
+
+``romanize`` writes Telugu in ISO 15919 ("పల్లెటూరి ప్రయాణం" -> "palleṭūri
+prayāṇaṁ"). ``latin_key`` folds a romanization, or a query typed the way
+readers usually write Telugu in Roman letters (RTS style, "palleturi
+prayanam", "neeti katha"), to a loose key in which the two meet:
+
+* diacritics are dropped, so vowel length, retroflexes and ś/ṣ/s are not told apart
+* "ee" and "oo" are read as long "i" and "u"; ఋ is "ru", as in "hrudayam"
+* the "h" of an aspirate is dropped ("katha" = "kata", "sh" = "s"), w is v and f is ph
+* n or m before a consonant (an anusvara, "andam" = "aṁdaṁ") becomes m
+* doubled letters are written once ("amma" = "ama")
+
+Stories store the key of their title, author and tags at write time (see
+``story_store.latin_text``); bump ``TRANSLITERATION_VERSION`` whenever either
+function changes, so stored keys are recomputed.
+"""
+
+import re
+import unicodedata
+
+TRANSLITERATION_VERSION = 1
+
+_CONSONANTS = {
+    "క": "k", "ఖ": "kh", "గ": "g", "ఘ": "gh", "ఙ": "ṅ",
+    "చ": "c", "ఛ": "ch", "జ": "j", "ఝ": "jh", "ఞ": "ñ",
+    "ట": "ṭ", "ఠ": "ṭh", "డ": "ḍ", "ఢ": "ḍh", "ణ": "ṇ",
+    "త": "t", "థ": "th", "ద": "d", "ధ": "dh", "న": "n",
+    "ప": "p", "ఫ": "ph", "బ": "b", "భ": "bh", "మ": "m",
+    "య": "y", "ర": "r", "ఱ": "ṟ", "ల": "l", "ళ": "ḷ", "ఴ": "ḻ", "వ": "v",
+    "శ": "ś", "ష": "ṣ", "స": "s", "హ": "h", "ౘ": "ts", "ౙ": "dz", "ౚ": "ṟ",
+}
+_VOWELS = {
+    "అ": "a", "ఆ": "ā", "ఇ": "i", "ఈ": "ī", "ఉ": "u", "ఊ": "ū", "ఋ": "r̥", "ౠ": "r̥̄",
+    "ఌ": "l̥", "ౡ": "l̥̄", "ఎ": "e", "ఏ": "ē", "ఐ": "ai", "ఒ": "o", "ఓ": "ō", "ఔ": "au",
+}
+_VOWEL_SIGNS = {
+    "ా": "ā", "ి": "i", "ీ": "ī", "ు": "u", "ూ": "ū", "ృ": "r̥", "ౄ": "r̥̄", "ౢ": "l̥", "ౣ": "l̥̄",
+    "ె": "e", "ే": "ē", "ై": "ai", "ొ": "o", "ో": "ō", "ౌ": "au",
+}
+_OTHER = {
+    "ం": "ṁ", "ః": "ḥ", "ఁ": "m̐", "ఀ": "m̐", "ఽ": "'",
+    # Nukta and the length marks left over after NFC
+    "\u0c3c": "", "\u0c55": "", "\u0c56": "",
+    # Zero-width space, ZWNJ, ZWJ, word joiner and BOM, as in ``dedup``
+    "\u200b": "", "\u200c": "", "\u200d": "", "\u2060": "", "\ufeff": "",
+}
+# A consonant keeps its inherent "a" unless a vowel sign or virama follows: consonants are
+# written with _INHERENT after them, and a vowel sign or virama starts with _DROP, which
+# removes it. A table and three replaces are faster than a regex substitution per consonant.
+_INHERENT, _DROP = "\x02", "\x03"
+_TABLE = str.maketrans({
+    **{letter: latin + _INHERENT for letter, latin in _CONSONANTS.items()},
+    **{sign: _DROP + latin for sign, latin in _VOWEL_SIGNS.items()},
+    **_VOWELS, **_OTHER, "్": _DROP,
+    **{chr(0x0C66 + digit): str(digit) for digit in range(10)},
+})
+_NUKTA = "\u0c3c"
+
+_COMBINING = re.compile("[\u0300-\u036f]+")
+# Anything left that is not a letter or digit separates words
+_NOT_WORD = re.compile(r"[^a-z0-9]+")
+_ASPIRATE = re.compile(r"(?<=[kgcjtdpbs])h")
+# Doubled n and m are left to _REPEAT
+_NASAL = re.compile("[nm](?=[^aeiou0-9 nm])")
+_REPEAT = re.compile(r"(.)\1+")
+_FOLDS = str.maketrans({"w": "v", "f": "p", "q": "k", "x": "ks"})
+_LATIN_LETTER = re.compile("[A-Za-z]")
+_TELUGU = re.compile("[\u0c00-\u0c7f]")
+
+
+def romanize(text: str) -> str:
+    """ISO 15919 romanization of the Telugu in ``text``; other characters are kept."""
+    text = unicodedata.normalize("NFC", text).replace(_NUKTA, "").translate(_TABLE)
+    return text.replace(_INHERENT + _DROP, "").replace(_INHERENT, "a").replace(_DROP, "")
+
+
+def latin_key(text: str) -> str:
+    """Loose Latin-script key of ``text``: Telugu is romanized first, then both scripts are folded alike."""
+    text = unicodedata.normalize("NFD", romanize(text).lower())
+    # Syllabic r and l (r̥, l̥) are read "ru" and "lu" in Telugu
+    text = _COMBINING.sub("", text.replace("r̥", "ru").replace("l̥", "lu"))
+    text = _NOT_WORD.sub(" ", text).strip()
+    text = text.replace("ee", "i").replace("oo", "u").translate(_FOLDS)
+    return _REPEAT.sub(r"\1", _NASAL.sub("m", _ASPIRATE.sub("", text)))
+
+
+def is_latin_query(query: str) -> bool:
+    """Whether a search is typed in Latin script: it has a Latin letter and no Telugu."""
+    return _LATIN_LETTER.search(query) is not None and _TELUGU.search(query) is None
@@ -0,0 +1,94 @@
+"""Buffered view counting with per-story unique-viewer sketches.
+
+A view is a read of the full story, not a card scrolling past in the feed.
+``ViewCounter.record_read`` only touches in-memory counters and a
+HyperLogLog of viewer keys per story; a background thread hands them to
+``StoryStore.apply_view_batch`` every ``FLUSH_INTERVAL_MS`` or once
+``FLUSH_READS`` reads are waiting, so page renders never write counters.
+"""
+
+import threading
+from typing import Any, Dict, List, Optional
+
+from sketches import HyperLogLog
+from story_store import StoryStore
+from write_behind import WriteBehindBuffer
+
+
+class ViewCounter(WriteBehindBuffer):
+    """Buffers story reads and unique-viewer sketches and flushes them in batches."""
+
+    FLUSH_INTERVAL_MS = 1000
+    FLUSH_READS = 1000
+    # 2 ** 10 one-byte registers per story, about 3% standard error
+    SKETCH_PRECISION = 10
+
+    def __init__(self, store: StoryStore, flush_interval_ms: Optional[int] = None,
+                 flush_reads: Optional[int] = None):
+        super().__init__(flush_interval_ms)
+        self.store = store
+        self.flush_reads = flush_reads or self.FLUSH_READS
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._reads = 0
+        # Reads and viewer sketches per story, still buffered and being written
+        self._pending_counts: Dict[str, int] = {}
+        self._pending_viewers: Dict[str, HyperLogLog] = {}
+        self._flushing_counts: Dict[str, int] = {}
+        self._flushing_viewers: Dict[str, HyperLogLog] = {}
+
+    def record_read(self, story_id: str, viewer: str) -> None:
+        """Count one read of ``story_id`` by ``viewer``."""
+        with self._lock:
+            self._pending_counts[story_id] = self._pending_counts.get(story_id, 0) + 1
+            sketch = self._pending_viewers.get(story_id)
+            if sketch is None:
+                sketch = self._pending_viewers[story_id] = HyperLogLog(self.SKETCH_PRECISION)
+            sketch.add(viewer)
+            self._reads += 1
+            if self._reads >= self.flush_reads:
+                self._request_flush()
+
+    def flush(self) -> int:
+        """Write buffered reads to the store now; returns how many were written."""
+        with self._flush_lock:
+            with self._lock:
+                reads, self._reads = self._reads, 0
+                self._flushing_counts, self._pending_counts = self._pending_counts, {}
+                self._flushing_viewers, self._pending_viewers = self._pending_viewers, {}
+            if not reads:
+                return 0
+            try:
+                self.store.apply_view_batch(self._flushing_counts, self._flushing_viewers)
+            except BaseException:
+                with self._lock:
+                    self._reads += reads
+                    for story_id, count in self._flushing_counts.items():
+                        self._pending_counts[story_id] = self._pending_counts.get(story_id, 0) + count
+                    for story_id, sketch in self._flushing_viewers.items():
+                        if story_id in self._pending_viewers:
+                            sketch.merge(self._pending_viewers[story_id])
+                        self._pending_viewers[story_id] = sketch
+                    self._flushing_counts, self._flushing_viewers = {}, {}
+                raise
+            with self._lock:
+                # The store now counts the batch; the overlay must stop adding it
+                self._flushing_counts, self._flushing_viewers = {}, {}
+        self._flushed()
+        return reads
+
+    def overlay(self, stories: List[Dict[str, Any]]) -> None:
+        """Add unflushed reads to the view counts of stories read from the store."""
+        with self._lock:
+            for story in stories:
+                for unflushed in (self._flushing_counts, self._pending_counts):
+                    story["views"] = story.get("views", 0) + unflushed.get(story["id"], 0)
+
+    def unique_viewers(self, story_id: str) -> int:
+        """Estimated number of distinct viewers of ``story_id``, including unflushed reads."""
+        sketch = self.store.get_viewer_sketch(story_id) or HyperLogLog(self.SKETCH_PRECISION)
+        with self._lock:
+            for unflushed in (self._flushing_viewers, self._pending_viewers):
+                if story_id in unflushed:
+                    sketch.merge(unflushed[story_id])
+        return len(sketch)
@@ -0,0 +1,138 @@
+"""Write-behind vote log.
+
+A vote click used to be a synchronous read-modify-write of the story's
+counters. ``VoteLog.cast`` instead appends a ``(story_id, voter, state)``
+event to an in-memory buffer and returns immediately; a background thread
+hands the buffer to ``StoryStore.apply_vote_events`` every
+``FLUSH_INTERVAL_MS`` or as soon as ``FLUSH_EVENTS`` events are waiting.
+The store turns each event into counter deltas against the voter's stored
+state inside one transaction, so counts stay exact under concurrent
+sessions and processes.
+
+Until a batch is written, ``voter_states`` and ``overlay`` report the
+unflushed votes on top of what the store returns, so a voter sees their
+own click on the next rerun.
+"""
+
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from story_store import DOWNVOTED, NOT_VOTED, UPVOTED, StoryStore, vote_deltas
+from write_behind import WriteBehindBuffer
+
+VoteEvent = Tuple[str, str, int, float]
+
+
+def next_vote_state(state: int, action: str) -> int:
+    """Toggle semantics of the vote buttons: pressing the active vote clears it."""
+    if action == "upvote":
+        return NOT_VOTED if state == UPVOTED else UPVOTED
+    if action == "downvote":
+        return NOT_VOTED if state == DOWNVOTED else DOWNVOTED
+    raise ValueError(f"Unknown vote action: {action!r}")
+
+
+class VoteLog(WriteBehindBuffer):
+    """Buffers vote events and flushes them to the store in batches."""
+
+    FLUSH_EVENTS = 500
+
+    def __init__(self, store: StoryStore, flush_interval_ms: Optional[int] = None,
+                 flush_events: Optional[int] = None):
+        super().__init__(flush_interval_ms)
+        self.store = store
+        self.flush_events = flush_events or self.FLUSH_EVENTS
+        self._lock = threading.Lock()
+        # Serializes flushes so batches reach the store in cast order
+        self._flush_lock = threading.Lock()
+        self._events: List[VoteEvent] = []
+        # Latest unflushed state per (story_id, voter) and net counter deltas per
+        # story, for events still buffered and for the batch being written
+        self._pending_states: Dict[Tuple[str, str], int] = {}
+        self._pending_deltas: Dict[str, List[int]] = {}
+        self._flushing_states: Dict[Tuple[str, str], int] = {}
+        self._flushing_deltas: Dict[str, List[int]] = {}
+        # Bumped whenever a written batch leaves the flushing overlay
+        self._batches_written = 0
+
+    def cast(self, story_id: str, voter: str, action: str) -> Tuple[int, int]:
+        """Record a vote button press; returns the resulting (upvote, downvote) deltas."""
+        key = (story_id, voter)
+        while True:
+            # Read outside the lock, so presses and flushes do not wait for the query
+            batches_written = self._batches_written
+            stored = self.store.get_vote_states(voter, [story_id]).get(story_id, NOT_VOTED)
+            with self._lock:
+                old_state = self._pending_states.get(key, self._flushing_states.get(key))
+                if old_state is None:
+                    if batches_written != self._batches_written:
+                        # A batch written since the read may have changed the stored state
+                        continue
+                    old_state = stored
+                new_state = next_vote_state(old_state, action)
+                self._events.append((story_id, voter, new_state, time.time()))
+                self._pending_states[key] = new_state
+                upvote_delta, downvote_delta = vote_deltas(old_state, new_state)
+                story_deltas = self._pending_deltas.setdefault(story_id, [0, 0])
+                story_deltas[0] += upvote_delta
+                story_deltas[1] += downvote_delta
+                if len(self._events) >= self.flush_events:
+                    self._request_flush()
+            return upvote_delta, downvote_delta
+
+    def flush(self) -> int:
+        """Write buffered events to the store now; returns how many were written."""
+        with self._flush_lock:
+            with self._lock:
+                events, self._events = self._events, []
+                self._flushing_states, self._pending_states = self._pending_states, {}
+                self._flushing_deltas, self._pending_deltas = self._pending_deltas, {}
+            if not events:
+                return 0
+            try:
+                self.store.apply_vote_events(events)
+            except BaseException:
+                with self._lock:
+                    # Put the batch back in front of anything cast meanwhile
+                    self._events[:0] = events
+                    for key, state in self._flushing_states.items():
+                        self._pending_states.setdefault(key, state)
+                    for story_id, (up, down) in self._flushing_deltas.items():
+                        story_deltas = self._pending_deltas.setdefault(story_id, [0, 0])
+                        story_deltas[0] += up
+                        story_deltas[1] += down
+                    self._flushing_states, self._flushing_deltas = {}, {}
+                raise
+            with self._lock:
+                # The store now counts the batch; the overlay must stop adding it
+                self._flushing_states, self._flushing_deltas = {}, {}
+                self._batches_written += 1
+        self._flushed()
+        return len(events)
+
+    def voter_states(self, voter: str, story_ids: Iterable[str]) -> Dict[str, int]:
+        """``voter``'s vote state per story, including votes not yet flushed."""
+        story_ids = list(story_ids)
+        states = self.store.get_vote_states(voter, story_ids)
+        with self._lock:
+            for unflushed in (self._flushing_states, self._pending_states):
+                for story_id in story_ids:
+                    if (story_id, voter) in unflushed:
+                        states[story_id] = unflushed[(story_id, voter)]
+        return states
+
+    def overlay(self, stories: List[Dict[str, Any]]) -> None:
+        """Add unflushed vote deltas to the counters of stories read from the store."""
+        with self._lock:
+            for story in stories:
+                for unflushed in (self._flushing_deltas, self._pending_deltas):
+                    deltas = unflushed.get(story["id"])
+                    if deltas:
+                        story["upvotes"] += deltas[0]
+                        story["downvotes"] += deltas[1]
+
+    @property
+    def pending(self) -> int:
+        """Number of events waiting to be flushed."""
+        return len(self._events)
@@ -0,0 +1,73 @@
+"""Background flushing shared by the write-behind buffers (votes, views)."""
+
+import atexit
+import logging
+import threading
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindBuffer:
+    """Calls ``flush`` every ``flush_interval_ms`` or when ``_request_flush`` is called.
+
+    Subclasses buffer writes in memory and implement ``flush``; whatever is
+    still buffered is flushed by ``close``, which also runs at interpreter exit.
+    Listeners added with ``on_flush`` are called once each batch is in the store.
+    """
+
+    FLUSH_INTERVAL_MS = 200
+
+    def __init__(self, flush_interval_ms: Optional[int] = None):
+        self.flush_interval_ms = flush_interval_ms or self.FLUSH_INTERVAL_MS
+        self._wake = threading.Event()
+        self._closed = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._listeners: Dict[str, Callable[[], None]] = {}
+
+    def on_flush(self, name: str, callback: Callable[[], None]) -> None:
+        """Call ``callback`` after every batch written, replacing an earlier listener called ``name``."""
+        self._listeners[name] = callback
+
+    def _flushed(self) -> None:
+        """Tell the listeners a batch reached the store; subclasses call it after dropping their overlay."""
+        for name, callback in list(self._listeners.items()):
+            try:
+                callback()
+            except Exception:
+                # The batch is written; a failing listener must not have it retried
+                logger.exception("Flush listener %s of %s failed", name, type(self).__name__)
+
+    def start(self) -> "WriteBehindBuffer":
+        """Start the background flusher."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=f"{type(self).__name__}-flusher", daemon=True)
+            self._thread.start()
+            atexit.register(self.close)
+        return self
+
+    def _run(self) -> None:
+        while not self._closed.is_set():
+            self._wake.wait(self.flush_interval_ms / 1000)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                # Buffered writes are kept and retried on the next tick
+                logger.exception("Flushing %s failed", type(self).__name__)
+
+    def _request_flush(self) -> None:
+        """Wake the flusher before the interval is up."""
+        self._wake.set()
+
+    def flush(self) -> int:
+        """Write buffered data to the store; returns the number of buffered writes."""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Stop the flusher and write whatever is still buffered."""
+        self._closed.set()
+        self._wake.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self.flush()